@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the per-file text transforms and gate regressions against a stored baseline.
+
+Every benchmark runs over three tiers of real markdown from the tracked ``plugins/`` tree: the
+smallest, median-sized and largest agent, command and skill entry points. Each timing is taken right
+after a fixed reference workload, and the gate compares their ratio, so a machine that is slower for
+a while (CPU frequency, noisy neighbours) does not read as a regression. Benchmarks are interleaved
+over several rounds and the fastest round of each side counts, since noise only ever adds time;
+nanoseconds per file are reported alongside.
+
+Baselines are kept per machine in ``bench_text_hot_paths.json`` next to this script, because
+timings only compare on the same hardware and Python build:
+
+    uv run python scripts/bench_text_hot_paths.py --update   # record this machine's baseline
+    uv run python scripts/bench_text_hot_paths.py            # exit 1 on a regression past --threshold
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import subprocess  # nosec B404
+import sys
+import timeit
+from datetime import UTC, datetime
+from pathlib import Path, PurePosixPath
+from typing import Callable
+
+from copilot_converter.builders import (
+    _ensure_frontmatter_name,
+    _ensure_prompt_header,
+    extract_relative_link_targets,
+    render_agent_bytes,
+)
+from copilot_converter.frontmatter import extract_intro, parse_simple_frontmatter, split_frontmatter
+from copilot_converter.persona import preview_text
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).with_suffix(".json")
+DEFAULT_THRESHOLD = 0.4
+FILES_PER_TIER = 5
+BASELINE_VERSION = 2
+
+
+class Sample:
+    """One corpus file with the pieces each transform takes as input."""
+
+    def __init__(self, path: str, data: bytes) -> None:
+        self.path = PurePosixPath(path)
+        self.data = data
+        self.text = data.decode("utf-8")
+        split = split_frontmatter(self.text)
+        self.frontmatter = split.frontmatter
+        self.body = split.body
+        self.name = self.path.parent.name if self.path.name == "SKILL.md" else self.path.stem
+
+
+# Each benchmark maps a sample to one call of the transform it measures.
+BENCHMARKS: dict[str, Callable[[Sample], object]] = {
+    "split_frontmatter": lambda sample: split_frontmatter(sample.text),
+    "parse_simple_frontmatter": lambda sample: parse_simple_frontmatter(sample.frontmatter),
+    "extract_intro": lambda sample: extract_intro(sample.body, sample.name),
+    "_ensure_prompt_header": lambda sample: _ensure_prompt_header(sample.path, sample.text, sample.name),
+    "_ensure_frontmatter_name": lambda sample: _ensure_frontmatter_name(sample.text, sample.name),
+    "render_agent_bytes": lambda sample: render_agent_bytes(sample.data, sample.name),
+    "extract_relative_link_targets": lambda sample: extract_relative_link_targets(sample.text),
+    "preview_text": lambda sample: preview_text(sample.body),
+}
+
+
+def _is_entry_point(path: PurePosixPath) -> bool:
+    parts = path.parts
+    if len(parts) == 4 and parts[2] in ("agents", "commands"):
+        return True
+    return len(parts) == 5 and parts[2] == "skills" and parts[4] == "SKILL.md"
+
+
+def load_corpus(root: Path = REPO_ROOT) -> dict[str, list[Sample]]:
+    """Pick the smallest, median and largest tracked entry points under ``plugins/``."""
+    listed = subprocess.run(  # nosec B603 B607
+        ["git", "ls-files", "-z", "plugins/*.md"], cwd=root, check=True, capture_output=True, text=True
+    ).stdout
+    paths = [path for path in listed.split("\0") if path and _is_entry_point(PurePosixPath(path))]
+    if len(paths) < FILES_PER_TIER * 3:
+        raise SystemExit(f"Need at least {FILES_PER_TIER * 3} markdown files under plugins/, found {len(paths)}")
+    ranked = sorted(paths, key=lambda path: ((root / path).stat().st_size, path))
+    middle = (len(ranked) - FILES_PER_TIER) // 2
+    tiers = {
+        "small": ranked[:FILES_PER_TIER],
+        "typical": ranked[middle : middle + FILES_PER_TIER],
+        "large": ranked[-FILES_PER_TIER:],
+    }
+    return {
+        tier: [Sample(path, (root / path).read_bytes()) for path in tier_paths] for tier, tier_paths in tiers.items()
+    }
+
+
+def corpus_digest(corpus: dict[str, list[Sample]]) -> str:
+    digest = hashlib.sha256()
+    for tier, samples in corpus.items():
+        for sample in samples:
+            digest.update(f"{tier}\0{sample.path}\0".encode())
+            digest.update(sample.text.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def machine_key() -> tuple[str, str]:
+    """Return a stable key for this machine and Python build, and a readable description of it."""
+    cpu = platform.processor()
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.is_file():
+        models = [
+            line.split(":", 1)[1].strip() for line in cpuinfo.read_text().splitlines() if line.startswith("model name")
+        ]
+        cpu = models[0] if models else cpu
+    python = f"{platform.python_implementation()} {platform.python_version()}"
+    description = f"{cpu or platform.machine()}, {python}"
+    host = hashlib.sha256(platform.node().encode()).hexdigest()[:8]
+    return f"{platform.machine()}-{python.replace(' ', '-')}-{host}", description
+
+
+# Plain string work that does not depend on the converter, timed next to every benchmark.
+_REFERENCE_TEXT = "\n".join(f"line {index}: " + "word " * (index % 17) for index in range(400))
+
+
+def _reference() -> None:
+    for line in _REFERENCE_TEXT.splitlines():
+        line.strip().split(":", 1)
+
+
+def _calibrated(timer: timeit.Timer, min_time: float) -> int:
+    """Return how many calls of ``timer`` take at least ``min_time`` seconds."""
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return number
+
+
+def _timer(benchmark: Callable[[Sample], object], samples: list[Sample]) -> timeit.Timer:
+    def run() -> None:
+        for sample in samples:
+            benchmark(sample)
+
+    return timeit.Timer(run)
+
+
+def run_benchmarks(
+    corpus: dict[str, list[Sample]], names: list[str], rounds: int, min_time: float
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Return ``{benchmark: {tier: {"ns": ns per file, "score": time over the reference}}}``.
+
+    Both the benchmark and its reference take their fastest round.
+    """
+    reference = timeit.Timer(_reference)
+    reference_number = _calibrated(reference, min_time)
+    pairs = [(name, tier) for name in names for tier in corpus]
+    timers = {(name, tier): _timer(BENCHMARKS[name], corpus[tier]) for name, tier in pairs}
+    numbers = {pair: _calibrated(timer, min_time) for pair, timer in timers.items()}
+    elapsed: dict[tuple[str, str], list[float]] = {pair: [] for pair in pairs}
+    references: dict[tuple[str, str], list[float]] = {pair: [] for pair in pairs}
+    for _ in range(rounds):
+        for name, tier in pairs:
+            references[name, tier].append(reference.timeit(reference_number) / reference_number)
+            per_file = timers[name, tier].timeit(numbers[name, tier]) / numbers[name, tier] / len(corpus[tier])
+            elapsed[name, tier].append(per_file)
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name, tier in pairs:
+        fastest = min(elapsed[name, tier])
+        results.setdefault(name, {})[tier] = {
+            "ns": round(fastest * 1e9, 1),
+            "score": round(fastest / min(references[name, tier]), 4),
+        }
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    threshold: float,
+) -> tuple[list[str], list[str]]:
+    """Return a table of each timing against the baseline and the benchmarks that regressed."""
+    regressions: list[str] = []
+    lines = [f"{'benchmark':32} {'tier':8} {'baseline ns':>12} {'current ns':>12} {'ratio':>7}"]
+    for name, tiers in results.items():
+        for tier, timing in tiers.items():
+            current = timing["ns"]
+            recorded = baseline.get(name, {}).get(tier)
+            if recorded is None:
+                lines.append(f"{name:32} {tier:8} {'-':>12} {current:12.1f} {'new':>7}")
+                continue
+            ratio = timing["score"] / recorded["score"]
+            regressed = ratio > 1 + threshold
+            flag = "  REGRESSION" if regressed else ""
+            lines.append(f"{name:32} {tier:8} {recorded['ns']:12.1f} {current:12.1f} {ratio:7.2f}{flag}")
+            if regressed:
+                regressions.append(f"{name}/{tier}")
+    return lines, regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file (default: %(default)s)")
+    parser.add_argument("--update", action="store_true", help="Record the timings as this machine's baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Fail when a timing exceeds the baseline by more than this fraction (default: %(default)s)",
+    )
+    parser.add_argument("--rounds", type=int, default=9, help="Timing rounds over every benchmark; the fastest counts")
+    parser.add_argument("--min-time", type=float, default=0.01, help="Seconds each timing runs at least")
+    parser.add_argument(
+        "--only", action="append", choices=sorted(BENCHMARKS), default=None, help="Run this benchmark only. Repeatable"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the timings as JSON")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus()
+    digest = corpus_digest(corpus)
+    key, description = machine_key()
+    stored = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.is_file() else {}
+    if stored and stored.get("version") != BASELINE_VERSION:
+        if not args.update:
+            raise SystemExit(f"Unsupported baseline version in {args.baseline}; re-record it with --update")
+        # Scores of another version are not comparable; every machine re-records.
+        stored = {}
+    names = args.only or list(BENCHMARKS)
+    results = run_benchmarks(corpus, names, args.rounds, args.min_time)
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.update:
+        machines = stored.get("machines", {}) if stored.get("corpus") == digest else {}
+        previous = machines.get(key, {}).get("results", {})
+        machines[key] = {
+            "description": description,
+            "recorded": datetime.now(UTC).date().isoformat(),
+            "results": {**previous, **results},
+        }
+        payload = {"version": BASELINE_VERSION, "corpus": digest, "machines": machines}
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Recorded baseline for {description} in {args.baseline}", file=sys.stderr)
+        return 0
+
+    machine = stored.get("machines", {}).get(key)
+    if stored.get("corpus") != digest:
+        print("The corpus changed since the baseline was recorded; re-record it with --update", file=sys.stderr)
+        return 2
+    if machine is None:
+        print(f"No baseline for {description}; record one with --update", file=sys.stderr)
+        return 2
+    lines, regressions = compare(results, machine["results"], args.threshold)
+    if not args.json:
+        print("\n".join(lines))
+    if regressions:
+        print(f"Regressed past {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
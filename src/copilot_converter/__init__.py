@@ -1,5 +1,90 @@
 """Copilot converter package."""
 
-from .app import main
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["main"]
+if TYPE_CHECKING:
+    from .app import main
+    from .awesome import AwesomeImport
+    from .converter import Converter
+    from .file_ops import SyncBarrier
+    from .git_ops import GitFastImportSink
+    from .models import ConversionResult
+    from .pipeline import PipelineOptions
+    from .plan import PlanSink
+    from .render_cache import DiskRenderCache
+    from .sinks import DirectorySink, MemorySink, OutputSink, TarSink, ZipSink
+    from .sources import (
+        DirectorySnapshot,
+        DirectorySource,
+        GitSource,
+        MemorySource,
+        PluginOverlay,
+        SourceTree,
+        TarSource,
+        ZipSource,
+        open_source,
+    )
+    from .tokens import TokenBudgets
+
+# Exports resolve lazily so `python -m copilot_converter` can answer a no-op run before importing
+# the conversion stack.
+_EXPORTS = {
+    "AwesomeImport": "awesome",
+    "ConversionResult": "models",
+    "Converter": "converter",
+    "DirectorySink": "sinks",
+    "DiskRenderCache": "render_cache",
+    "DirectorySnapshot": "sources",
+    "DirectorySource": "sources",
+    "GitFastImportSink": "git_ops",
+    "GitSource": "sources",
+    "MemorySink": "sinks",
+    "MemorySource": "sources",
+    "OutputSink": "sinks",
+    "PipelineOptions": "pipeline",
+    "PlanSink": "plan",
+    "PluginOverlay": "sources",
+    "SourceTree": "sources",
+    "SyncBarrier": "file_ops",
+    "TarSink": "sinks",
+    "TarSource": "sources",
+    "TokenBudgets": "tokens",
+    "ZipSink": "sinks",
+    "ZipSource": "sources",
+    "main": "app",
+    "open_source": "sources",
+}
+
+__all__ = [
+    "AwesomeImport",
+    "ConversionResult",
+    "Converter",
+    "DirectorySink",
+    "DirectorySnapshot",
+    "DirectorySource",
+    "DiskRenderCache",
+    "GitFastImportSink",
+    "GitSource",
+    "MemorySink",
+    "MemorySource",
+    "OutputSink",
+    "PipelineOptions",
+    "PlanSink",
+    "PluginOverlay",
+    "SourceTree",
+    "SyncBarrier",
+    "TarSink",
+    "TarSource",
+    "TokenBudgets",
+    "ZipSink",
+    "ZipSource",
+    "main",
+    "open_source",
+]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
@@ -1,16 +1,39 @@
+from __future__ import annotations
+
 import argparse
-from pathlib import Path
+import json
+import sys
+from importlib import import_module
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Callable
 
-from .processing import (
-    iter_plugin_dirs,
-    process_awesome_meta_agent,
-    process_plugins,
+from .constants import ASSET_KINDS, CATALOG_FORMATS, RENDER_PROFILES
+from .file_ops import (
+    DURABILITY_MODES,
+    SyncBarrier,
+    load_json,
     resolve_output_root,
     resolve_source,
-    sync_plugin_selection,
-    write_decision_log,
-    write_marketplace_manifest,
+    write_text,
 )
+from .git_ops import branch_ref, git_dir, require_repository, resolve_commit
+from .run_state import RUN_STATE_NAME, compute_run_key, is_up_to_date, record_run
+
+if TYPE_CHECKING:
+    from contextlib import ExitStack
+
+    from .awesome import AwesomeImport
+    from .decision_db import DecisionDatabase
+    from .git_ops import GitFastImportSink
+    from .models import ConversionResult, DecisionRecord
+    from .plan import PlanSink
+    from .processing import DecisionLogWriter
+    from .render_cache import DiskRenderCache
+    from .sinks import DirectorySink
+    from .sources import SourceTree
+
+SourceOpener = Callable[[Path, str | None], "SourceTree"]
+DependencyGraph = Callable[["SourceTree"], dict[str, set[str]]]
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -21,13 +44,43 @@ def build_parser() -> argparse.ArgumentParser:
         "agents_source",
         nargs="?",
         default="/home/toor/code/agents",
-        help="Path to wshobson/agents (default: /home/toor/code/agents)",
+        help="Path to wshobson/agents, or a .zip/.tar archive of it (default: /home/toor/code/agents)",
     )
     parser.add_argument(
         "awesome_source",
         nargs="?",
         default="/home/toor/code/awesome-copilot",
-        help="Path to github/awesome-copilot (default: /home/toor/code/awesome-copilot)",
+        help="Path to github/awesome-copilot, or an archive of it (default: /home/toor/code/awesome-copilot)",
+    )
+    parser.add_argument(
+        "--agents-ref",
+        default=None,
+        help="Read agents_source as a local git repository (bare or mirror) at this commit or ref",
+    )
+    parser.add_argument(
+        "--awesome-ref",
+        default=None,
+        help="Read awesome_source as a local git repository (bare or mirror) at this commit or ref",
+    )
+    parser.add_argument(
+        "--source",
+        action="append",
+        default=[],
+        metavar="PATH[#REF]",
+        help=(
+            "Additional plugin repository (directory, archive, or git repository with #REF). Repeatable. "
+            "On plugin name collisions agents_source wins, then --source entries in the order given"
+        ),
+    )
+    parser.add_argument(
+        "--only",
+        type=_plugin_list,
+        default=None,
+        metavar="PLUGIN[,PLUGIN...]",
+        help=(
+            "Convert only these plugins and the plugins providing skills they reference into the existing "
+            "output; other plugins are left untouched and marketplace.json is patched in place"
+        ),
     )
     parser.add_argument(
         "--output",
@@ -39,32 +92,585 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help=("Path to write a JSON decision log. If omitted, no log is written."),
     )
+    parser.add_argument(
+        "--decision-db",
+        default=None,
+        help=(
+            "Also record the run's decisions in this SQLite database, which keeps every run; "
+            "query it with the decisions subcommand"
+        ),
+    )
+    parser.add_argument(
+        "--marketplace-shards",
+        type=_non_negative_int,
+        default=0,
+        metavar="N",
+        help=(
+            "Also write a sharded marketplace: .github/plugin/marketplace/index.json plus N shard files "
+            "(default: 0, single marketplace.json only)"
+        ),
+    )
+    parser.add_argument(
+        "--catalog",
+        action="append",
+        choices=CATALOG_FORMATS,
+        default=[],
+        help=(
+            "Also write the asset catalog listing every agent, command and skill: json writes "
+            ".github/plugin/catalog.json, gzip writes catalog.json.gz. Repeatable"
+        ),
+    )
+    parser.add_argument(
+        "--awesome-collections",
+        action="store_true",
+        help=(
+            "Also convert every awesome-copilot collection (collections/*.collection.yml) into an awesome-<id> "
+            "plugin with its agents, prompts, instructions and skills"
+        ),
+    )
+    parser.add_argument(
+        "--awesome-include",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="With --awesome-collections, import only collections whose id matches this glob. Repeatable",
+    )
+    parser.add_argument(
+        "--awesome-exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="With --awesome-collections, skip collections whose id matches this glob. Repeatable",
+    )
+    parser.add_argument(
+        "--awesome-workers",
+        type=_positive_int,
+        default=None,
+        help="Files converted in parallel by --awesome-collections (default: automatic)",
+    )
+    parser.add_argument(
+        "--merkle-manifest",
+        action="store_true",
+        help=(
+            "Write .github/plugin/merkle.json with hashes per file, directory, plugin and output root, and report "
+            "the files changed since the previous manifest (compare any two with the diff subcommand)"
+        ),
+    )
+    parser.add_argument(
+        "--derived-versions",
+        action="store_true",
+        help=(
+            "Append the first digits of each plugin's content hash to its version as build metadata "
+            "(1.0.0 becomes 1.0.0+<hash>) in plugin.json and marketplace.json"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        choices=RENDER_PROFILES,
+        default="default",
+        help=(
+            "default: keep agent, command and skill bodies as in the source. slim: outside code blocks, drop HTML "
+            "comments, trailing whitespace, repeated blank lines and decorative rules; savings per plugin go to "
+            "the decision log (default: default)"
+        ),
+    )
+    parser.add_argument(
+        "--token-budget",
+        action="append",
+        type=_token_budget,
+        default=[],
+        metavar="KIND=TOKENS",
+        help=(
+            "Estimated token limit for one asset kind (agent, command or skill), e.g. skill=5000. Repeatable. "
+            "Estimates are always written to the decision log; assets over a limit are reported as warnings"
+        ),
+    )
+    parser.add_argument(
+        "--split-skills",
+        action="store_true",
+        help=(
+            "Split a SKILL.md over the skill token budget into a core file plus references/*.md sections "
+            "linked from it (requires --token-budget skill=N)"
+        ),
+    )
+    parser.add_argument(
+        "--strict-token-budgets",
+        action="store_true",
+        help="Exit with status 1 when any asset is over its token budget",
+    )
+    parser.add_argument(
+        "--git-repo",
+        default=None,
+        help=(
+            "Commit output straight into this local git repository via git fast-import instead of writing "
+            "files. --output must point inside the repository."
+        ),
+    )
+    parser.add_argument(
+        "--git-branch",
+        default=None,
+        help="Branch to commit to with --git-repo (default: the repository's current branch)",
+    )
+    parser.add_argument(
+        "--git-message",
+        default="Update generated plugins",
+        help="Commit message used with --git-repo",
+    )
+    parser.add_argument(
+        "--durability",
+        choices=DURABILITY_MODES,
+        default="fast",
+        help=(
+            "fast: plain buffered writes, no syncing (CI, tmpfs). durable: replace every file atomically and "
+            "sync each touched filesystem once at the end (default: fast)"
+        ),
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Convert plugins with the asyncio pipeline (concurrent reads and writes, bounded queues)",
+    )
+    parser.add_argument(
+        "--pipeline-readers",
+        type=_positive_int,
+        default=4,
+        help="Concurrent source reads with --pipeline (default: 4)",
+    )
+    parser.add_argument(
+        "--pipeline-writers",
+        type=_positive_int,
+        default=4,
+        help="Concurrent sink writes with --pipeline (default: 4)",
+    )
+    parser.add_argument(
+        "--pipeline-queue-size",
+        type=_positive_int,
+        default=64,
+        help="Capacity of each pipeline queue with --pipeline (default: 64)",
+    )
+    parser.add_argument(
+        "--pipeline-stats",
+        default=None,
+        help="Path to write pipeline queue depth and stage latency statistics as JSON (requires --pipeline)",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Dry run: compute every file a run would write and list what would be added (A), removed (D) or "
+            "modified (M) in the current output, without writing anything"
+        ),
+    )
+    parser.add_argument(
+        "--plan-json",
+        action="store_true",
+        help="With --plan, print every planned path, size and content hash plus the changes as JSON",
+    )
+    parser.add_argument(
+        "--render-cache",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Shared on-disk cache of rendered agents, prompts, skills and placeholders, keyed by source content "
+            "and converter version; point checkouts and CI jobs at one directory to share it"
+        ),
+    )
+    parser.add_argument(
+        "--render-cache-size",
+        type=_positive_int,
+        default=256,
+        metavar="MB",
+        help="Evict least recently used render cache entries beyond this size (default: 256)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert even when sources, selection and converter version match the last successful run",
+    )
     return parser
 
 
-def main(argv: list[str] | None = None) -> int:
+def _sink_relative(path: Path, root: Path) -> PurePosixPath:
+    try:
+        return PurePosixPath(path.relative_to(root.resolve()).as_posix())
+    except ValueError:
+        return PurePosixPath(path.as_posix())
+
+
+# Subcommands are resolved lazily: name -> (module, entry point taking the remaining argv).
+SUBCOMMANDS = {
+    "decisions": ("decision_db", "decisions_main"),
+    "diff": ("merkle", "diff_main"),
+    "install": ("install", "install_main"),
+    "serve": ("server", "serve_main"),
+    "validate": ("validate", "validate_main"),
+}
+
+# Options that change how a run executes but not what it produces.
+_EXECUTION_OPTIONS = {
+    "force",
+    "durability",
+    "pipeline",
+    "pipeline_readers",
+    "pipeline_writers",
+    "pipeline_queue_size",
+    "pipeline_stats",
+    "strict_token_budgets",
+    "render_cache",
+    "render_cache_size",
+    "awesome_workers",
+}
+
+
+_CATALOG_FILES = {"json": "catalog.json", "gzip": "catalog.json.gz"}
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return number
+
+
+def _plugin_list(value: str) -> list[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        raise argparse.ArgumentTypeError("expected at least one plugin name")
+    return names
+
+
+def _token_budget(value: str) -> tuple[str, int]:
+    kind, separator, tokens = value.partition("=")
+    if not separator or kind not in ASSET_KINDS:
+        raise argparse.ArgumentTypeError(f"expected KIND=TOKENS with KIND one of {', '.join(ASSET_KINDS)}: {value}")
+    return kind, _positive_int(tokens)
+
+
+def _parse_source(spec: str) -> tuple[Path, str | None]:
+    location, separator, ref = spec.rpartition("#")
+    if not separator or Path(spec).expanduser().exists():
+        return resolve_source(spec), None
+    return resolve_source(location), ref or None
+
+
+def _run_key(
+    args: argparse.Namespace,
+    plugin_sources: list[tuple[Path, str | None]],
+    awesome_path: Path,
+    plugin_config_path: Path,
+) -> str:
+    options = {key: value for key, value in vars(args).items() if key not in _EXECUTION_OPTIONS}
+    return compute_run_key(
+        [*plugin_sources, (awesome_path, args.awesome_ref)],
+        plugin_config_path,
+        options,
+    )
+
+
+def _run_state(args: argparse.Namespace) -> tuple[Path, list[Path], str | None]:
+    """Return where the run key is recorded, the outputs it vouches for and the current output commit."""
+    outputs = [Path(path) for path in (args.decision_log, args.decision_db) if path]
+    if args.git_repo:
+        repo = resolve_source(args.git_repo)
+        return git_dir(repo) / RUN_STATE_NAME, outputs, resolve_commit(repo, branch_ref(repo, args.git_branch))
+    output_root = Path(args.output).expanduser().resolve()
+    outputs.extend([output_root, Path.cwd() / ".github" / "plugin" / "marketplace.json"])
+    outputs.extend(Path.cwd() / ".github" / "plugin" / _CATALOG_FILES[name] for name in set(args.catalog))
+    return output_root.parent / RUN_STATE_NAME, outputs, None
+
+
+def main(
+    argv: list[str] | None = None,
+    source_opener: SourceOpener | None = None,
+    dependency_graph: DependencyGraph | None = None,
+) -> int:
+    """Run the CLI. A subcommand name as the first argument (see ``SUBCOMMANDS``) runs it instead.
+
+    ``source_opener`` replaces ``open_source`` and ``dependency_graph`` replaces
+    ``plugin_dependency_graph``; the resident converter passes its warm source cache for both.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        module_name, function_name = SUBCOMMANDS[argv[0]]
+        subcommand = getattr(import_module(f".{module_name}", __package__), function_name)
+        return subcommand(argv[1:])
+
     parser = build_parser()
     args = parser.parse_args(argv)
     args.overwrite = True
+    if args.split_skills and "skill" not in dict(args.token_budget):
+        parser.error("--split-skills requires --token-budget skill=N")
 
-    agents_source = resolve_source(args.agents_source)
-    awesome_source = resolve_source(args.awesome_source)
-    output_root = resolve_output_root(args.output)
+    plugin_sources = [
+        (resolve_source(args.agents_source), args.agents_ref),
+        *(_parse_source(spec) for spec in args.source),
+    ]
+    awesome_path = resolve_source(args.awesome_source)
     plugin_config_path = Path.cwd() / "plugin-selection.json"
+    if args.plan or args.plan_json:
+        args.plan = True
+        _convert(args, plugin_sources, awesome_path, plugin_config_path, source_opener, dependency_graph)
+        return 0
+    state_path, state_outputs, output_commit = _run_state(args)
+    if not args.force and is_up_to_date(
+        state_path,
+        _run_key(args, plugin_sources, awesome_path, plugin_config_path),
+        state_outputs,
+        output_commit,
+    ):
+        return 0
 
-    enabled_plugins = sync_plugin_selection(agents_source, plugin_config_path)
-    plugin_dirs = list(iter_plugin_dirs(agents_source, enabled_plugins))
+    commit_id, over_budget = _convert(
+        args, plugin_sources, awesome_path, plugin_config_path, source_opener, dependency_graph
+    )
+    if over_budget and args.strict_token_budgets:
+        # Not recorded, so the next run converts again instead of passing as up to date.
+        return 1
+    record_run(state_path, _run_key(args, plugin_sources, awesome_path, plugin_config_path), commit_id)
+    return 0
+
+
+def _convert(
+    args: argparse.Namespace,
+    plugin_sources: list[tuple[Path, str | None]],
+    awesome_path: Path,
+    plugin_config_path: Path,
+    source_opener: SourceOpener | None = None,
+    dependency_graph: DependencyGraph | None = None,
+) -> tuple[str | None, int]:
+    """Run the conversion; return the output commit when publishing to git and the over-budget count."""
+    # Imported here so that a no-op run never loads the conversion stack.
+    from contextlib import ExitStack
+
+    from .awesome import AwesomeImport
+    from .converter import Converter
+    from .git_ops import GitFastImportSink
+    from .pipeline import PipelineOptions
+    from .plan import PlanSink
+    from .processing import slugify_marketplace_name, write_plugin_selection
+    from .render_cache import DiskRenderCache
+    from .tokens import TokenBudgets
+
+    with ExitStack() as stack:
+        agents_source, awesome_source = _open_sources(
+            stack, plugin_sources, (awesome_path, args.awesome_ref), source_opener
+        )
+        awesome_import = (
+            AwesomeImport(tuple(args.awesome_include), tuple(args.awesome_exclude), args.awesome_workers)
+            if args.awesome_collections
+            else None
+        )
+        if args.only:
+            _check_only(args.only, agents_source, awesome_source, awesome_import)
+
+        barrier = SyncBarrier() if args.durability == "durable" and not args.plan else None
+        sink, workspace_root, output_root = _open_sink(args, barrier, stack)
+        sink_output_root = _sink_relative(output_root, workspace_root)
+        if args.git_repo and sink_output_root.is_absolute():
+            raise SystemExit(f"Output path must be inside the git repository: {output_root}")
+
+        render_cache = (
+            DiskRenderCache(Path(args.render_cache).expanduser(), args.render_cache_size * 1024 * 1024)
+            if args.render_cache
+            else None
+        )
+        saved: list[dict[str, int]] = []
+        recorders = _decision_recorders(args, barrier, output_root)
+
+        def on_decision(decision: DecisionRecord) -> None:
+            if decision.slim_savings:
+                saved.append(decision.slim_savings)
+            for recorder in recorders:
+                recorder.write(decision)
+
+        with sink, ExitStack() as recording:
+            for recorder in recorders:
+                recording.enter_context(recorder)
+            converter = Converter(
+                agents_source,
+                sink,
+                awesome_source=awesome_source,
+                dependencies=dependency_graph(agents_source) if dependency_graph is not None else None,
+                output_root=sink_output_root,
+                marketplace_name=slugify_marketplace_name(workspace_root.name),
+                selection=load_json(plugin_config_path) if plugin_config_path.exists() else {},
+                overwrite=args.overwrite,
+                pipeline=PipelineOptions(
+                    readers=args.pipeline_readers,
+                    writers=args.pipeline_writers,
+                    queue_size=args.pipeline_queue_size,
+                )
+                if args.pipeline
+                else None,
+                marketplace_shards=args.marketplace_shards,
+                catalog_formats=tuple(dict.fromkeys(args.catalog)),
+                token_budgets=TokenBudgets(**dict(args.token_budget), split_skills=args.split_skills),
+                profile=args.profile,
+                only=args.only,
+                merkle_manifest=args.merkle_manifest,
+                derived_versions=args.derived_versions,
+                render_cache=render_cache,
+                awesome_import=awesome_import,
+            )
+            result = converter.run(on_decision)
+        if isinstance(sink, PlanSink):
+            _report_plan(sink, args.plan_json)
+            return None, len(result.over_budget)
+    write_plugin_selection(plugin_config_path, result.selection, barrier)
+
+    if args.pipeline_stats and result.pipeline_stats is not None:
+        write_text(Path(args.pipeline_stats), json.dumps(result.pipeline_stats, indent=2) + "\n")
+    if barrier is not None:
+        barrier.flush()
+
+    _report_run(result, saved, render_cache)
+    return (sink.commit_id if isinstance(sink, GitFastImportSink) else None), len(result.over_budget)
+
+
+def _open_sources(
+    stack: ExitStack,
+    plugin_sources: list[tuple[Path, str | None]],
+    awesome_spec: tuple[Path, str | None],
+    source_opener: SourceOpener | None,
+) -> tuple[SourceTree, SourceTree]:
+    """Open the plugin sources and the awesome-copilot source; return the merged plugin tree and the latter.
+
+    Sources opened here are closed with ``stack``. A ``source_opener`` keeps ownership of what it
+    returns, which lets the resident server reuse its sources across runs.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .sources import PluginOverlay, open_source
 
-    decisions = process_plugins(plugin_dirs, output_root, args)
-    awesome_decision = process_awesome_meta_agent(awesome_source, output_root)
-    if awesome_decision is not None:
-        decisions.append(awesome_decision)
-    write_marketplace_manifest(Path.cwd(), output_root)
+    # Opening indexes archives and git trees, so all sources are opened side by side.
+    with ThreadPoolExecutor() as pool:
+        futures = [pool.submit(source_opener or open_source, *spec) for spec in [*plugin_sources, awesome_spec]]
+    if source_opener is None:
+        # Close the sources that did open even when another one failed.
+        for future in futures:
+            if future.exception() is None:
+                stack.enter_context(future.result())
+    opened = [future.result() for future in futures]
+    awesome_source = opened.pop()
+    if len(opened) == 1:
+        return opened[0], awesome_source
+    overlay = PluginOverlay(opened)
+    for name, shadowed in sorted(overlay.shadowed.items()):
+        winner = overlay.display(PurePosixPath("plugins") / name)
+        for location in shadowed:
+            print(f"warning: plugin {name!r} from {location} is shadowed by {winner}", file=sys.stderr)
+    return overlay, awesome_source
 
+
+def _check_only(
+    only: list[str], agents_source: SourceTree, awesome_source: SourceTree, awesome_import: AwesomeImport | None
+) -> None:
+    from .awesome import select_collections
+    from .processing import AWESOME_META_PLUGIN, iter_plugin_dirs
+
+    known = {path.name for path in iter_plugin_dirs(agents_source, None)} | {AWESOME_META_PLUGIN}
+    if awesome_import is not None:
+        known.update(collection.plugin_name for collection in select_collections(awesome_source, awesome_import))
+    unknown = sorted(set(only) - known)
+    if unknown:
+        raise SystemExit(f"Unknown plugin(s) for --only: {', '.join(unknown)}")
+
+
+def _decision_recorders(
+    args: argparse.Namespace, barrier: SyncBarrier | None, output_root: Path
+) -> list[DecisionLogWriter | DecisionDatabase]:
+    """Return the decision log and decision database writers the run asked for; none for a plan."""
+    from .decision_db import DecisionDatabase
+    from .processing import DecisionLogWriter
+
+    if args.plan:
+        return []
+    recorders: list[DecisionLogWriter | DecisionDatabase] = []
     if args.decision_log:
-        write_decision_log(Path(args.decision_log), decisions)
+        recorders.append(DecisionLogWriter(Path(args.decision_log), barrier))
+    if args.decision_db:
+        recorders.append(DecisionDatabase(Path(args.decision_db), label=str(output_root), durable=barrier is not None))
+    return recorders
 
-    return 0
+
+def _open_sink(
+    args: argparse.Namespace, barrier: SyncBarrier | None, stack: ExitStack
+) -> tuple[DirectorySink | GitFastImportSink | PlanSink, Path, Path]:
+    """Return the output sink, the publish root it writes below and the output folder.
+
+    With ``--plan`` the sink only records writes over the current output, read from the work tree or
+    from the ``--git-repo`` branch; that source is closed with ``stack``.
+    """
+    from .git_ops import GitFastImportSink
+    from .plan import PlanSink
+    from .sinks import DirectorySink
+    from .sources import DirectorySource, GitSource, MemorySource
+
+    if args.git_repo:
+        workspace_root = resolve_source(args.git_repo)
+        output_root = Path(args.output).expanduser().resolve()
+        if args.plan:
+            require_repository(workspace_root)
+            commit = resolve_commit(workspace_root, branch_ref(workspace_root, args.git_branch))
+            current: SourceTree = GitSource(workspace_root, commit) if commit else MemorySource({})
+            return PlanSink(stack.enter_context(current)), workspace_root, output_root
+        return (
+            GitFastImportSink(workspace_root, branch=args.git_branch, message=args.git_message),
+            workspace_root,
+            output_root,
+        )
+    workspace_root = Path.cwd()
+    if args.plan:
+        return PlanSink(DirectorySource(workspace_root)), workspace_root, Path(args.output).expanduser().resolve()
+    return DirectorySink(workspace_root, barrier), workspace_root, resolve_output_root(args.output)
+
+
+def _report_plan(plan: PlanSink, as_json: bool) -> None:
+    from dataclasses import asdict
+
+    from .merkle import format_change, summarize_changes
+
+    changes = plan.changes()
+    if as_json:
+        payload = {"files": [asdict(item) for item in plan.files()], "changes": [asdict(item) for item in changes]}
+        print(json.dumps(payload, indent=2))
+        return
+    for change in changes:
+        print(format_change(change))
+    counts = summarize_changes(changes)
+    print(f"plan: {', '.join(f'{count} {status}' for status, count in counts.items())}", file=sys.stderr)
+
+
+def _report_run(
+    result: ConversionResult, saved: list[dict[str, int]], render_cache: DiskRenderCache | None = None
+) -> None:
+    from .merkle import summarize_changes
+
+    if saved:
+        total_bytes = sum(item["bytes"] for item in saved)
+        total_tokens = sum(item["tokens"] for item in saved)
+        files = sum(item["files"] for item in saved)
+        print(f"slim profile saved {total_bytes} bytes (~{total_tokens} tokens) across {files} files", file=sys.stderr)
+    if result.output_changes is not None:
+        counts = summarize_changes(result.output_changes)
+        print(f"output changes: {', '.join(f'{count} {status}' for status, count in counts.items())}", file=sys.stderr)
+    if render_cache is not None:
+        stats = render_cache.stats()
+        print(
+            f"render cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evicted']} evicted",
+            file=sys.stderr,
+        )
+    for entry in result.over_budget:
+        limit = f"{entry['kind']} budget of {entry['budget']}"
+        print(f"warning: {entry['path']} is ~{entry['tokens']} tokens, over the {limit}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,350 @@
+"""Bulk import of ``github/awesome-copilot`` collections as marketplace plugins.
+
+Every ``collections/<id>.collection.yml`` becomes the plugin ``awesome-<id>``: its agents, prompts
+(as commands), skills and instructions (as skills) are converted with the same builders as the main
+path, so the render caches apply. Assets listed by several collections are read and rendered once
+and written to every plugin that lists them. Files are converted in parallel; decision records
+follow once everything is written.
+"""
+
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import PurePosixPath
+from typing import Callable, Iterator
+
+from .builders import (
+    build_agent_file,
+    build_enhanced_prompt_file,
+    build_skill_file,
+    extract_relative_link_targets,
+    plan_missing_local_links,
+    render_plugin_manifest,
+    render_skill,
+    write_plugin_readme,
+)
+from .models import DecisionRecord
+from .sinks import OutputSink, write_sink_text
+from .sources import ROOT, SourceTree, list_files, read_source_text
+
+AWESOME_PLUGIN_PREFIX = "awesome-"
+COLLECTIONS_DIR = ROOT / "collections"
+COLLECTION_SUFFIXES = (".collection.yml", ".collection.yaml")
+AWESOME_REPOSITORY = "https://github.com/github/awesome-copilot"
+
+# Item kind -> (output folder, source suffix stripped from the output name).
+_ITEM_KINDS = {
+    "agent": ("agents", ".agent.md"),
+    "prompt": ("commands", ".prompt.md"),
+    "instruction": ("skills", ".instructions.md"),
+    "skill": ("skills", ""),
+}
+# (destination, rendered markdown, source display path) of a skill written without placeholders.
+_LinkedSkill = tuple[PurePosixPath, str, str]
+_NAME_GROUPS = {"agent": "agent", "prompt": "command", "instruction": "skill", "skill": "skill"}
+
+
+@dataclass(frozen=True)
+class AwesomeImport:
+    """Which collections to import: ``include``/``exclude`` are glob patterns over collection ids."""
+
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+    workers: int | None = None
+
+    def selects(self, collection_id: str) -> bool:
+        included = not self.include or any(fnmatch.fnmatchcase(collection_id, item) for item in self.include)
+        return included and not any(fnmatch.fnmatchcase(collection_id, item) for item in self.exclude)
+
+
+@dataclass(frozen=True)
+class AwesomeCollection:
+    id: str
+    name: str
+    description: str
+    tags: tuple[str, ...]
+    items: tuple[tuple[str, PurePosixPath], ...]  # (kind, source path)
+    path: PurePosixPath
+
+    @property
+    def plugin_name(self) -> str:
+        return f"{AWESOME_PLUGIN_PREFIX}{self.id}"
+
+
+def _scalar(value: str) -> str:
+    value = value.strip()
+    quote = value[:1]
+    if quote in ("'", '"') and (end := value.find(quote, 1)) > 0:
+        return value[1:end]
+    return value.split(" #", 1)[0].strip()
+
+
+def parse_collection_manifest(text: str) -> dict[str, object]:
+    """Parse the subset of YAML collection manifests use.
+
+    Top-level scalars, ``tags`` as a flow or block list and ``items`` as a block list of mappings are
+    read; block scalars (``usage: |``) and other nested mappings are skipped.
+    """
+    manifest: dict[str, object] = {}
+    items: list[dict[str, str]] = []
+    key: str | None = None
+    block_indent: int | None = None
+    for raw in text.splitlines():
+        stripped = raw.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(raw) - len(raw.lstrip(" "))
+        if block_indent is not None and indent > block_indent:
+            continue
+        block_indent = None
+        if indent == 0:
+            name, _, value = stripped.partition(":")
+            key, value = name.strip(), value.strip()
+            if value.startswith("[") and value.endswith("]"):
+                manifest[key] = [_scalar(item) for item in value[1:-1].split(",") if item.strip()]
+            elif value and value not in ("|", ">", "|-", ">-"):
+                manifest[key] = _scalar(value)
+            elif value:
+                block_indent = indent
+            continue
+        if key == "tags" and stripped.startswith("- "):
+            tags = manifest.setdefault("tags", [])
+            if isinstance(tags, list):
+                tags.append(_scalar(stripped[2:]))
+        elif key == "items":
+            if stripped.startswith("- "):
+                items.append({})
+                stripped = stripped[2:].strip()
+                indent += 2
+            name, _, value = stripped.partition(":")
+            if items and value.strip() in ("|", ">", "|-", ">-"):
+                block_indent = indent
+            elif items:
+                items[-1][name.strip()] = _scalar(value)
+    manifest["items"] = items
+    return manifest
+
+
+def load_collections(source: SourceTree) -> list[AwesomeCollection]:
+    collections: list[AwesomeCollection] = []
+    for path in list_files(source, COLLECTIONS_DIR):
+        suffix = next((suffix for suffix in COLLECTION_SUFFIXES if path.name.endswith(suffix)), None)
+        if suffix is None:
+            continue
+        manifest = parse_collection_manifest(read_source_text(source, path))
+        raw_items = manifest.get("items")
+        items = tuple(
+            (item["kind"], PurePosixPath(item["path"].rstrip("/")))
+            for item in (raw_items if isinstance(raw_items, list) else [])
+            if item.get("kind") in _ITEM_KINDS and item.get("path")
+        )
+        tags = manifest.get("tags")
+        collection_id = str(manifest.get("id") or path.name.removesuffix(suffix))
+        collections.append(
+            AwesomeCollection(
+                id=collection_id,
+                name=str(manifest.get("name") or collection_id),
+                description=str(manifest.get("description") or f"Imported from awesome-copilot ({collection_id})."),
+                tags=tuple(str(tag) for tag in tags) if isinstance(tags, list) else (),
+                items=items,
+                path=path,
+            )
+        )
+    return sorted(collections, key=lambda collection: collection.id)
+
+
+def select_collections(source: SourceTree, options: AwesomeImport) -> list[AwesomeCollection]:
+    return [collection for collection in load_collections(source) if options.selects(collection.id)]
+
+
+def _output_name(kind: str, path: PurePosixPath) -> str:
+    suffix = _ITEM_KINDS[kind][1]
+    if suffix and path.name.endswith(suffix):
+        return path.name.removesuffix(suffix)
+    return path.stem if kind != "skill" else path.name
+
+
+def _destination(plugin_dir: PurePosixPath, kind: str, path: PurePosixPath) -> PurePosixPath:
+    folder, _ = _ITEM_KINDS[kind]
+    name = _output_name(kind, path)
+    if kind in ("skill", "instruction"):
+        return plugin_dir / folder / name / "SKILL.md"
+    return plugin_dir / folder / f"{name}.md"
+
+
+class _FanOutSink:
+    """Write the single file a builder produces to each of ``destinations``."""
+
+    def __init__(self, sink: OutputSink, destinations: list[PurePosixPath]) -> None:
+        self.sink = sink
+        self.destinations = destinations
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        for destination in self.destinations:
+            self.sink.write_bytes(destination, data, executable=executable)
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        return self.sink.read_bytes(path)
+
+    def exists(self, path: PurePosixPath) -> bool:
+        return self.sink.exists(path)
+
+    def clear(self, path: PurePosixPath) -> None:
+        self.sink.clear(path)
+
+    def display(self, path: PurePosixPath) -> str:
+        return self.sink.display(path)
+
+    def close(self) -> None:
+        return None
+
+
+def _build_instruction_skill(
+    source: SourceTree, instruction_path: PurePosixPath, sink: OutputSink, destination: PurePosixPath
+) -> str:
+    content = read_source_text(source, instruction_path)
+    rendered = render_skill(content, destination.parent.name)
+    write_sink_text(sink, destination, rendered)
+    return rendered
+
+
+_FILE_BUILDERS: dict[str, Callable[[SourceTree, PurePosixPath, OutputSink, PurePosixPath], str | None]] = {
+    "agent": build_agent_file,
+    "prompt": build_enhanced_prompt_file,
+    "instruction": _build_instruction_skill,
+}
+
+
+def iter_awesome_decisions(
+    source: SourceTree,
+    collections: list[AwesomeCollection],
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    workers: int | None = None,
+    split_token_limit: int | None = None,
+) -> Iterator[DecisionRecord]:
+    """Convert ``collections`` into plugins, then yield one decision record per plugin.
+
+    Agents, prompts and instructions are rendered once per source file and written to every plugin
+    listing them. Skills are built per plugin with their support folders. Link placeholders are
+    written last, once every real file exists, so they only fill genuine gaps.
+    """
+    fan_out: dict[tuple[str, PurePosixPath], list[PurePosixPath]] = {}
+    skills: dict[PurePosixPath, PurePosixPath] = {}
+    names: dict[str, dict[str, set[str]]] = {}
+    claimed: set[PurePosixPath] = set()
+    for collection in collections:
+        plugin_dir = output_root / collection.plugin_name
+        plugin_names = names[collection.plugin_name] = {"agent": set(), "command": set(), "skill": set()}
+        for kind, path in collection.items:
+            destination = _destination(plugin_dir, kind, path)
+            source_file = path / "SKILL.md" if kind == "skill" else path
+            # The first item listed for an output path wins; later ones would overwrite it.
+            if destination in claimed or not source.is_file(source_file):
+                continue
+            claimed.add(destination)
+            if kind == "skill":
+                skills[destination] = source_file
+            else:
+                fan_out.setdefault((kind, path), []).append(destination)
+            group = _NAME_GROUPS[kind]
+            plugin_names[group].add(destination.parent.name if group == "skill" else destination.stem)
+
+    def build_file(kind: str, path: PurePosixPath, destinations: list[PurePosixPath]) -> list[_LinkedSkill]:
+        rendered = _FILE_BUILDERS[kind](source, path, _FanOutSink(sink, destinations), destinations[0])
+        return [(destination, rendered, source.display(path)) for destination in destinations if rendered]
+
+    def build_skill(skill_file: PurePosixPath, destination: PurePosixPath) -> list[_LinkedSkill]:
+        rendered = build_skill_file(source, skill_file, sink, destination, split_token_limit)
+        return [(destination, rendered, source.display(skill_file))]
+
+    jobs: list[Callable[[], list[_LinkedSkill]]] = [
+        partial(build_file, kind, path, destinations) for (kind, path), destinations in fan_out.items()
+    ]
+    jobs.extend(partial(build_skill, skill_file, destination) for destination, skill_file in skills.items())
+    with ThreadPoolExecutor(workers) as pool:
+        # Only skills with relative links are kept for the placeholder pass.
+        linked = [
+            skill
+            for built in pool.map(lambda job: job(), jobs)
+            for skill in built
+            if extract_relative_link_targets(skill[1])
+        ]
+
+    # Every real file is written now, so placeholders only fill genuine gaps.
+    placeholders: set[PurePosixPath] = set()
+    written: dict[str, list[str]] = {}
+
+    def exists(path: PurePosixPath) -> bool:
+        return path in placeholders or sink.exists(path)
+
+    for destination, rendered, source_display in sorted(linked):
+        plugin = destination.relative_to(output_root).parts[0]
+        for target, content in plan_missing_local_links(destination, rendered, source_display, exists):
+            placeholders.update([target, *target.parents])
+            write_sink_text(sink, target, content)
+            written.setdefault(plugin, []).append(sink.display(target))
+
+    for collection in collections:
+        plugin_names = names[collection.plugin_name]
+        placeholder_paths = written.get(collection.plugin_name, [])
+        yield _write_collection_plugin(source, collection, sink, output_root, plugin_names, placeholder_paths)
+
+
+def _write_collection_plugin(
+    source: SourceTree,
+    collection: AwesomeCollection,
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    names: dict[str, set[str]],
+    placeholders: list[str],
+) -> DecisionRecord:
+    plugin_dir = output_root / collection.plugin_name
+    manifest: dict[str, object] = {
+        "name": collection.plugin_name,
+        "description": collection.description,
+        "version": "1.0.0",
+        "author": {"name": "Awesome Copilot Community"},
+        "repository": AWESOME_REPOSITORY,
+        "license": "MIT",
+    }
+    if collection.tags:
+        manifest["keywords"] = list(collection.tags)
+    manifest_path = plugin_dir / ".github" / "plugin" / "plugin.json"
+    write_sink_text(sink, manifest_path, render_plugin_manifest(manifest))
+    agent_names, command_names, skill_names = (sorted(names[group]) for group in ("agent", "command", "skill"))
+    write_plugin_readme(
+        sink=sink,
+        plugin_dir=plugin_dir,
+        manifest=manifest,
+        command_names=command_names,
+        agent_names=agent_names,
+        skill_names=skill_names,
+    )
+    prompts = [sink.display(plugin_dir / "commands" / f"{name}.md") for name in command_names]
+    return DecisionRecord(
+        plugin=collection.plugin_name,
+        classification="copilot-plugin",
+        mapping_entries=[],
+        outputs=[
+            sink.display(manifest_path),
+            sink.display(plugin_dir / "README.md"),
+            *(sink.display(plugin_dir / "agents" / f"{name}.md") for name in agent_names),
+            *(sink.display(plugin_dir / "skills" / name / "SKILL.md") for name in skill_names),
+            *prompts,
+        ],
+        prompts=prompts,
+        agents=agent_names,
+        commands=command_names,
+        skills=skill_names,
+        plugin_path=source.display(collection.path),
+        selected_agent=None,
+        agent_persona_preview=None,
+        command_previews=[],
+        skill_previews=[],
+        notes=f"Imported from github/awesome-copilot collection {collection.id!r}.",
+        reasons=["import_awesome_copilot_collection"],
+        command_neighbors=[],
+        placeholders=placeholders,
+    )
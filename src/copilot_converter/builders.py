@@ -1,10 +1,13 @@
 import json
+import posixpath
 import re
-import shutil
-from pathlib import Path
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import PurePosixPath
+from typing import Callable, Iterator
 
-from .constants import ARGUMENTS_TOKEN, FRONTMATTER_DELIM, PROMPT_INPUT_TOKEN, SKILL_GLOB
-from .file_ops import read_text, write_text
+from .constants import ARGUMENTS_TOKEN, FRONTMATTER_DELIM, PROMPT_INPUT_TOKEN
+from .file_ops import decode_text
 from .frontmatter import (
     extract_intro,
     parse_simple_frontmatter,
@@ -12,7 +15,11 @@ from .frontmatter import (
     split_frontmatter,
     yaml_quote,
 )
-from .persona import safe_preview
+from .persona import safe_stream_preview
+from .render_cache import DiskRenderCache
+from .sinks import OutputSink, write_sink_text, write_split_section
+from .sources import SourceTree, load_source_json, read_source_text, walk_files
+from .tokens import estimate_tokens
 
 SUPPORT_DIR_NAMES = (
     "assets",
@@ -24,6 +31,63 @@ SUPPORT_DIR_NAMES = (
 
 _MARKDOWN_LINK_RE = re.compile(r"\[[^\]]+\]\(([^)]+)\)")
 
+# Renders are pure functions of their inputs, so a resident process can reuse them across runs.
+RENDER_CACHE_SIZE = 2048
+
+
+_disk_cache: DiskRenderCache | None = None
+
+
+class _RenderCache:
+    """Memoize a renderer once ``enable`` is called, and consult the disk cache while one is in use.
+
+    Memory caching is off by default: a one-shot run renders each file once, and the cache keys hold
+    whole source texts, so memory would grow with the tree for nothing. The resident server enables it.
+    """
+
+    def __init__(self, render: Callable[..., str]) -> None:
+        self._render = render
+        self._cached: Callable[..., str] | None = None
+
+    def __call__(self, *args: object) -> str:
+        return (self._cached or self._render_through_disk)(*args)
+
+    def _render_through_disk(self, *args: object) -> str:
+        store = _disk_cache
+        if store is None:
+            return self._render(*args)
+        return store.render(self._render.__qualname__, self._render, args)
+
+    def enable(self, maxsize: int = RENDER_CACHE_SIZE) -> None:
+        if self._cached is None:
+            self._cached = lru_cache(maxsize=maxsize)(self._render_through_disk)
+
+    def stats(self) -> dict[str, int | None]:
+        if self._cached is None:
+            return {"hits": 0, "misses": 0, "maxsize": 0, "currsize": 0}
+        return self._cached.cache_info()._asdict()  # type: ignore[attr-defined]
+
+
+def enable_render_caches(maxsize: int = RENDER_CACHE_SIZE) -> None:
+    _ensure_frontmatter_name.enable(maxsize)
+    _ensure_prompt_header.enable(maxsize)
+
+
+def render_cache_stats() -> dict[str, dict[str, int | None]]:
+    """Return the in-memory render cache counters for agents and skills, and for commands."""
+    return {"agents_and_skills": _ensure_frontmatter_name.stats(), "commands": _ensure_prompt_header.stats()}
+
+
+@contextmanager
+def disk_render_cache(cache: DiskRenderCache | None) -> Iterator[None]:
+    """Serve prompt, skill, placeholder and text-path agent renders from ``cache`` inside the block."""
+    global _disk_cache
+    previous, _disk_cache = _disk_cache, cache
+    try:
+        yield
+    finally:
+        _disk_cache = previous
+
 
 def _ensure_trailing_newline(content: str) -> str:
     return content if content.endswith("\n") else content + "\n"
@@ -57,6 +121,7 @@ def _append_frontmatter_key(frontmatter: str, key: str, value: str) -> str:
     return "\n".join(lines)
 
 
+@_RenderCache
 def _ensure_frontmatter_name(content: str, name: str) -> str:
     split = split_frontmatter(content)
     if split.frontmatter is None:
@@ -84,14 +149,82 @@ def _ensure_frontmatter_name(content: str, name: str) -> str:
     return _ensure_trailing_newline(rendered)
 
 
-def build_agent_file(agent_path: Path, destination: Path) -> None:
+# Line breaks ``str.splitlines`` honours besides "\n", and whitespace ``str.strip`` removes that
+# ``bytes.strip`` keeps; text containing them takes the text path.
+# Plain substring checks, as a regex scans these several times slower.
+_OTHER_LINE_BREAKS = tuple(b"\r\x0b\x0c\x1c\x1d\x1e")
+_OTHER_UNICODE_LINE_BREAKS = ("\x85", "\u2028", "\u2029")
+_ASCII_SPACE = frozenset(b" \t\n")
+_TEXT_ONLY_SPACE = frozenset(b"\x1c\x1d\x1e\x1f")
+
+
+def _ensure_frontmatter_name_bytes(data: bytes, name: str) -> bytes | None:
+    """Render ``_ensure_frontmatter_name`` on raw bytes, rewriting only the frontmatter lines.
+
+    The body is copied into the result once instead of being split, joined and re-encoded. Returns
+    None when the result could differ from the text path: line breaks other than "\n", or non-ASCII
+    or separator whitespace at either end of the body.
+    """
+    if any(separator in data for separator in _OTHER_LINE_BREAKS):
+        return None
+    # Decoding rejects invalid UTF-8 as the text path does; the text itself is not needed after.
+    if not data.isascii() and any(separator in data.decode("utf-8") for separator in _OTHER_UNICODE_LINE_BREAKS):
+        return None
+    size = len(data)
+    frontmatter: list[str] | None = None
+    body_start = 0
+    first_end = data.find(b"\n")
+    first_end = size if first_end < 0 else first_end
+    if data and data.find(b"---", first_end) >= 0 and data[:first_end].decode("utf-8").strip() == FRONTMATTER_DELIM:
+        lines: list[str] = []
+        position = first_end + 1
+        while position < size:
+            end = data.find(b"\n", position)
+            end = size if end < 0 else end
+            line = data[position:end].decode("utf-8")
+            if line.strip() == FRONTMATTER_DELIM:
+                frontmatter, body_start = lines, end + 1
+                break
+            lines.append(line)
+            position = end + 1
+
+    body_end = size
+    while body_start < body_end and data[body_start] in _ASCII_SPACE:
+        body_start += 1
+    while body_end > body_start and data[body_end - 1] in _ASCII_SPACE:
+        body_end -= 1
+    body = memoryview(data)[body_start:body_end]
+    if body and (body[0] >= 0x80 or body[-1] >= 0x80 or body[0] in _TEXT_ONLY_SPACE or body[-1] in _TEXT_ONLY_SPACE):
+        return None
+
+    if frontmatter is None:
+        header = f"name: {yaml_quote(name)}"
+    else:
+        header = _replace_or_add_name("\n".join(frontmatter).strip(), name)
+    head = "\n".join([FRONTMATTER_DELIM, header, FRONTMATTER_DELIM, "", ""]).encode("utf-8")
+    return b"".join([head, body, b"\n"]) if body else head
+
+
+def render_agent_bytes(data: bytes, name: str) -> bytes:
+    """Return an agent file with its frontmatter ``name`` set, as ``_ensure_frontmatter_name`` renders it."""
+    rendered = _ensure_frontmatter_name_bytes(data, name)
+    if rendered is None:
+        rendered = _ensure_frontmatter_name(decode_text(data), name).encode("utf-8")
+    return rendered
+
+
+def build_agent_file(
+    source: SourceTree,
+    agent_path: PurePosixPath,
+    sink: OutputSink,
+    destination: PurePosixPath,
+) -> None:
     """Copy plugin agent files for Copilot plugin output."""
-    generated_name = destination.stem
-    content = read_text(agent_path)
-    write_text(destination, _ensure_frontmatter_name(content, generated_name))
+    sink.write_bytes(destination, render_agent_bytes(source.read_bytes(agent_path), destination.stem))
 
 
-def _ensure_prompt_header(command_path: Path, content: str, prompt_name: str) -> str:
+@_RenderCache
+def _ensure_prompt_header(command_path: PurePosixPath, content: str, prompt_name: str) -> str:
     split = split_frontmatter(content)
 
     if split.frontmatter is not None:
@@ -132,19 +265,50 @@ def _ensure_prompt_header(command_path: Path, content: str, prompt_name: str) ->
     return _ensure_trailing_newline(rendered)
 
 
-def build_enhanced_prompt_file(command_path: Path, destination: Path) -> None:
-    content = read_text(command_path)
-    prompt_name = destination.stem
-    rendered = _ensure_prompt_header(command_path, content, prompt_name)
-    write_text(destination, rendered)
+def render_prompt(command_path: PurePosixPath, content: str, prompt_name: str) -> str:
+    """Return a command as a Copilot prompt file named ``prompt_name``."""
+    return _ensure_prompt_header(command_path, content, prompt_name)
+
+
+def render_skill(content: str, skill_name: str) -> str:
+    """Return a skill with its frontmatter ``name`` set to ``skill_name``."""
+    return _ensure_frontmatter_name(content, skill_name)
+
+
+def build_enhanced_prompt_file(
+    source: SourceTree,
+    command_path: PurePosixPath,
+    sink: OutputSink,
+    destination: PurePosixPath,
+) -> None:
+    content = read_source_text(source, command_path)
+    write_sink_text(sink, destination, render_prompt(command_path, content, destination.stem))
 
 
-def copy_support_dirs(source_skill_dir: Path, destination_dir: Path) -> None:
+def support_files(
+    source: SourceTree, source_skill_dir: PurePosixPath, destination_dir: PurePosixPath
+) -> list[tuple[PurePosixPath, PurePosixPath, bool]]:
+    """Return ``(source path, destination, executable)`` for every bundled resource of a skill."""
+    files: list[tuple[PurePosixPath, PurePosixPath, bool]] = []
     for name in SUPPORT_DIR_NAMES:
         source_dir = source_skill_dir / name
-        if not source_dir.exists() or not source_dir.is_dir():
+        if not source.is_dir(source_dir):
             continue
-        shutil.copytree(source_dir, destination_dir / name, dirs_exist_ok=True)
+        files.extend(
+            (path, destination_dir / path.relative_to(source_skill_dir), source.is_executable(path))
+            for path in walk_files(source, source_dir)
+        )
+    return files
+
+
+def copy_support_dirs(
+    source: SourceTree,
+    source_skill_dir: PurePosixPath,
+    sink: OutputSink,
+    destination_dir: PurePosixPath,
+) -> None:
+    for path, destination, executable in support_files(source, source_skill_dir, destination_dir):
+        sink.write_bytes(destination, source.read_bytes(path), executable=executable)
 
 
 def _is_relative_link_target(value: str) -> bool:
@@ -157,7 +321,8 @@ def _is_relative_link_target(value: str) -> bool:
     return True
 
 
-def _extract_relative_link_targets(markdown: str) -> set[str]:
+def extract_relative_link_targets(markdown: str) -> set[str]:
+    """Return the relative link targets in ``markdown``, without anchors."""
     targets: set[str] = set()
     for raw_target in _MARKDOWN_LINK_RE.findall(markdown):
         token = raw_target.strip().split()[0]
@@ -167,9 +332,10 @@ def _extract_relative_link_targets(markdown: str) -> set[str]:
     return targets
 
 
+@_RenderCache
 def _placeholder_content(
-    target: Path,
-    source_skill_path: Path,
+    target: PurePosixPath,
+    source_skill_path: str,
     link_target: str,
 ) -> str:
     note = (
@@ -217,102 +383,190 @@ def _placeholder_content(
     return f"Placeholder generated by converter.\n{note}\n"
 
 
-def _materialize_missing_local_links(
-    destination: Path,
+def resolve_link_target(skill_root: PurePosixPath, link_target: str) -> PurePosixPath:
+    """Resolve a relative link target against the folder of the file that holds it."""
+    return PurePosixPath(posixpath.normpath(posixpath.join(skill_root, link_target)))
+
+
+def plan_missing_local_links(
+    destination: PurePosixPath,
     skill_markdown: str,
-    source_skill_path: Path,
-) -> None:
+    source_skill_path: str,
+    exists: Callable[[PurePosixPath], bool],
+) -> list[tuple[PurePosixPath, str]]:
+    """Return placeholder files for local links in a skill that ``exists`` reports as missing."""
     skill_root = destination.parent
     skills_root = skill_root.parent
-    for link_target in sorted(_extract_relative_link_targets(skill_markdown)):
-        resolved_target = (skill_root / link_target).resolve()
-        if resolved_target.exists():
+    planned: set[PurePosixPath] = set()
+    placeholders: list[tuple[PurePosixPath, str]] = []
+    for link_target in sorted(extract_relative_link_targets(skill_markdown)):
+        resolved_target = resolve_link_target(skill_root, link_target)
+        if resolved_target in planned or exists(resolved_target):
             continue
-        try:
-            resolved_target.relative_to(skills_root.resolve())
-        except ValueError:
+        if not resolved_target.is_relative_to(skills_root):
             continue
         placeholder = _placeholder_content(resolved_target, source_skill_path, link_target)
-        write_text(resolved_target, _ensure_trailing_newline(placeholder))
-
-
-def build_skill_file(skill_path: Path, destination: Path) -> None:
-    """Copy plugin skill files and preserve bundled skill resources."""
-    generated_name = destination.parent.name
-    content = read_text(skill_path)
-    rendered_skill = _ensure_frontmatter_name(content, generated_name)
-    write_text(destination, rendered_skill)
-    copy_support_dirs(skill_path.parent, destination.parent)
-    _materialize_missing_local_links(destination, rendered_skill, skill_path)
-
-
-def build_commands_for_plugin(
-    plugin_path: Path,
-    commands_dir: Path,
-    command_files: list[Path] | None = None,
-) -> tuple[list[str], list[dict[str, str]]]:
-    outputs: list[str] = []
-    previews: list[dict[str, str]] = []
-    files = (
-        sorted(command_files, key=lambda p: p.name)
-        if command_files is not None
-        else sorted((plugin_path / "commands").glob("*.md"), key=lambda p: p.name)
-    )
+        placeholders.append((resolved_target, _ensure_trailing_newline(placeholder)))
+        planned.update([resolved_target, *resolved_target.parents])
+    return placeholders
 
-    for command_file in files:
-        destination = commands_dir / f"{command_file.stem}.md"
-        build_enhanced_prompt_file(command_file, destination)
-        outputs.append(str(destination))
-        previews.append(
-            {
-                "name": command_file.name,
-                "path": str(command_file),
-                "preview": safe_preview(read_text(command_file)),
-            }
-        )
 
-    return outputs, previews
+_SECTION_HEADING_RE = re.compile(r"^## +(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^ {0,3}(```|~~~)")
+_LINK_TARGET_RE = re.compile(r"(\[[^\]]+\]\(\s*)([^)\s]+)")
+SPLIT_REFERENCES_DIR = "references"
 
 
-def collect_skill_previews(plugin_path: Path) -> list[dict[str, str]]:
-    previews: list[dict[str, str]] = []
-    for skill_file in (plugin_path / "skills").glob(SKILL_GLOB):
-        split = split_frontmatter(read_text(skill_file))
-        previews.append(
-            {
-                "name": skill_file.parent.name,
-                "path": str(skill_file),
-                "preview": safe_preview(split.body),
-            }
-        )
-    return previews
+def _split_sections(body: str) -> tuple[str, list[tuple[str, str]]]:
+    """Split markdown at level-two headings outside code fences into a preamble and sections."""
+    preamble: list[str] = []
+    sections: list[tuple[str, list[str]]] = []
+    fence: str | None = None
+    for line in body.splitlines():
+        fence_match = _FENCE_RE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            fence = None if fence == marker else fence or marker
+        heading = None if fence else _SECTION_HEADING_RE.match(line)
+        if heading:
+            sections.append((heading.group(1), [line]))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+    return "\n".join(preamble).strip(), [(title, "\n".join(lines).strip()) for title, lines in sections]
+
+
+def _rebase_relative_links(markdown: str, prefix: str) -> str:
+    def rebase(match: re.Match[str]) -> str:
+        target = match.group(2)
+        if not _is_relative_link_target(target.split("#", 1)[0]):
+            return match.group(0)
+        return f"{match.group(1)}{prefix}{target}"
+
+    return _LINK_TARGET_RE.sub(rebase, markdown)
+
+
+def _section_slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "section"
+
+
+def split_skill_markdown(
+    destination: PurePosixPath,
+    skill_markdown: str,
+    token_limit: int,
+    exists: Callable[[PurePosixPath], bool],
+) -> tuple[str, list[tuple[PurePosixPath, str]]]:
+    """Split a rendered skill over ``token_limit`` into a core file and reference sections.
+
+    Level-two sections are kept in the core while it fits the limit; the first section that does
+    not fit and every section after it move to ``references/<slug>.md`` and are linked from an
+    index at the end of the core. Paths that ``exists`` reports are never reused.
+    """
+    if estimate_tokens(skill_markdown) <= token_limit:
+        return skill_markdown, []
+    split = split_frontmatter(skill_markdown)
+    preamble, sections = _split_sections(split.body)
+    if not sections:
+        return skill_markdown, []
+
+    header = [FRONTMATTER_DELIM, split.frontmatter, FRONTMATTER_DELIM, ""] if split.frontmatter is not None else []
+    kept = [*header, preamble] if preamble else header
+    index_heading = ["", "## Reference Sections", "", "Read a section only when the task needs it:", ""]
+    index_costs = [
+        estimate_tokens(f"- [{title}]({SPLIT_REFERENCES_DIR}/{_section_slug(title)}.md)") + 1 for title, _ in sections
+    ]
+    used = estimate_tokens("\n".join([*kept, *index_heading]))
+    for position, (_, section) in enumerate(sections):
+        cost = estimate_tokens(section) + 1
+        if used + cost + sum(index_costs[position + 1 :]) > token_limit:
+            break
+        kept.extend(["", section])
+        used += cost
+    else:
+        return skill_markdown, []
+
+    references_dir = destination.parent / SPLIT_REFERENCES_DIR
+    taken: set[PurePosixPath] = set()
+    index_lines: list[str] = []
+    split_files: list[tuple[PurePosixPath, str]] = []
+    for title, section in sections[position:]:
+        slug = _section_slug(title)
+        target = references_dir / f"{slug}.md"
+        counter = 2
+        while target in taken or exists(target):
+            target = references_dir / f"{slug}-{counter}.md"
+            counter += 1
+        taken.add(target)
+        relative = target.relative_to(destination.parent)
+        index_lines.append(f"- [{title}]({relative})")
+        split_files.append((target, _ensure_trailing_newline(_rebase_relative_links(section, "../"))))
+
+    core = "\n".join([*kept, *index_heading, *index_lines])
+    return _ensure_trailing_newline(core), split_files
+
+
+def render_skill_files(
+    content: str,
+    destination: PurePosixPath,
+    split_token_limit: int | None,
+    exists: Callable[[PurePosixPath], bool],
+) -> tuple[str, list[tuple[PurePosixPath, str]]]:
+    """Render a skill; return the whole rendered skill and the files to write for it.
+
+    The files are the skill itself followed, with ``split_token_limit``, by its reference sections
+    (see ``split_skill_markdown``).
+    """
+    rendered_skill = render_skill(content, destination.parent.name)
+    if split_token_limit is None:
+        return rendered_skill, [(destination, rendered_skill)]
+    core, split_files = split_skill_markdown(destination, rendered_skill, split_token_limit, exists)
+    return rendered_skill, [(destination, core), *split_files]
+
+
+def build_skill_file(
+    source: SourceTree,
+    skill_path: PurePosixPath,
+    sink: OutputSink,
+    destination: PurePosixPath,
+    split_token_limit: int | None = None,
+) -> str:
+    """Copy plugin skill files and preserve bundled skill resources; return the rendered skill.
+
+    With ``split_token_limit`` an oversized skill is written as a core file plus reference sections.
+    Link placeholders are left to the caller, which writes them once all files are known.
+    """
+    content = read_source_text(source, skill_path)
+    copy_support_dirs(source, skill_path.parent, sink, destination.parent)
+    rendered_skill, [(_, core), *sections] = render_skill_files(content, destination, split_token_limit, sink.exists)
+    write_sink_text(sink, destination, core)
+    for target, text in sections:
+        write_split_section(sink, target, text.encode("utf-8"))
+    return rendered_skill
 
 
-def read_source_plugin_metadata(plugin_path: Path) -> dict[str, object]:
-    metadata_path = plugin_path / ".claude-plugin" / "plugin.json"
-    if metadata_path.exists():
-        try:
-            return json.loads(read_text(metadata_path))
-        except json.JSONDecodeError:
-            return {}
-    return {}
+def source_preview(source: SourceTree, path: PurePosixPath, *, skip_frontmatter: bool = False) -> str:
+    with source.open_text(path) as handle:
+        return safe_stream_preview(handle, skip_frontmatter=skip_frontmatter)
 
 
-def write_plugin_manifest(plugin_path: Path, destination_plugin_dir: Path) -> dict[str, object]:
-    source_metadata = read_source_plugin_metadata(plugin_path)
+def read_source_plugin_metadata(source: SourceTree, plugin_path: PurePosixPath) -> dict[str, object]:
+    return load_source_json(source, plugin_path / ".claude-plugin" / "plugin.json")
 
-    manifest: dict[str, object] = {
-        "name": str(source_metadata.get("name") or plugin_path.name),
-        "description": str(source_metadata.get("description") or f"Converted plugin from {plugin_path.name}."),
+
+def build_plugin_manifest(source_metadata: dict[str, object], plugin_name: str) -> dict[str, object]:
+    return {
+        "name": str(source_metadata.get("name") or plugin_name),
+        "description": str(source_metadata.get("description") or f"Converted plugin from {plugin_name}."),
         "version": str(source_metadata.get("version") or "1.0.0"),
         "author": source_metadata.get("author") or {"name": "copilot-converter"},
         "repository": source_metadata.get("repository") or "https://github.com/wshobson/agents",
         "license": source_metadata.get("license") or "MIT",
     }
 
-    manifest_path = destination_plugin_dir / ".github" / "plugin" / "plugin.json"
-    write_text(manifest_path, json.dumps(manifest, indent=2, sort_keys=False) + "\n")
-    return manifest
+
+def render_plugin_manifest(manifest: dict[str, object]) -> str:
+    return json.dumps(manifest, indent=2, sort_keys=False) + "\n"
 
 
 def _render_markdown_table(title: str, rows: list[tuple[str, str]]) -> list[str]:
@@ -330,13 +584,13 @@ def _render_markdown_table(title: str, rows: list[tuple[str, str]]) -> list[str]
     return lines
 
 
-def write_plugin_readme(
-    plugin_dir: Path,
+def render_plugin_readme(
+    plugin_dir: PurePosixPath,
     manifest: dict[str, object],
     command_names: list[str],
     agent_names: list[str],
     skill_names: list[str],
-) -> None:
+) -> str:
     plugin_name = str(manifest.get("name", plugin_dir.name))
     description = str(manifest.get("description", ""))
 
@@ -360,4 +614,16 @@ def write_plugin_readme(
     if repository:
         lines.extend(["## Source", "", f"- `{repository}`", ""])
 
-    write_text(plugin_dir / "README.md", "\n".join(lines))
+    return "\n".join(lines)
+
+
+def write_plugin_readme(
+    sink: OutputSink,
+    plugin_dir: PurePosixPath,
+    manifest: dict[str, object],
+    command_names: list[str],
+    agent_names: list[str],
+    skill_names: list[str],
+) -> None:
+    rendered = render_plugin_readme(plugin_dir, manifest, command_names, agent_names, skill_names)
+    write_sink_text(sink, plugin_dir / "README.md", rendered)
@@ -0,0 +1,188 @@
+"""Compact catalog of every generated agent, command and skill.
+
+The catalog is built from the rendered bytes as they pass through the sink, so consumers can list
+assets with one read instead of opening every plugin folder.
+"""
+
+import gzip
+import io
+import json
+import threading
+from dataclasses import asdict
+from pathlib import PurePosixPath
+from typing import NamedTuple
+
+from .constants import CATALOG_FORMATS
+from .file_ops import hash_content
+from .frontmatter import parse_simple_frontmatter, split_frontmatter
+from .models import CatalogAsset
+from .persona import safe_stream_preview
+from .processing import MARKETPLACE_PATH, marketplace_source, relative_parts
+from .sinks import OutputSink
+from .tokens import estimate_tokens
+
+CATALOG_PATH = MARKETPLACE_PATH.parent / "catalog.json"
+CATALOG_BINARY_PATH = CATALOG_PATH.with_name("catalog.json.gz")
+CATALOG_VERSION = 1
+
+
+def asset_kind(output_root: PurePosixPath, path: PurePosixPath) -> tuple[str, str, str] | None:
+    """Return ``(plugin, kind, name)`` when ``path`` is an agent, command or skill entry point."""
+    parts = relative_parts(path, output_root)
+    if parts is None:
+        return None
+    if len(parts) == 3 and parts[1] in ("agents", "commands") and path.suffix == ".md":
+        return parts[0], parts[1][:-1], path.stem
+    if len(parts) == 4 and parts[1] == "skills" and parts[3] == "SKILL.md":
+        return parts[0], "skill", parts[2]
+    return None
+
+
+class _AssetSummary(NamedTuple):
+    kind: str
+    name: str
+    tokens: int
+    entry: CatalogAsset | None
+
+
+class AssetRecorder:
+    """Pass writes through to ``sink`` and keep a small summary of what was written.
+
+    Every file below ``output_root`` keeps its content hash and size; every agent, command and skill
+    entry point keeps a token estimate and, with ``catalog``, its catalog entry. Rendered content is
+    not retained. Clearing a path also forgets what was recorded below it, so the records match what
+    the sink holds at the end of the run.
+    """
+
+    def __init__(self, sink: OutputSink, output_root: PurePosixPath, *, catalog: bool = False) -> None:
+        self.sink = sink
+        self.output_root = output_root
+        self.catalog = catalog
+        self._assets: dict[str, dict[PurePosixPath, _AssetSummary]] = {}
+        self._digests: dict[PurePosixPath, tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        self.sink.write_bytes(path, data, executable=executable)
+        if relative_parts(path, self.output_root) is None:
+            return
+        content_hash = hash_content(data)
+        kind = asset_kind(self.output_root, path)
+        summary = None
+        if kind is not None:
+            text = data.decode("utf-8", errors="replace")
+            entry = _catalog_asset(path, *kind, text, len(data), content_hash) if self.catalog else None
+            summary = _AssetSummary(kind[1], kind[2], estimate_tokens(text), entry)
+        with self._lock:
+            self._digests[path] = (content_hash, len(data))
+            if kind is not None and summary is not None:
+                self._assets.setdefault(kind[0], {})[path] = summary
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        return self.sink.read_bytes(path)
+
+    def exists(self, path: PurePosixPath) -> bool:
+        return self.sink.exists(path)
+
+    def clear(self, path: PurePosixPath) -> None:
+        self.sink.clear(path)
+        with self._lock:
+            for key in [key for key in self._digests if key == path or path in key.parents]:
+                del self._digests[key]
+            for records in self._assets.values():
+                for key in [key for key in records if key == path or path in key.parents]:
+                    del records[key]
+
+    def display(self, path: PurePosixPath) -> str:
+        return self.sink.display(path)
+
+    def close(self) -> None:
+        return None
+
+    def digests(self) -> dict[PurePosixPath, tuple[str, int]]:
+        """Return ``{path: (content hash, size)}`` for every file written below the output root."""
+        with self._lock:
+            return dict(self._digests)
+
+    def recorded(self, plugin: str | None = None) -> dict[PurePosixPath, tuple[str, str, str, int]]:
+        """Return ``{path: (plugin, kind, name, tokens)}`` for every asset (of ``plugin``) still in the sink."""
+        with self._lock:
+            plugins = [plugin] if plugin is not None else list(self._assets)
+            return {
+                path: (name, summary.kind, summary.name, summary.tokens)
+                for name in plugins
+                for path, summary in self._assets.get(name, {}).items()
+            }
+
+    def assets(self) -> list[CatalogAsset]:
+        """Return the catalog entries recorded with ``catalog``."""
+        with self._lock:
+            entries = [summary.entry for records in self._assets.values() for summary in records.values()]
+        return sorted(
+            (entry for entry in entries if entry is not None),
+            key=lambda asset: (asset.plugin, asset.kind, asset.name),
+        )
+
+
+def _catalog_asset(
+    path: PurePosixPath,
+    plugin: str,
+    kind: str,
+    name: str,
+    text: str,
+    size: int,
+    content_hash: str,
+) -> CatalogAsset:
+    metadata = parse_simple_frontmatter(split_frontmatter(text).frontmatter)
+    return CatalogAsset(
+        plugin=plugin,
+        kind=kind,
+        name=name,
+        path=marketplace_source(path),
+        description=metadata.get("description", ""),
+        size=size,
+        hash=content_hash,
+        preview=safe_stream_preview(io.StringIO(text), skip_frontmatter=True),
+    )
+
+
+def render_catalog(assets: list[CatalogAsset]) -> bytes:
+    payload = {"version": CATALOG_VERSION, "assets": [asdict(asset) for asset in assets]}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_catalog(sink: OutputSink) -> list[CatalogAsset]:
+    """Read the assets of a previously written catalog, or nothing when there is none."""
+    if sink.exists(CATALOG_PATH):
+        payload = sink.read_bytes(CATALOG_PATH)
+    elif sink.exists(CATALOG_BINARY_PATH):
+        payload = gzip.decompress(sink.read_bytes(CATALOG_BINARY_PATH))
+    else:
+        return []
+    try:
+        document = json.loads(payload)
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(document, dict) or document.get("version") != CATALOG_VERSION:
+        return []
+    return [CatalogAsset(**entry) for entry in document.get("assets", [])]
+
+
+def write_catalog(sink: OutputSink, assets: list[CatalogAsset], formats: tuple[str, ...]) -> list[PurePosixPath]:
+    """Write the catalog in each requested format and return the written paths.
+
+    ``json`` is minified JSON; ``gzip`` is the same document gzip-compressed with a fixed header, so
+    identical catalogs produce identical bytes.
+    """
+    unknown = sorted(set(formats) - set(CATALOG_FORMATS))
+    if unknown:
+        raise ValueError(f"Unknown catalog format(s): {', '.join(unknown)}")
+    payload = render_catalog(assets)
+    written: list[PurePosixPath] = []
+    if "json" in formats:
+        sink.write_bytes(CATALOG_PATH, payload)
+        written.append(CATALOG_PATH)
+    if "gzip" in formats:
+        sink.write_bytes(CATALOG_BINARY_PATH, gzip.compress(payload, compresslevel=9, mtime=0))
+        written.append(CATALOG_BINARY_PATH)
+    return written
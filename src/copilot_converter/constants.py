@@ -1,5 +1,19 @@
+from pathlib import PurePosixPath
+
 FRONTMATTER_DELIM = "---"
 # Tokens are placeholders rather than secrets; mark to silence Bandit false positives.
 ARGUMENTS_TOKEN = "$ARGUMENTS"  # nosec B105
 PROMPT_INPUT_TOKEN = "${input:requirements}"  # nosec B105
 SKILL_GLOB = "*/SKILL.md"
+PLUGIN_REASONS = (
+    "claude_plugin_to_copilot_plugin",
+    "agents_to_agents_directory",
+    "commands_to_commands_directory",
+    "skills_to_skills_directory",
+    "emit_plugin_manifest",
+)
+CATALOG_FORMATS = ("json", "gzip")
+ASSET_KINDS = ("agent", "command", "skill")
+RENDER_PROFILES = ("default", "slim")
+DEFAULT_OUTPUT_ROOT = PurePosixPath("plugins")
+PLUGIN_MANIFEST_PATH = PurePosixPath(".github") / "plugin" / "plugin.json"
@@ -0,0 +1,242 @@
+"""Library entry point for running conversions against arbitrary sources and sinks."""
+
+from dataclasses import replace
+from itertools import chain
+from pathlib import PurePosixPath
+from typing import Callable, Iterable, Iterator, Mapping
+
+from .awesome import AwesomeImport, iter_awesome_decisions, select_collections
+from .builders import disk_render_cache
+from .catalog import AssetRecorder, load_catalog, write_catalog
+from .constants import DEFAULT_OUTPUT_ROOT
+from .merkle import build_merkle_manifest, diff_manifests, load_merkle_manifest, write_merkle_manifest
+from .models import ConversionResult, DecisionRecord, OutputChange
+from .pipeline import PipelineOptions, run_pipeline
+from .processing import (
+    AWESOME_META_PLUGIN,
+    iter_plugin_decisions,
+    iter_plugin_dirs,
+    patch_marketplace_manifest,
+    plugin_dependency_graph,
+    process_awesome_meta_agent,
+    resolve_plugin_selection,
+    resolve_plugin_subset,
+    stamp_plugin_manifests,
+    write_marketplace_manifest,
+)
+from .render_cache import DiskRenderCache
+from .sinks import OutputSink
+from .slim import SlimmingSink
+from .sources import SourceTree
+from .tokens import TokenBudgets, token_report
+
+
+class Converter:
+    """Convert a Claude plugin repository into Copilot plugin bundles.
+
+    ``source`` provides the ``wshobson/agents`` layout and ``awesome_source`` optionally provides
+    ``github/awesome-copilot``. Plugins are written to ``output_root`` inside ``sink`` and the
+    marketplace index to ``.github/plugin/marketplace.json``. ``selection`` is the previous
+    ``plugin-selection.json`` payload; the synced payload is returned with the result.
+
+    With ``pipeline`` set, plugins are converted by the asyncio pipeline and its queue and stage
+    statistics are returned as ``pipeline_stats``. ``marketplace_shards`` adds the sharded
+    marketplace index next to the single-file ``marketplace.json``. ``catalog_formats`` (any of
+    ``CATALOG_FORMATS``) writes the asset catalog next to the marketplace.
+
+    Every decision record carries token estimates for the plugin's agents, commands and skills.
+    ``token_budgets`` sets the limits they are checked against; assets over a limit are returned
+    as ``over_budget``.
+
+    ``dependencies`` is the ``plugin_dependency_graph`` of ``source`` when the caller already has
+    it; the resident server keeps it between runs.
+
+    ``profile="slim"`` slims agents, commands and skills as they are written (see ``slim``) and
+    records the bytes and estimated tokens saved per plugin as ``slim_savings``.
+
+    ``only`` converts just those plugins and the plugins providing skills they reference into the
+    existing output: other plugin folders are left alone and their ``marketplace.json`` and catalog
+    entries are kept. The awesome-copilot meta plugin is only rebuilt when ``only`` names it.
+
+    ``merkle_manifest`` writes the merkle manifest of the output root (see ``merkle``) and returns
+    the files changed since the previous manifest as ``output_changes``.
+
+    Plugins are converted one at a time and each finished decision record is passed to
+    ``on_decision`` when given (for example a ``DecisionLogWriter``) instead of being collected in
+    the result, so memory stays flat however many plugins the source holds.
+
+    Every converted ``plugin.json`` and its ``marketplace.json`` entry carry ``contentHash``, a hash
+    over the plugin's other generated files. ``derived_versions`` also appends the first hash
+    digits to each plugin version as semver build metadata.
+
+    ``awesome_import`` also converts the awesome-copilot collections it selects into ``awesome-<id>``
+    plugins (see ``awesome``); with ``only``, just the collection plugins it names are rebuilt.
+
+    ``render_cache`` serves rendered agents, prompts, skills and placeholders from a shared
+    on-disk cache (see ``render_cache``); it is pruned to its size bound after a run that added
+    entries.
+    """
+
+    def __init__(
+        self,
+        source: SourceTree,
+        sink: OutputSink,
+        *,
+        awesome_source: SourceTree | None = None,
+        dependencies: dict[str, set[str]] | None = None,
+        output_root: PurePosixPath = DEFAULT_OUTPUT_ROOT,
+        marketplace_name: str = "local-marketplace",
+        selection: Mapping[str, object] | None = None,
+        overwrite: bool = True,
+        pipeline: PipelineOptions | None = None,
+        marketplace_shards: int = 0,
+        catalog_formats: tuple[str, ...] = (),
+        token_budgets: TokenBudgets | None = None,
+        profile: str = "default",
+        only: Iterable[str] | None = None,
+        merkle_manifest: bool = False,
+        derived_versions: bool = False,
+        render_cache: DiskRenderCache | None = None,
+        awesome_import: AwesomeImport | None = None,
+    ) -> None:
+        self.source = source
+        self.sink = sink
+        self.awesome_source = awesome_source
+        self.dependencies = dependencies
+        self.output_root = output_root
+        self.marketplace_name = marketplace_name
+        self.selection = dict(selection or {})
+        self.overwrite = overwrite
+        self.pipeline = pipeline
+        self.marketplace_shards = marketplace_shards
+        self.catalog_formats = catalog_formats
+        self.token_budgets = token_budgets
+        self.profile = profile
+        self.only = set(only) if only is not None else None
+        self.merkle_manifest = merkle_manifest
+        self.derived_versions = derived_versions
+        self.render_cache = render_cache
+        self.awesome_import = awesome_import
+
+    def run(self, on_decision: Callable[[DecisionRecord], None] | None = None) -> ConversionResult:
+        with disk_render_cache(self.render_cache):
+            result = self._run(on_decision)
+        if self.render_cache is not None and self.render_cache.misses:
+            self.render_cache.prune()
+        return result
+
+    def _run(self, on_decision: Callable[[DecisionRecord], None] | None) -> ConversionResult:
+        dependencies = self.dependencies if self.dependencies is not None else plugin_dependency_graph(self.source)
+        selection, enabled_plugins = resolve_plugin_selection(self.source, self.selection, dependencies)
+        overwrite = self.overwrite
+        with_meta_plugin = self.awesome_source is not None
+        collections = (
+            select_collections(self.awesome_source, self.awesome_import)
+            if self.awesome_source is not None and self.awesome_import is not None
+            else []
+        )
+        if self.only is not None:
+            collections = [collection for collection in collections if collection.plugin_name in self.only]
+            requested = self.only - {AWESOME_META_PLUGIN} - {collection.plugin_name for collection in collections}
+            enabled_plugins = resolve_plugin_subset(self.source, requested, dependencies)
+            with_meta_plugin = with_meta_plugin and AWESOME_META_PLUGIN in self.only
+            overwrite = False
+        plugin_dirs = [
+            path
+            for path in iter_plugin_dirs(self.source, enabled_plugins)
+            if self.only is None or path.name in enabled_plugins
+        ]
+        clashes = sorted({collection.plugin_name for collection in collections} & {path.name for path in plugin_dirs})
+        if clashes:
+            raise ValueError(f"awesome-copilot collection plugin(s) clash with source plugins: {', '.join(clashes)}")
+
+        recorder = AssetRecorder(self.sink, self.output_root, catalog=bool(self.catalog_formats))
+        slimmer = SlimmingSink(recorder, self.output_root) if self.profile == "slim" else None
+        sink: OutputSink = slimmer or recorder
+        if self.only is not None:
+            targets = {path.name for path in plugin_dirs}
+            if with_meta_plugin:
+                targets.add(AWESOME_META_PLUGIN)
+            targets.update(collection.plugin_name for collection in collections)
+            for name in sorted(targets):
+                sink.clear(self.output_root / name)
+
+        split_token_limit = self.token_budgets.skill_split_limit if self.token_budgets is not None else None
+        pipeline_stats = None
+        decisions: Iterable[DecisionRecord]
+        if self.pipeline is not None:
+            decisions, stats = run_pipeline(
+                self.source, plugin_dirs, sink, self.output_root, overwrite, self.pipeline, split_token_limit
+            )
+            pipeline_stats = stats.as_dict()
+        else:
+            decisions = iter_plugin_decisions(
+                self.source, plugin_dirs, sink, self.output_root, overwrite, split_token_limit
+            )
+        if self.awesome_source is not None and with_meta_plugin:
+            decisions = chain(decisions, self._meta_decision(sink))
+        if self.awesome_source is not None and collections:
+            workers = self.awesome_import.workers if self.awesome_import is not None else None
+            decisions = chain(
+                decisions,
+                iter_awesome_decisions(
+                    self.awesome_source, collections, sink, self.output_root, workers, split_token_limit
+                ),
+            )
+
+        converted: list[str] = []
+        collected: list[DecisionRecord] = []
+        over_budget: list[dict[str, object]] = []
+        for decision in decisions:
+            converted.append(decision.plugin)
+            tokens = token_report(recorder.recorded(decision.plugin), self.token_budgets).get(decision.plugin, [])
+            savings = slimmer.savings(decision.plugin) if slimmer is not None else {}
+            decision = replace(
+                decision,
+                token_estimates=tokens,
+                slim_savings=savings[decision.plugin].as_dict() if decision.plugin in savings else None,
+                dependencies=sorted(dependencies.get(decision.plugin, ())),
+            )
+            over_budget.extend(entry for entry in tokens if entry["over_budget"])
+            if on_decision is not None:
+                on_decision(decision)
+            else:
+                collected.append(decision)
+
+        stamp_plugin_manifests(sink, self.output_root, converted, recorder.digests(), self.derived_versions)
+        write_marketplace = write_marketplace_manifest if self.only is None else patch_marketplace_manifest
+        marketplace_path = write_marketplace(
+            self.sink, self.output_root, converted, self.marketplace_name, self.marketplace_shards
+        )
+        if self.catalog_formats:
+            assets = recorder.assets()
+            if self.only is not None:
+                kept = [asset for asset in load_catalog(self.sink) if asset.plugin not in converted]
+                assets = sorted([*kept, *assets], key=lambda asset: (asset.plugin, asset.kind, asset.name))
+            write_catalog(self.sink, assets, self.catalog_formats)
+        output_changes = self._write_merkle_manifest(recorder, converted) if self.merkle_manifest else None
+
+        return ConversionResult(
+            decisions=collected,
+            selection=selection,
+            marketplace_path=self.sink.display(marketplace_path),
+            pipeline_stats=pipeline_stats,
+            over_budget=over_budget,
+            output_changes=output_changes,
+        )
+
+    def _meta_decision(self, sink: OutputSink) -> Iterator[DecisionRecord]:
+        if self.awesome_source is None:
+            return
+        decision = process_awesome_meta_agent(self.awesome_source, sink, self.output_root)
+        if decision is not None:
+            yield decision
+
+    def _write_merkle_manifest(self, recorder: AssetRecorder, converted: list[str]) -> list[OutputChange] | None:
+        previous = load_merkle_manifest(self.sink)
+        keep: dict[str, dict] = {}
+        if self.only is not None and previous is not None and previous.get("root") == str(self.output_root):
+            keep = {name: node for name, node in previous["tree"]["entries"].items() if name not in converted}
+        manifest = build_merkle_manifest(self.output_root, recorder.digests(), keep)
+        write_merkle_manifest(self.sink, manifest)
+        return diff_manifests(previous, manifest) if previous is not None else None
@@ -0,0 +1,318 @@
+"""SQLite store of decision records, kept across runs and indexed for audits.
+
+Each run adds a row to ``runs``; its decision records are split into ``plugins``, ``assets``
+(agents, commands and skills with their token estimates), ``outputs`` (generated files and link
+placeholders), ``previews`` and ``dependencies`` (skill-reference edges between plugins). Rows are
+buffered and inserted in one transaction per batch of plugins. A run is marked finished when the
+store is closed cleanly, and queries default to the latest finished run.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from dataclasses import asdict
+from datetime import UTC, datetime
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import Self
+
+from .models import DecisionRecord
+
+DECISION_DB_VERSION = 1
+DEFAULT_BATCH_SIZE = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS plugins (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    plugin TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    plugin_path TEXT NOT NULL,
+    selected_agent TEXT,
+    notes TEXT,
+    reasons TEXT NOT NULL,
+    mapping_entries TEXT NOT NULL,
+    slim_savings TEXT,
+    PRIMARY KEY (run_id, plugin)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    plugin TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    tokens INTEGER
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    plugin TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS previews (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    plugin TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT,
+    preview TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    plugin TEXT NOT NULL,
+    depends_on TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plugins_by_name ON plugins (plugin, run_id);
+CREATE INDEX IF NOT EXISTS assets_by_run ON assets (run_id, plugin);
+CREATE INDEX IF NOT EXISTS assets_by_name ON assets (name, run_id);
+CREATE INDEX IF NOT EXISTS outputs_by_run ON outputs (run_id, kind, plugin);
+CREATE INDEX IF NOT EXISTS outputs_by_path ON outputs (path, run_id);
+CREATE INDEX IF NOT EXISTS previews_by_asset ON previews (run_id, plugin, kind, name);
+CREATE INDEX IF NOT EXISTS dependencies_by_plugin ON dependencies (plugin, run_id);
+CREATE INDEX IF NOT EXISTS dependencies_by_provider ON dependencies (depends_on, run_id);
+"""
+
+_INSERTS = {
+    "plugins": "INSERT OR REPLACE INTO plugins VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "assets": "INSERT INTO assets VALUES (?, ?, ?, ?, ?)",
+    "outputs": "INSERT INTO outputs VALUES (?, ?, ?, ?)",
+    "previews": "INSERT INTO previews VALUES (?, ?, ?, ?, ?, ?)",
+    "dependencies": "INSERT INTO dependencies VALUES (?, ?, ?)",
+}
+
+# Named queries: ``:run`` is a run id or NULL for every run, ``:name`` the query argument.
+QUERIES = {
+    "runs": (
+        "SELECT id AS run, started_at, finished_at, label,"
+        " (SELECT COUNT(*) FROM plugins WHERE plugins.run_id = runs.id) AS plugins"
+        " FROM runs ORDER BY id"
+    ),
+    "plugins": (
+        "SELECT run_id AS run, plugin, plugin_path, notes FROM plugins"
+        " WHERE :run IS NULL OR run_id = :run ORDER BY run_id, plugin"
+    ),
+    "placeholders": (
+        "SELECT run_id AS run, plugin, path FROM outputs"
+        " WHERE kind = 'placeholder' AND (:run IS NULL OR run_id = :run) ORDER BY run_id, plugin, path"
+    ),
+    "asset": (
+        "SELECT assets.run_id AS run, assets.plugin, assets.kind, assets.name, plugins.plugin_path,"
+        " previews.path AS source, assets.tokens FROM assets"
+        " JOIN plugins ON plugins.run_id = assets.run_id AND plugins.plugin = assets.plugin"
+        " LEFT JOIN previews ON previews.run_id = assets.run_id AND previews.plugin = assets.plugin"
+        " AND previews.kind = assets.kind AND previews.name = assets.name"
+        " WHERE assets.name = :name AND (:run IS NULL OR assets.run_id = :run)"
+        " ORDER BY assets.run_id, assets.plugin, assets.kind"
+    ),
+    "output": (
+        "SELECT run_id AS run, plugin, kind, path FROM outputs"
+        " WHERE path = :name AND (:run IS NULL OR run_id = :run) ORDER BY run_id, plugin"
+    ),
+    "dependencies": (
+        "SELECT run_id AS run, plugin, depends_on FROM dependencies"
+        " WHERE plugin = :name AND (:run IS NULL OR run_id = :run) ORDER BY run_id, depends_on"
+    ),
+    "dependents": (
+        "SELECT run_id AS run, plugin, depends_on FROM dependencies"
+        " WHERE depends_on = :name AND (:run IS NULL OR run_id = :run) ORDER BY run_id, plugin"
+    ),
+}
+_NAMED_QUERIES = {"asset", "output", "dependencies", "dependents"}
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+def _decision_rows(run_id: int, d: DecisionRecord) -> dict[str, list[tuple[object, ...]]]:
+    tokens = {(str(entry["kind"]), str(entry["name"])): entry["tokens"] for entry in d.token_estimates}
+    previews: list[tuple[object, ...]] = [
+        (run_id, d.plugin, "command", PurePosixPath(item["name"]).stem, item.get("path"), item["preview"])
+        for item in d.command_previews
+    ]
+    previews.extend(
+        (run_id, d.plugin, "skill", item["name"], item.get("path"), item["preview"]) for item in d.skill_previews
+    )
+    if d.selected_agent and d.agent_persona_preview:
+        previews.append((run_id, d.plugin, "agent", d.selected_agent, None, d.agent_persona_preview))
+    return {
+        "plugins": [
+            (
+                run_id,
+                d.plugin,
+                d.classification,
+                d.plugin_path,
+                d.selected_agent,
+                d.notes,
+                json.dumps(d.reasons),
+                json.dumps([asdict(entry) for entry in d.mapping_entries]),
+                json.dumps(d.slim_savings) if d.slim_savings is not None else None,
+            )
+        ],
+        "assets": [
+            (run_id, d.plugin, kind, name, tokens.get((kind, name)))
+            for kind, names in (("agent", d.agents), ("command", d.commands), ("skill", d.skills))
+            for name in names
+        ],
+        "outputs": [
+            *((run_id, d.plugin, "file", path) for path in d.outputs),
+            *((run_id, d.plugin, "placeholder", path) for path in d.placeholders),
+        ],
+        "previews": previews,
+        "dependencies": [(run_id, d.plugin, provider) for provider in d.dependencies],
+    }
+
+
+class DecisionDatabase:
+    """Add the decision records of one run to the SQLite database at ``path``.
+
+    Rows are inserted every ``batch_size`` records and on ``close``, which also marks the run as
+    finished; a failed run keeps the batches already inserted but stays unfinished. ``durable``
+    makes SQLite sync every transaction to disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        label: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        durable: bool = False,
+    ) -> None:
+        self.path = path
+        self.label = label
+        self.batch_size = batch_size
+        self.durable = durable
+        self.run_id: int | None = None
+        self._connection: sqlite3.Connection | None = None
+        self._pending: dict[str, list[tuple[object, ...]]] = {table: [] for table in _INSERTS}
+        self._buffered = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def write(self, decision: DecisionRecord) -> None:
+        connection, run_id = self._open()
+        for table, rows in _decision_rows(run_id, decision).items():
+            self._pending[table].extend(rows)
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self._flush(connection)
+
+    def close(self) -> None:
+        connection, run_id = self._open()
+        self._flush(connection)
+        with connection:
+            connection.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (_now(), run_id))
+        connection.close()
+        self._connection = None
+
+    def _flush(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            for table, rows in self._pending.items():
+                if rows:
+                    connection.executemany(_INSERTS[table], rows)
+                    rows.clear()
+        self._buffered = 0
+
+    def _open(self) -> tuple[sqlite3.Connection, int]:
+        if self._connection is None or self.run_id is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, DECISION_DB_VERSION):
+                connection.close()
+                raise ValueError(f"Unsupported decision database version {version}: {self.path}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(f"PRAGMA synchronous = {'FULL' if self.durable else 'NORMAL'}")
+            with connection:
+                connection.executescript(_SCHEMA)
+                connection.execute(f"PRAGMA user_version = {DECISION_DB_VERSION}")
+                cursor = connection.execute("INSERT INTO runs (started_at, label) VALUES (?, ?)", (_now(), self.label))
+            self._connection = connection
+            self.run_id = cursor.lastrowid
+        assert self.run_id is not None  # nosec B101
+        return self._connection, self.run_id
+
+
+def latest_run(connection: sqlite3.Connection) -> int | None:
+    """Return the id of the latest finished run."""
+    return connection.execute("SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL").fetchone()[0]
+
+
+def query_decisions(
+    path: Path, query: str, name: str | None = None, run: int | None = None, *, all_runs: bool = False
+) -> list[dict[str, object]]:
+    """Run a named query (see ``QUERIES``) or, for ``sql``, the read-only statement ``name``.
+
+    Queries cover ``run``, the latest finished run by default, or every run with ``all_runs``.
+    """
+    if not path.is_file():
+        raise ValueError(f"Decision database not found: {path}")
+    connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        if query == "sql":
+            cursor = connection.execute(name or "")
+        else:
+            if run is None and not all_runs:
+                run = latest_run(connection)
+            cursor = connection.execute(QUERIES[query], {"run": run, "name": name})
+        return [dict(row) for row in cursor]
+    finally:
+        connection.close()
+
+
+def decisions_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="copilot_converter decisions",
+        description="Query a decision database written with --decision-db.",
+    )
+    parser.add_argument("database", help="Decision database file")
+    parser.add_argument(
+        "query",
+        choices=[*QUERIES, "sql"],
+        help=(
+            "runs, plugins or placeholders; asset NAME (where an agent, command or skill came from), "
+            "output PATH, dependencies PLUGIN, dependents PLUGIN; or sql STATEMENT"
+        ),
+    )
+    parser.add_argument("argument", nargs="?", default=None, help="Name, path or SQL statement for the query")
+    runs = parser.add_mutually_exclusive_group()
+    runs.add_argument("--run", type=int, default=None, help="Query this run (default: the latest finished run)")
+    runs.add_argument("--all-runs", action="store_true", help="Query every recorded run")
+    parser.add_argument("--json", action="store_true", help="Print rows as a JSON list")
+    args = parser.parse_args(argv)
+    if (args.query in _NAMED_QUERIES or args.query == "sql") != (args.argument is not None):
+        parser.error(f"query {args.query!r} {'needs' if args.argument is None else 'takes no'} argument")
+
+    try:
+        rows = query_decisions(Path(args.database), args.query, args.argument, args.run, all_runs=args.all_runs)
+    except sqlite3.Error as exc:
+        raise SystemExit(f"Query failed: {exc}") from exc
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            print("\t".join("" if value is None else str(value) for value in row.values()))
+        print(f"{len(rows)} row(s)", file=sys.stderr)
+    return 0
@@ -1,15 +1,150 @@
+import hashlib
 import json
+import os
 import shutil
+from contextlib import contextmanager
+from functools import cache
 from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+
+DURABILITY_MODES = ("fast", "durable")
 
 
 def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def write_text(path: Path, content: str) -> None:
+def decode_text(data: bytes) -> str:
+    """Decode UTF-8 with the same newline translation as ``Path.read_text``."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def hash_content(data: bytes) -> str:
+    """Return the ``sha256:<hex>`` hash recorded for generated files."""
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+@contextmanager
+def replace_atomically(path: Path, mode: str = "wb", encoding: str | None = None) -> Iterator[IO]:
+    """Open a sibling temp file for writing and rename it over ``path`` once the block succeeds."""
+    temp = path.with_name(f".{path.name}.{os.urandom(4).hex()}.tmp")
+    try:
+        with temp.open(mode.replace("w", "x"), encoding=encoding) as handle:
+            yield handle
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+@cache
+def _libc_function(name: str) -> Callable[..., int] | None:
+    import ctypes
+
+    try:
+        return getattr(ctypes.CDLL(None, use_errno=True), name, None)
+    except OSError:
+        return None
+
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def swap_directory(staging: Path, target: Path) -> None:
+    """Move the ``staging`` tree to ``target``, replacing what is there, and make the rename durable.
+
+    Where libc provides ``renameat2`` the two trees are exchanged in one atomic step. Elsewhere the
+    old tree is renamed aside first, so a crash in between leaves both trees on disk.
+    """
+    renameat2 = _libc_function("renameat2")
+    if not target.exists():
+        os.rename(staging, target)
+    elif (
+        renameat2 is not None and renameat2(_AT_FDCWD, bytes(staging), _AT_FDCWD, bytes(target), _RENAME_EXCHANGE) == 0
+    ):
+        shutil.rmtree(staging)
+    else:
+        previous = target.with_name(f".{target.name}.old-{os.urandom(4).hex()}")
+        os.rename(target, previous)
+        os.rename(staging, target)
+        shutil.rmtree(previous)
+    _fsync_dir(target.parent)
+
+
+def _existing_dir(path: Path) -> Path:
+    while not path.is_dir() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def sync_filesystems(paths: Iterable[Path]) -> None:
+    """Flush the filesystems holding ``paths`` to stable storage with one call per filesystem.
+
+    Uses ``syncfs(2)`` where libc provides it and falls back to a global ``os.sync``.
+    """
+    directories: dict[int, Path] = {}
+    for path in paths:
+        directory = _existing_dir(path)
+        directories.setdefault(directory.stat().st_dev, directory)
+    if not directories:
+        return
+    syncfs = _libc_function("syncfs")
+    if syncfs is None:
+        if hasattr(os, "sync"):
+            os.sync()
+        return
+    for directory in directories.values():
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            if syncfs(fd) != 0:
+                raise OSError(f"syncfs failed for {directory}")
+        finally:
+            os.close(fd)
+
+
+class SyncBarrier:
+    """Defer durability to a single sync of every touched filesystem.
+
+    Writers that receive a barrier replace files atomically and register where they wrote;
+    ``flush`` then syncs each filesystem once instead of fsyncing every file. Callbacks passed to
+    ``on_flush`` run after that sync, to move staged trees into place once their files are durable.
+    """
+
+    def __init__(self) -> None:
+        self._paths: list[Path] = []
+        self._publishers: list[Callable[[], None]] = []
+
+    def add(self, path: Path) -> None:
+        self._paths.append(path)
+
+    def on_flush(self, publish: Callable[[], None]) -> None:
+        self._publishers.append(publish)
+
+    def flush(self) -> None:
+        sync_filesystems(self._paths)
+        self._paths.clear()
+        publishers, self._publishers = self._publishers, []
+        for publish in publishers:
+            publish()
+
+
+def write_text(path: Path, content: str, barrier: SyncBarrier | None = None) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    if barrier is None:
+        path.write_text(content, encoding="utf-8")
+        return
+    with replace_atomically(path, "w", encoding="utf-8") as handle:
+        handle.write(content)
+    barrier.add(path)
 
 
 def ensure_empty_dir(path: Path, overwrite: bool) -> None:
@@ -23,3 +158,16 @@ def load_json(path: Path) -> dict:
         return json.loads(read_text(path))
     except json.JSONDecodeError:
         return {}
+
+
+def resolve_source(source_arg: str) -> Path:
+    source = Path(source_arg).expanduser().resolve()
+    if not source.exists():
+        raise SystemExit(f"Source path not found: {source}")
+    return source
+
+
+def resolve_output_root(output_arg: str | None) -> Path:
+    output_root = Path(output_arg).expanduser().resolve() if output_arg else Path.cwd() / "plugins"
+    output_root.mkdir(parents=True, exist_ok=True)
+    return output_root
@@ -0,0 +1,340 @@
+"""Local git plumbing used to publish output straight into a repository."""
+
+import contextlib
+import hashlib
+import os
+import shutil
+import subprocess  # nosec B404
+import threading
+import time
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import IO, Self
+
+_DEFAULT_IDENT = "copilot-converter <noreply@copilot-converter.local>"
+
+
+def _git_executable() -> str:
+    git = shutil.which("git")
+    if git is None:
+        raise SystemExit("git executable not found on PATH")
+    return git
+
+
+def run_git(repo: Path, *args: str, check: bool = True) -> subprocess.CompletedProcess[bytes]:
+    return subprocess.run(  # nosec B603
+        [_git_executable(), "-C", str(repo), *args],
+        check=check,
+        capture_output=True,
+    )
+
+
+def _git_output(repo: Path, *args: str) -> str | None:
+    result = run_git(repo, *args, check=False)
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode("utf-8").strip()
+
+
+def resolve_commit(repo: Path, ref: str) -> str | None:
+    return _git_output(repo, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+
+
+def require_repository(repo: Path) -> None:
+    """Exit with a clear message when ``repo`` is not inside a git repository."""
+    if run_git(repo, "rev-parse", "--git-dir", check=False).returncode != 0:
+        raise SystemExit(f"Not a git repository: {repo}")
+
+
+def branch_ref(repo: Path, branch: str | None = None) -> str:
+    """Return the full ref for ``branch``, defaulting to the repository's current branch."""
+    name = branch or _git_output(repo, "symbolic-ref", "--quiet", "--short", "HEAD") or "main"
+    return name if name.startswith("refs/") else f"refs/heads/{name}"
+
+
+def git_dir(repo: Path) -> Path:
+    return Path(_git_output(repo, "rev-parse", "--absolute-git-dir") or repo)
+
+
+def _object_format(repo: Path) -> str:
+    return _git_output(repo, "rev-parse", "--show-object-format") or "sha1"
+
+
+def blob_id(data: bytes, object_format: str = "sha1") -> str:
+    """Return the git object id ``git hash-object`` would assign to ``data``."""
+    digest = hashlib.new(object_format)
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def list_tree(repo: Path, treeish: str) -> dict[str, tuple[str, str]]:
+    """Return ``{path: (mode, object_id)}`` for every blob reachable from ``treeish``."""
+    result = run_git(repo, "ls-tree", "-r", "-z", "--full-tree", treeish)
+    entries: dict[str, tuple[str, str]] = {}
+    for record in result.stdout.split(b"\0"):
+        if not record:
+            continue
+        meta, _, raw_path = record.partition(b"\t")
+        mode, object_type, object_id = meta.decode("ascii").split()
+        if object_type == "blob":
+            entries[raw_path.decode("utf-8")] = (mode, object_id)
+    return entries
+
+
+class GitObjectReader:
+    """Read blobs through one persistent ``git cat-file --batch`` process.
+
+    Safe to share between threads; requests are serialized on the pipe.
+    """
+
+    def __init__(self, repo: Path) -> None:
+        self.repo = repo
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        if self._process is None:
+            self._process = subprocess.Popen(  # nosec B603
+                [_git_executable(), "-C", str(self.repo), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._process
+
+    def read_blob(self, object_id: str) -> bytes:
+        with self._lock:
+            process = self._start()
+            assert process.stdin is not None and process.stdout is not None  # nosec B101
+            process.stdin.write(f"{object_id}\n".encode("ascii"))
+            process.stdin.flush()
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                raise FileNotFoundError(f"{self.repo}: missing object {object_id}")
+            data = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+            return data
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is None:
+                return
+            if self._process.stdin is not None:
+                self._process.stdin.close()
+            self._process.wait()
+            if self._process.stdout is not None:
+                self._process.stdout.close()
+            self._process = None
+
+
+def _quote_path(path: str) -> str:
+    if not any(char in path for char in '"\\\n') and not path.startswith('"'):
+        return path
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def _committer_ident(repo: Path) -> str:
+    ident = _git_output(repo, "var", "GIT_COMMITTER_IDENT")
+    return ident or f"{_DEFAULT_IDENT} {int(time.time())} +0000"
+
+
+def _key(path: PurePosixPath | str) -> str:
+    return str(PurePosixPath(path))
+
+
+def _under(key: str, prefix: str) -> bool:
+    return prefix == "." or key == prefix or key.startswith(f"{prefix}/")
+
+
+class GitFastImportSink:
+    """Stream output files into a local git repository as a single commit.
+
+    Blobs are sent to ``git fast-import`` as soon as they are written; content whose blob id
+    already exists in the branch tip is referenced by id instead of being sent again. Paths
+    passed to ``clear`` are replaced wholesale, everything else in the tip is kept. ``close``
+    records the commit only when the resulting tree differs from the tip. The work tree of a
+    non-bare repository is not touched. Writes and reads are serialized, so the sink can be shared
+    between threads.
+    """
+
+    def __init__(self, repo: Path, branch: str | None = None, message: str = "Update generated plugins") -> None:
+        require_repository(repo)
+        self.repo = repo
+        self.ref = branch_ref(repo, branch)
+        self.message = message
+        self.commit_id: str | None = None
+        self._object_format = _object_format(repo)
+        self._parent = resolve_commit(repo, self.ref)
+        self._tip = list_tree(repo, self._parent) if self._parent else {}
+        self._tip_dirs = {_key(parent) for path in self._tip for parent in PurePosixPath(path).parents}
+        self._known_ids = {object_id: object_id for _, object_id in self._tip.values()}
+        self._written: dict[str, tuple[str, str]] = {}
+        self._written_dirs: set[str] = set()
+        self._cleared: list[str] = []
+        self._next_mark = 1
+        self._closed = False
+        self._lock = threading.Lock()
+
+        read_fd, write_fd = os.pipe()
+        try:
+            self._process = subprocess.Popen(  # nosec B603
+                [
+                    _git_executable(),
+                    "-C",
+                    str(repo),
+                    "fast-import",
+                    "--quiet",
+                    "--done",
+                    f"--cat-blob-fd={write_fd}",
+                ],
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(write_fd,),
+            )
+        finally:
+            os.close(write_fd)
+        self._cat_blob: IO[bytes] = os.fdopen(read_fd, "rb")
+
+    @property
+    def _stream(self) -> IO[bytes]:
+        assert self._process.stdin is not None  # nosec B101
+        return self._process.stdin
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        key = _key(path)
+        object_id = blob_id(data, self._object_format)
+        with self._lock:
+            self._write_blob(key, object_id, data, executable)
+
+    def _failure(self) -> RuntimeError:
+        """Reap a fast-import process that stopped and return the error built from its stderr."""
+        with contextlib.suppress(BrokenPipeError):
+            self._stream.close()
+        stderr = self._process.stderr.read() if self._process.stderr else b""
+        self._process.wait()
+        return RuntimeError(f"git fast-import failed: {stderr.decode('utf-8', 'replace').strip()}")
+
+    def _write_blob(self, key: str, object_id: str, data: bytes, executable: bool) -> None:
+        dataref = self._known_ids.get(object_id)
+        if dataref is None:
+            dataref = f":{self._next_mark}"
+            self._next_mark += 1
+            try:
+                self._stream.write(b"blob\nmark %s\ndata %d\n" % (dataref.encode(), len(data)))
+                self._stream.write(data)
+                self._stream.write(b"\n")
+            except BrokenPipeError:
+                raise self._failure() from None
+            self._known_ids[object_id] = dataref
+        self._written[key] = ("100755" if executable else "100644", object_id)
+        self._written_dirs.update(_key(parent) for parent in PurePosixPath(key).parents)
+
+    def _is_cleared(self, key: str) -> bool:
+        return any(_under(key, prefix) for prefix in self._cleared)
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        key = _key(path)
+        entry = self._written.get(key)
+        if entry is None and key in self._tip and not self._is_cleared(key):
+            entry = self._tip[key]
+        if entry is None:
+            raise FileNotFoundError(self.display(path))
+        with self._lock:
+            dataref = self._known_ids.get(entry[1], entry[1])
+            try:
+                self._stream.write(f"cat-blob {dataref}\n".encode())
+                self._stream.flush()
+            except BrokenPipeError:
+                raise self._failure() from None
+            header = self._cat_blob.readline().split()
+            if len(header) != 3 or header[1] != b"blob":
+                raise FileNotFoundError(self.display(path))
+            data = self._cat_blob.read(int(header[2]))
+            self._cat_blob.read(1)
+            return data
+
+    def exists(self, path: PurePosixPath) -> bool:
+        key = _key(path)
+        if key in self._written or key in self._written_dirs:
+            return True
+        return (key in self._tip or key in self._tip_dirs) and not self._is_cleared(key)
+
+    def clear(self, path: PurePosixPath) -> None:
+        prefix = _key(path)
+        self._cleared.append(prefix)
+        for key in [key for key in self._written if _under(key, prefix)]:
+            del self._written[key]
+        self._written_dirs = {_key(parent) for key in self._written for parent in PurePosixPath(key).parents}
+
+    def display(self, path: PurePosixPath) -> str:
+        return str(self.repo / path)
+
+    def _final_tree(self) -> dict[str, tuple[str, str]]:
+        tree = {key: entry for key, entry in self._tip.items() if not self._is_cleared(key)}
+        tree.update(self._written)
+        return tree
+
+    def _write_commit(self) -> None:
+        try:
+            self._send_commit()
+        except BrokenPipeError:
+            raise self._failure() from None
+
+    def _send_commit(self) -> None:
+        message = self.message.encode("utf-8")
+        lines = [
+            f"commit {self.ref}",
+            f"committer {_committer_ident(self.repo)}",
+            f"data {len(message)}",
+        ]
+        self._stream.write("\n".join(lines).encode("utf-8") + b"\n" + message + b"\n")
+        commands: list[str] = []
+        if self._parent:
+            commands.append(f"from {self._parent}")
+        commands.extend(f"D {_quote_path(prefix)}" for prefix in self._cleared if prefix != ".")
+        if "." in self._cleared:
+            commands.append("deleteall")
+        for key, (mode, object_id) in sorted(self._written.items()):
+            dataref = self._known_ids.get(object_id, object_id)
+            commands.append(f"M {mode} {dataref} {_quote_path(key)}")
+        self._stream.write(("\n".join(commands) + "\n\n").encode("utf-8"))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._final_tree() != self._tip:
+                self._write_commit()
+            try:
+                self._stream.write(b"done\n")
+                self._stream.close()
+            except BrokenPipeError:
+                raise self._failure() from None
+        finally:
+            self._cat_blob.close()
+        stderr = self._process.stderr.read() if self._process.stderr else b""
+        if self._process.wait() != 0:
+            raise RuntimeError(f"git fast-import failed: {stderr.decode('utf-8', 'replace').strip()}")
+        self.commit_id = resolve_commit(self.repo, self.ref)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        self._closed = True
+        self._process.kill()
+        self._process.wait()
+        # Buffered writes can no longer reach the process; drop them instead of flushing.
+        with contextlib.suppress(BrokenPipeError):
+            self._stream.close()
+        self._cat_blob.close()
@@ -0,0 +1,390 @@
+"""Incremental VS Code fallback installer, the Python counterpart of
+``scripts/install-vscode-fallback-copilot-converter.ps1``.
+
+Agents become ``<prompts>/<name>.agent.md``, commands ``<prompts>/<name>.prompt.md`` and each
+skill folder is mirrored to ``<skills>/<skill>``. The state file records every installed file
+with its content hash, size and mtime, so later runs only copy what changed and only delete what
+was removed. Plugins whose ``plugin.json`` ``contentHash`` matches the recorded one are skipped
+after a stat check of their installed files, without reading any source content.
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path, PurePosixPath
+
+from .constants import DEFAULT_OUTPUT_ROOT, PLUGIN_MANIFEST_PATH
+from .file_ops import hash_content, load_json, replace_atomically, resolve_source, write_text
+from .sources import DirectorySource, SourceTree, list_dirs, list_files, load_source_json, open_source, walk_files
+
+STATE_FILE_NAME = "copilot-converter-install-state.json"
+# Same schema as the PowerShell installer; ``files`` and per-plugin ``contentHash`` are additions it ignores.
+STATE_SCHEMA_VERSION = 2
+INSTALL_TARGETS = ("workspace", "user", "custom")
+
+
+@dataclass(frozen=True)
+class InstallFile:
+    plugin: str
+    kind: str
+    name: str
+    source: PurePosixPath
+    target: Path
+
+
+@dataclass
+class InstallReport:
+    added: list[Path] = field(default_factory=list)
+    updated: list[Path] = field(default_factory=list)
+    removed: list[Path] = field(default_factory=list)
+    unchanged: int = 0
+    skipped: list[Path] = field(default_factory=list)
+
+
+def vscode_user_root() -> Path:
+    if os.name == "nt":
+        appdata = os.environ.get("APPDATA")
+        if not appdata:
+            raise SystemExit("APPDATA is not set. Pass --prompts and --skills with --target custom.")
+        return Path(appdata) / "Code" / "User"
+    mac_root = Path.home() / "Library" / "Application Support" / "Code" / "User"
+    if mac_root.parent.exists():
+        return mac_root
+    return Path.home() / ".config" / "Code" / "User"
+
+
+def resolve_install_paths(
+    target: str,
+    workspace: Path | None = None,
+    prompts: Path | None = None,
+    skills: Path | None = None,
+) -> tuple[Path, Path]:
+    """Return the prompts and skills folders for an install target, as the PowerShell installer does."""
+    if target == "workspace":
+        root = (workspace or Path.cwd()).resolve()
+        return root / ".github" / "prompts", root / ".github" / "skills"
+    if target == "user":
+        return vscode_user_root() / "prompts", Path.home() / ".copilot" / "skills"
+    if prompts is None or skills is None:
+        raise SystemExit("--target custom requires --prompts and --skills")
+    return prompts.resolve(), skills.resolve()
+
+
+def plan_plugin(source: SourceTree, plugin_dir: PurePosixPath, prompts: Path, skills: Path) -> list[InstallFile]:
+    plugin = plugin_dir.name
+    files = [
+        InstallFile(plugin, "agent", path.stem, path, prompts / f"{path.stem}.agent.md")
+        for path in list_files(source, plugin_dir / "agents", ".md")
+    ]
+    files.extend(
+        InstallFile(plugin, "command", path.stem, path, prompts / f"{path.stem}.prompt.md")
+        for path in list_files(source, plugin_dir / "commands", ".md")
+    )
+    for skill_dir in list_dirs(source, plugin_dir / "skills"):
+        files.extend(
+            InstallFile(plugin, "skill", skill_dir.name, path, skills / skill_dir.name / path.relative_to(skill_dir))
+            for path in walk_files(source, skill_dir)
+        )
+    return files
+
+
+def _stat_matches(target: Path, record: dict) -> bool:
+    try:
+        stat = target.stat()
+    except OSError:
+        return False
+    return stat.st_size == record.get("size") and stat.st_mtime_ns == record.get("mtimeNs")
+
+
+def _record(item: InstallFile, content_hash: str) -> dict[str, object]:
+    stat = item.target.stat()
+    return {
+        "plugin": item.plugin,
+        "kind": item.kind,
+        "name": item.name,
+        "source": str(item.source),
+        "hash": content_hash,
+        "size": stat.st_size,
+        "mtimeNs": stat.st_mtime_ns,
+    }
+
+
+def _place(source: SourceTree, item: InstallFile, data: bytes, link: bool) -> None:
+    """Hardlink the source file into place when possible, otherwise write a copy; both replace atomically."""
+    item.target.parent.mkdir(parents=True, exist_ok=True)
+    if link and isinstance(source, DirectorySource):
+        temp = item.target.with_name(f".{item.target.name}.{os.urandom(4).hex()}.tmp")
+        try:
+            os.link(source.root / item.source, temp)
+            os.replace(temp, item.target)
+            return
+        except OSError:
+            temp.unlink(missing_ok=True)
+    with replace_atomically(item.target) as handle:
+        handle.write(data)
+    if source.is_executable(item.source):
+        item.target.chmod(item.target.stat().st_mode | 0o111)
+
+
+def _prune_empty_dirs(path: Path, stop: Path) -> None:
+    while path != stop and path.is_relative_to(stop):
+        try:
+            path.rmdir()
+        except OSError:
+            return
+        path = path.parent
+
+
+class Installer:
+    """Install generated plugins from ``source`` into VS Code prompt and skill folders.
+
+    ``output_root`` is the plugins folder inside ``source``. With ``link``, files from a directory
+    source are hardlinked instead of copied when source and target share a filesystem; ``force``
+    overwrites files the installer did not create.
+    """
+
+    def __init__(
+        self,
+        source: SourceTree,
+        prompts: Path,
+        skills: Path,
+        *,
+        output_root: PurePosixPath = DEFAULT_OUTPUT_ROOT,
+        state_path: Path | None = None,
+        link: bool = True,
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> None:
+        self.source = source
+        self.prompts = prompts
+        self.skills = skills
+        self.output_root = output_root
+        self.state_path = state_path or prompts.parent / STATE_FILE_NAME
+        self.link = link
+        self.force = force
+        self.dry_run = dry_run
+
+    def load_state(self) -> dict:
+        if not self.state_path.exists():
+            return {}
+        state = load_json(self.state_path)
+        if state.get("promptsPath") != str(self.prompts) or state.get("skillsPath") != str(self.skills):
+            return {}
+        return state
+
+    def install(self, add: list[str] | None = None, remove: list[str] | None = None) -> InstallReport:
+        """Bring the targets in line with the recorded plugins plus ``add`` minus ``remove``.
+
+        Without a state file and without ``add``, every plugin in the source is installed.
+        """
+        state = self.load_state()
+        recorded: dict[str, dict] = state.get("files") or {}
+        recorded_hashes = {
+            entry["name"]: entry.get("contentHash")
+            for entry in state.get("plugins", [])
+            if isinstance(entry, dict) and isinstance(entry.get("name"), str)
+        }
+        available = {path.name: path for path in list_dirs(self.source, self.output_root)}
+        selected = set(recorded_hashes) | set(add or [])
+        if not state and not add:
+            selected = set(available)
+        selected -= set(remove or [])
+        unknown = sorted(name for name in selected if name not in available)
+        for name in unknown:
+            print(f"Plugin {name} is no longer in the source; removing its files", file=sys.stderr)
+
+        report = InstallReport()
+        installed: dict[str, dict] = {}
+        content_hashes: dict[str, str | None] = {}
+        for name in sorted(selected - set(unknown)):
+            plugin_dir = available[name]
+            content_hash = load_source_json(self.source, plugin_dir / PLUGIN_MANIFEST_PATH).get("contentHash")
+            content_hashes[name] = content_hash
+            previous = {target: record for target, record in recorded.items() if record.get("plugin") == name}
+            if (
+                content_hash
+                and not self.force
+                and previous
+                and recorded_hashes.get(name) == content_hash
+                and all(_stat_matches(Path(target), record) for target, record in previous.items())
+            ):
+                installed.update(previous)
+                report.unchanged += len(previous)
+                continue
+            skipped = len(report.skipped)
+            for item in plan_plugin(self.source, plugin_dir, self.prompts, self.skills):
+                self._install_file(item, recorded.get(str(item.target)), installed, report)
+            if len(report.skipped) > skipped:
+                # Leave the hash unrecorded so the next run revisits the skipped files.
+                content_hashes[name] = None
+
+        for target in sorted(recorded.keys() - installed.keys()):
+            path = Path(target)
+            if not path.exists():
+                continue
+            report.removed.append(path)
+            if not self.dry_run:
+                path.unlink()
+                root = self.skills if path.is_relative_to(self.skills) else self.prompts
+                _prune_empty_dirs(path.parent, root)
+
+        if not self.dry_run:
+            self._write_state(installed, content_hashes)
+        return report
+
+    def _install_file(
+        self, item: InstallFile, record: dict | None, installed: dict[str, dict], report: InstallReport
+    ) -> None:
+        key = str(item.target)
+        if key in installed:
+            print(f"Skipped {item.source}: {item.target} is already installed from another plugin", file=sys.stderr)
+            return
+        data = self.source.read_bytes(item.source)
+        content_hash = hash_content(data)
+        if item.target.exists():
+            if record is not None and record.get("hash") == content_hash and _stat_matches(item.target, record):
+                installed[key] = {**record, "plugin": item.plugin, "source": str(item.source)}
+                report.unchanged += 1
+                return
+            if hash_content(item.target.read_bytes()) == content_hash:
+                report.unchanged += 1
+            elif record is None and not self.force:
+                print(f"Skipped existing file: {item.target} (use --force to overwrite)", file=sys.stderr)
+                report.skipped.append(item.target)
+                return
+            else:
+                report.updated.append(item.target)
+                if not self.dry_run:
+                    _place(self.source, item, data, self.link)
+        else:
+            report.added.append(item.target)
+            if not self.dry_run:
+                _place(self.source, item, data, self.link)
+        installed[key] = {"plugin": item.plugin} if self.dry_run else _record(item, content_hash)
+
+    def _write_state(self, installed: dict[str, dict], content_hashes: dict[str, str | None]) -> None:
+        plugins = []
+        for name, content_hash in sorted(content_hashes.items()):
+            records = [record for record in installed.values() if record["plugin"] == name]
+            plugins.append(
+                {
+                    "name": name,
+                    "agents": sorted({record["name"] for record in records if record["kind"] == "agent"}),
+                    "commands": sorted({record["name"] for record in records if record["kind"] == "command"}),
+                    "skills": sorted({record["name"] for record in records if record["kind"] == "skill"}),
+                    "contentHash": content_hash,
+                }
+            )
+        state = {
+            "schemaVersion": STATE_SCHEMA_VERSION,
+            "updatedAt": datetime.now(UTC).isoformat(),
+            "promptsPath": str(self.prompts),
+            "skillsPath": str(self.skills),
+            "plugins": plugins,
+            "installedArtifacts": {
+                "promptTargets": sorted(target for target in installed if Path(target).is_relative_to(self.prompts)),
+                "skillTargets": sorted(
+                    {
+                        str(self.skills / Path(target).relative_to(self.skills).parts[0])
+                        for target in installed
+                        if Path(target).is_relative_to(self.skills)
+                    }
+                ),
+            },
+            "files": dict(sorted(installed.items())),
+        }
+        write_text(self.state_path, json.dumps(state, indent=2) + "\n")
+
+
+def _plugin_list(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def install_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="copilot_converter install",
+        description=(
+            "Install generated plugins into VS Code prompt and skill folders, copying only changed files "
+            "and removing only files that are gone on later runs."
+        ),
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=".",
+        help="Publish root holding the plugins folder, or a .zip/tar archive of it (default: .)",
+    )
+    parser.add_argument("--output", default="plugins", help="Plugins folder relative to source (default: plugins)")
+    parser.add_argument("--ref", default=None, help="Install from this commit of the git repository at source")
+    parser.add_argument(
+        "--target",
+        choices=INSTALL_TARGETS,
+        default="workspace",
+        help="workspace: <workspace>/.github/{prompts,skills}; user: VS Code user prompts and ~/.copilot/skills; "
+        "custom: --prompts and --skills (default: workspace)",
+    )
+    parser.add_argument("--workspace", default=None, help="Workspace root for --target workspace (default: .)")
+    parser.add_argument("--prompts", default=None, help="Prompts folder for --target custom")
+    parser.add_argument("--skills", default=None, help="Skills folder for --target custom")
+    parser.add_argument(
+        "--plugins",
+        type=_plugin_list,
+        default=None,
+        metavar="PLUGIN[,PLUGIN...]",
+        help="Add these plugins to the installed set (default: keep the recorded set, or all plugins on first run)",
+    )
+    parser.add_argument(
+        "--remove",
+        type=_plugin_list,
+        default=None,
+        metavar="PLUGIN[,PLUGIN...]",
+        help="Uninstall these plugins",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help=f"Install state file (default: <prompts parent>/{STATE_FILE_NAME})",
+    )
+    parser.add_argument("--copy", action="store_true", help="Always copy files instead of hardlinking them")
+    parser.add_argument("--force", action="store_true", help="Overwrite existing files the installer did not create")
+    parser.add_argument("--dry-run", action="store_true", help="Print what would change without writing")
+    args = parser.parse_args(argv)
+
+    location = resolve_source(args.source)
+    with open_source(location, args.ref) as source:
+        output_root = PurePosixPath(Path(args.output).as_posix())
+        if not source.is_dir(output_root):
+            raise SystemExit(f"No plugins folder {args.output!r} in {location}")
+        prompts, skills = resolve_install_paths(
+            args.target,
+            Path(args.workspace).expanduser() if args.workspace else None,
+            Path(args.prompts).expanduser() if args.prompts else None,
+            Path(args.skills).expanduser() if args.skills else None,
+        )
+        unknown = sorted(set(args.plugins or []) - {path.name for path in list_dirs(source, output_root)})
+        if unknown:
+            raise SystemExit(f"Unknown plugin(s) for --plugins: {', '.join(unknown)}")
+
+        installer = Installer(
+            source,
+            prompts,
+            skills,
+            output_root=output_root,
+            state_path=Path(args.state_file).expanduser().resolve() if args.state_file else None,
+            link=not args.copy,
+            force=args.force,
+            dry_run=args.dry_run,
+        )
+        report = installer.install(args.plugins, args.remove)
+    for code, paths in (("A", report.added), ("M", report.updated), ("D", report.removed)):
+        for path in paths:
+            print(f"{code}\t{path}")
+    print(
+        f"{'Would install' if args.dry_run else 'Installed'}: {len(report.added)} added, {len(report.updated)} "
+        f"updated, {len(report.removed)} removed, {report.unchanged} unchanged, {len(report.skipped)} skipped",
+        file=sys.stderr,
+    )
+    return 0
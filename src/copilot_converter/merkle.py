@@ -0,0 +1,176 @@
+"""Merkle manifest of the generated plugin tree and the ``diff`` entry point.
+
+Every file node holds its content hash and size; every directory node (plugin, skill folder,
+the output root itself) holds a hash over its sorted children. Two manifests are compared by
+descending only into directories whose hashes differ.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator
+
+from .file_ops import resolve_source
+from .git_ops import run_git
+from .models import OutputChange
+from .processing import MARKETPLACE_PATH
+from .sinks import OutputSink
+
+MERKLE_MANIFEST_PATH = MARKETPLACE_PATH.parent / "merkle.json"
+MERKLE_VERSION = 1
+
+_STATUS_CODES = {"added": "A", "removed": "D", "modified": "M"}
+
+
+def _is_dir(node: dict) -> bool:
+    return "entries" in node
+
+
+def _seal(node: dict) -> str:
+    """Hash a directory node from its children, hashing subdirectories first."""
+    digest = hashlib.sha256()
+    for name in sorted(node["entries"]):
+        child = node["entries"][name]
+        child_hash = _seal(child) if _is_dir(child) else child["hash"]
+        digest.update(f"{'tree' if _is_dir(child) else 'blob'} {name}\0{child_hash}\n".encode())
+    node["hash"] = f"sha256:{digest.hexdigest()}"
+    return node["hash"]
+
+
+def build_merkle_manifest(
+    output_root: PurePosixPath,
+    digests: dict[PurePosixPath, tuple[str, int]],
+    keep: dict[str, dict] | None = None,
+) -> dict:
+    """Build the manifest for files below ``output_root``.
+
+    ``digests`` maps sink paths to ``(content hash, size)``. ``keep`` adds top-level subtrees from
+    an earlier manifest for plugins this run did not write.
+    """
+    tree: dict = {"entries": dict(keep or {})}
+    for path, (content_hash, size) in digests.items():
+        parts = path.relative_to(output_root).parts
+        node = tree
+        for part in parts[:-1]:
+            node = node["entries"].setdefault(part, {"entries": {}})
+        node["entries"][parts[-1]] = {"hash": content_hash, "size": size}
+    root_hash = _seal(tree)
+    return {"version": MERKLE_VERSION, "root": str(output_root), "hash": root_hash, "tree": tree}
+
+
+def load_merkle_manifest(sink: OutputSink) -> dict | None:
+    if not sink.exists(MERKLE_MANIFEST_PATH):
+        return None
+    return _parse_manifest(sink.read_bytes(MERKLE_MANIFEST_PATH))
+
+
+def _parse_manifest(payload: bytes) -> dict | None:
+    try:
+        manifest = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MERKLE_VERSION:
+        return None
+    return manifest
+
+
+def write_merkle_manifest(sink: OutputSink, manifest: dict) -> PurePosixPath:
+    payload = json.dumps(manifest, sort_keys=True, separators=(",", ":")) + "\n"
+    sink.write_bytes(MERKLE_MANIFEST_PATH, payload.encode("utf-8"))
+    return MERKLE_MANIFEST_PATH
+
+
+def _files(node: dict, path: PurePosixPath) -> Iterator[PurePosixPath]:
+    if not _is_dir(node):
+        yield path
+        return
+    for name in sorted(node["entries"]):
+        yield from _files(node["entries"][name], path / name)
+
+
+def _diff_nodes(old: dict, new: dict, path: PurePosixPath) -> Iterator[OutputChange]:
+    old_entries, new_entries = old["entries"], new["entries"]
+    for name in sorted(old_entries.keys() | new_entries.keys()):
+        before, after = old_entries.get(name), new_entries.get(name)
+        child_path = path / name
+        if before is not None and after is not None and before["hash"] == after["hash"]:
+            continue
+        if before is not None and after is not None and _is_dir(before) and _is_dir(after):
+            yield from _diff_nodes(before, after, child_path)
+        elif before is not None and after is not None and not _is_dir(before) and not _is_dir(after):
+            yield OutputChange(status="modified", path=str(child_path))
+        else:
+            if before is not None:
+                yield from (OutputChange(status="removed", path=str(item)) for item in _files(before, child_path))
+            if after is not None:
+                yield from (OutputChange(status="added", path=str(item)) for item in _files(after, child_path))
+
+
+def diff_manifests(old: dict, new: dict) -> list[OutputChange]:
+    """List files added, removed or modified between two manifests, skipping equal subtrees."""
+    if old["hash"] == new["hash"]:
+        return []
+    return list(_diff_nodes(old["tree"], new["tree"], PurePosixPath(new.get("root", "."))))
+
+
+def format_change(change: OutputChange) -> str:
+    """Format a change as ``git diff --name-status`` does, e.g. ``M\tplugins/x/README.md``."""
+    return f"{_STATUS_CODES[change.status]}\t{change.path}"
+
+
+def summarize_changes(changes: Iterable[OutputChange]) -> dict[str, int]:
+    counts = dict.fromkeys(_STATUS_CODES, 0)
+    for change in changes:
+        counts[change.status] += 1
+    return counts
+
+
+def _read_manifest(spec: str, repo: Path | None) -> dict:
+    if repo is not None:
+        result = run_git(repo, "show", f"{spec}:{MERKLE_MANIFEST_PATH}", check=False)
+        if result.returncode != 0:
+            raise SystemExit(f"No merkle manifest at {spec}:{MERKLE_MANIFEST_PATH} in {repo}")
+        payload = result.stdout
+        label = f"{spec}:{MERKLE_MANIFEST_PATH}"
+    else:
+        path = resolve_source(spec)
+        if path.is_dir():
+            path = path / MERKLE_MANIFEST_PATH
+        if not path.is_file():
+            raise SystemExit(f"No merkle manifest at {path}")
+        payload = path.read_bytes()
+        label = str(path)
+    manifest = _parse_manifest(payload)
+    if manifest is None:
+        raise SystemExit(f"Not a version {MERKLE_VERSION} merkle manifest: {label}")
+    return manifest
+
+
+def diff_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="copilot_converter diff",
+        description="Compare two merkle manifests of generated output and list added, removed and modified files.",
+    )
+    parser.add_argument("old", help="Manifest file, or a publish root holding .github/plugin/merkle.json")
+    parser.add_argument("new", help="Manifest file, or a publish root holding .github/plugin/merkle.json")
+    parser.add_argument(
+        "--repo",
+        default=None,
+        help="Read OLD and NEW as revisions of this git repository instead of paths",
+    )
+    parser.add_argument("--json", action="store_true", help="Print changes as a JSON list")
+    args = parser.parse_args(argv)
+
+    repo = resolve_source(args.repo) if args.repo else None
+    changes = diff_manifests(_read_manifest(args.old, repo), _read_manifest(args.new, repo))
+    if args.json:
+        print(json.dumps([asdict(change) for change in changes], indent=2))
+    else:
+        for change in changes:
+            print(format_change(change))
+        counts = summarize_changes(changes)
+        print(", ".join(f"{count} {status}" for status, count in counts.items()), file=sys.stderr)
+    return 0
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 
@@ -35,6 +35,10 @@ class DecisionRecord:
     notes: Optional[str]
     reasons: List[str]
     command_neighbors: List[Dict[str, object]]
+    token_estimates: List[Dict[str, object]] = field(default_factory=list)
+    slim_savings: Optional[Dict[str, int]] = None
+    placeholders: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
 
 
 @dataclass(frozen=True)
@@ -43,3 +47,46 @@ class CommandDoc:
     name: str
     path: str
     text: str
+
+
+@dataclass(frozen=True)
+class OutputChange:
+    status: str  # added | removed | modified
+    path: str
+
+
+@dataclass(frozen=True)
+class PlannedFile:
+    path: str
+    size: int
+    hash: str
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    decisions: List[DecisionRecord]
+    selection: Dict[str, object]
+    marketplace_path: str
+    pipeline_stats: Optional[Dict[str, object]] = None
+    over_budget: List[Dict[str, object]] = field(default_factory=list)
+    output_changes: Optional[List[OutputChange]] = None
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    severity: str  # error | warning
+    code: str
+    path: str
+    message: str
+
+
+@dataclass(frozen=True)
+class CatalogAsset:
+    plugin: str
+    kind: str  # agent | command | skill
+    name: str
+    path: str
+    description: str
+    size: int
+    hash: str
+    preview: str
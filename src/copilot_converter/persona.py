@@ -1,5 +1,8 @@
+import re
 from pathlib import Path
+from typing import Iterable, Iterator, TextIO
 
+from .constants import FRONTMATTER_DELIM
 from .file_ops import read_text
 from .frontmatter import parse_simple_frontmatter, split_frontmatter
 
@@ -43,14 +46,104 @@ def extract_agent_persona(plugin_path: Path, agent_hint: str | None = None) -> t
     return split.body, selected_agent.stem
 
 
-def preview_text(text: str | None, limit: int = 400) -> str | None:
-    if not text:
+_WORD_RE = re.compile(r"\S+")
+PREVIEW_CHUNK_SIZE = 4096
+
+
+def _iter_words(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield whitespace-separated words across chunk boundaries, lazily."""
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if pending and chunk[0].isspace():
+            yield pending
+            pending = ""
+        for match in _WORD_RE.finditer(chunk):
+            word = pending + match.group()
+            pending = ""
+            if match.end() == len(chunk):
+                pending = word
+            else:
+                yield word
+    if pending:
+        yield pending
+
+
+def preview_chunks(chunks: Iterable[str], limit: int = 400) -> str | None:
+    """Build a preview from text chunks, consuming only as many as the limit needs.
+
+    Output matches ``preview_text`` on the concatenated chunks, except that input without any
+    words yields ``None``.
+    """
+    words: list[str] = []
+    size = -1
+    for word in _iter_words(chunks):
+        words.append(word)
+        size += len(word) + 1
+        if size > limit:
+            break
+    if not words:
         return None
-    cleaned = " ".join(text.split())
+    cleaned = " ".join(words)
     if len(cleaned) <= limit:
         return cleaned
     return cleaned[: limit - 3] + "..."
 
 
+def preview_text(text: str | None, limit: int = 400) -> str | None:
+    if not text:
+        return None
+    return preview_chunks([text], limit) or ""
+
+
+def _iter_stream_chunks(handle: TextIO, skip_frontmatter: bool) -> Iterator[str]:
+    if skip_frontmatter:
+        yield from _iter_body_lines(handle)
+    while chunk := handle.read(PREVIEW_CHUNK_SIZE):
+        yield chunk
+
+
+def _iter_body_lines(handle: TextIO) -> Iterator[str]:
+    """Position ``handle`` after the frontmatter block, mirroring ``split_frontmatter``.
+
+    Yields the remainder of the closing delimiter line when exotic line breaks follow it. If the
+    frontmatter is unterminated the whole text is the body, so the handle is rewound.
+    """
+    first = handle.readline()
+    first_lines = first.splitlines()
+    if not first_lines or first_lines[0].strip() != FRONTMATTER_DELIM:
+        handle.seek(0)
+        return
+    pending = first_lines[1:]
+    while True:
+        for idx, line in enumerate(pending):
+            if line.strip() == FRONTMATTER_DELIM:
+                yield "\n".join([*pending[idx + 1 :], ""])
+                return
+        raw = handle.readline()
+        if not raw:
+            handle.seek(0)
+            return
+        pending = raw.splitlines()
+
+
+def preview_stream(handle: TextIO, limit: int = 400, *, skip_frontmatter: bool = False) -> str | None:
+    """Preview an open text stream by reading only the prefix the preview needs.
+
+    With ``skip_frontmatter`` the preview covers the body that ``split_frontmatter`` would return.
+    """
+    return preview_chunks(_iter_stream_chunks(handle, skip_frontmatter), limit)
+
+
+def preview_file(path: Path, limit: int = 400, *, skip_frontmatter: bool = False) -> str | None:
+    with path.open(encoding="utf-8") as handle:
+        return preview_stream(handle, limit, skip_frontmatter=skip_frontmatter)
+
+
 def safe_preview(text: str | None, default: str = "") -> str:
     return preview_text(text) or default
+
+
+def safe_stream_preview(handle: TextIO, *, skip_frontmatter: bool = False, default: str = "") -> str:
+    return preview_stream(handle, skip_frontmatter=skip_frontmatter) or default
@@ -0,0 +1,229 @@
+"""Asynchronous conversion pipeline with bounded queues between its stages.
+
+A scanner lists each plugin and queues one job per source file. A pool of readers loads the
+source bytes, a render stage runs the ``PluginConversion`` steps that ``process_plugins`` runs in
+order, and a pool of writers hands the results to the sink. Every queue is bounded, so slow sinks push back on the
+readers instead of letting rendered files pile up in memory. Blocking source, render and sink
+calls run in worker threads; sources and sinks must therefore tolerate calls from several threads.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import PurePosixPath
+from typing import Callable, Iterable, TypeVar
+
+from .models import DecisionRecord
+from .processing import PluginConversion, PluginFile, PluginWrite
+from .sinks import OutputSink
+from .sources import SourceTree
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    readers: int = 4
+    writers: int = 4
+    queue_size: int = 64
+
+
+@dataclass
+class StageStats:
+    """Service time of one stage; ``max_seconds`` is the slowest single item."""
+
+    workers: int
+    items: int = 0
+    busy_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.items += 1
+        self.busy_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 6),
+            "mean_seconds": round(self.busy_seconds / self.items, 6) if self.items else 0.0,
+            "max_seconds": round(self.max_seconds, 6),
+        }
+
+
+@dataclass
+class QueueStats:
+    """Queue depth sampled on every put."""
+
+    capacity: int
+    puts: int = 0
+    peak_depth: int = 0
+    total_depth: int = 0
+
+    def sample(self, depth: int) -> None:
+        self.puts += 1
+        self.total_depth += depth
+        self.peak_depth = max(self.peak_depth, depth)
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "capacity": self.capacity,
+            "puts": self.puts,
+            "peak_depth": self.peak_depth,
+            "mean_depth": round(self.total_depth / self.puts, 3) if self.puts else 0.0,
+        }
+
+
+@dataclass
+class PipelineStats:
+    stages: dict[str, StageStats]
+    queues: dict[str, QueueStats]
+    wall_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "wall_seconds": round(self.wall_seconds, 6),
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+            "queues": {name: stats.as_dict() for name, stats in self.queues.items()},
+        }
+
+
+_Job = tuple[PluginConversion, PluginFile]
+
+_DONE = None
+
+
+class ConversionPipeline:
+    """Convert plugins through ``scan -> read -> render -> write`` stages joined by bounded queues.
+
+    Produces the same files and decision records as ``process_plugins``.
+    """
+
+    def __init__(
+        self,
+        source: SourceTree,
+        sink: OutputSink,
+        output_root: PurePosixPath,
+        options: PipelineOptions | None = None,
+        split_token_limit: int | None = None,
+    ) -> None:
+        self.source = source
+        self.sink = sink
+        self.output_root = output_root
+        self.options = options or PipelineOptions()
+        self.split_token_limit = split_token_limit
+        self.stats = PipelineStats(
+            stages={
+                "scan": StageStats(workers=1),
+                "read": StageStats(workers=self.options.readers),
+                "render": StageStats(workers=1),
+                "write": StageStats(workers=self.options.writers),
+            },
+            queues={
+                "read": QueueStats(capacity=self.options.queue_size),
+                "render": QueueStats(capacity=self.options.queue_size),
+                "write": QueueStats(capacity=self.options.queue_size),
+            },
+        )
+        self._decisions: dict[str, DecisionRecord] = {}
+        self._pending: dict[str, int] = {}
+
+    def run(self, plugin_dirs: Iterable[PurePosixPath], overwrite: bool = True) -> list[DecisionRecord]:
+        started = time.perf_counter()
+        if overwrite:
+            self.sink.clear(self.output_root)
+        asyncio.run(self._run(sorted(plugin_dirs, key=lambda p: p.name)))
+        self.stats.wall_seconds = time.perf_counter() - started
+        return [self._decisions[name] for name in sorted(self._decisions)]
+
+    async def _run(self, plugin_dirs: list[PurePosixPath]) -> None:
+        size = self.options.queue_size
+        read_queue: asyncio.Queue[_Job | None] = asyncio.Queue(size)
+        render_queue: asyncio.Queue[tuple[_Job, dict[str, object] | bytes] | None] = asyncio.Queue(size)
+        write_queue: asyncio.Queue[PluginWrite | None] = asyncio.Queue(size)
+
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._scan(plugin_dirs, read_queue))
+            readers = [group.create_task(self._read(read_queue, render_queue)) for _ in range(self.options.readers)]
+            group.create_task(self._render(render_queue, write_queue))
+            for _ in range(self.options.writers):
+                group.create_task(self._write(write_queue))
+
+            await asyncio.gather(*readers)
+            await self._put(render_queue, "render", _DONE)
+
+    async def _put(self, queue: asyncio.Queue[_T], name: str, item: _T) -> None:
+        await queue.put(item)
+        if item is not _DONE:
+            self.stats.queues[name].sample(queue.qsize())
+
+    async def _timed(self, stage: str, call: Callable[[], _T]) -> _T:
+        started = time.perf_counter()
+        result = await asyncio.to_thread(call)
+        self.stats.stages[stage].record(time.perf_counter() - started)
+        return result
+
+    async def _scan(self, plugin_dirs: list[PurePosixPath], read_queue: asyncio.Queue[_Job | None]) -> None:
+        for plugin_path in plugin_dirs:
+            plugin = await self._timed("scan", partial(self._plan, plugin_path))
+            for file in plugin.files:
+                await self._put(read_queue, "read", (plugin, file))
+        for _ in range(self.options.readers):
+            await self._put(read_queue, "read", _DONE)
+
+    def _plan(self, plugin_path: PurePosixPath) -> PluginConversion:
+        plugin = PluginConversion.plan(self.source, self.sink, plugin_path, self.output_root, self.split_token_limit)
+        self._pending[plugin.name] = len(plugin.files)
+        return plugin
+
+    async def _read(
+        self,
+        read_queue: asyncio.Queue[_Job | None],
+        render_queue: asyncio.Queue[tuple[_Job, dict[str, object] | bytes] | None],
+    ) -> None:
+        while (job := await read_queue.get()) is not _DONE:
+            plugin, file = job
+            payload = await self._timed("read", partial(plugin.load, file))
+            await self._put(render_queue, "render", (job, payload))
+
+    async def _render(
+        self,
+        render_queue: asyncio.Queue[tuple[_Job, dict[str, object] | bytes] | None],
+        write_queue: asyncio.Queue[PluginWrite | None],
+    ) -> None:
+        while (item := await render_queue.get()) is not _DONE:
+            job, payload = item
+            writes = await self._timed("render", partial(self._transform, job, payload))
+            for write in writes:
+                await self._put(write_queue, "write", write)
+        for _ in range(self.options.writers):
+            await self._put(write_queue, "write", _DONE)
+
+    def _transform(self, job: _Job, payload: dict[str, object] | bytes) -> list[PluginWrite]:
+        plugin, file = job
+        writes = plugin.render(file, payload)
+        self._pending[plugin.name] -= 1
+        if self._pending[plugin.name] == 0:
+            finished, self._decisions[plugin.name] = plugin.finish()
+            writes.extend(finished)
+        return writes
+
+    async def _write(self, write_queue: asyncio.Queue[PluginWrite | None]) -> None:
+        while (write := await write_queue.get()) is not _DONE:
+            await self._timed("write", partial(write.write_to, self.sink))
+
+
+def run_pipeline(
+    source: SourceTree,
+    plugin_dirs: Iterable[PurePosixPath],
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    overwrite: bool = True,
+    options: PipelineOptions | None = None,
+    split_token_limit: int | None = None,
+) -> tuple[list[DecisionRecord], PipelineStats]:
+    pipeline = ConversionPipeline(source, sink, output_root, options, split_token_limit)
+    decisions = pipeline.run(plugin_dirs, overwrite)
+    return decisions, pipeline.stats
@@ -0,0 +1,103 @@
+"""Dry-run planning: compute the output a run would produce and compare it with the current output.
+
+``PlanSink`` stands in for the output sink. Writes are recorded as path, size and content hash and
+cleared folders are only marked, so the current output is never touched. Reads and existence checks
+see the planned files layered over the current output, which the run needs for stamping
+``plugin.json``, patching ``marketplace.json`` and loading the previous catalog or merkle manifest;
+only files below ``.github`` folders keep their bytes for that.
+"""
+
+import threading
+from pathlib import PurePosixPath
+
+from .file_ops import hash_content
+from .models import OutputChange, PlannedFile
+from .sinks import ClosingSink
+from .sources import SourceTree, walk_files
+
+_METADATA_DIR = ".github"
+
+
+class PlanSink(ClosingSink):
+    """Record what a run would write on top of ``current``, a tree of the publish root."""
+
+    def __init__(self, current: SourceTree) -> None:
+        self.current = current
+        self._planned: dict[PurePosixPath, PlannedFile] = {}
+        self._kept: dict[PurePosixPath, bytes] = {}
+        self._dirs: set[PurePosixPath] = set()
+        self._cleared: list[PurePosixPath] = []
+        self._lock = threading.Lock()
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        planned = PlannedFile(path=str(path), size=len(data), hash=hash_content(data))
+        with self._lock:
+            self._planned[path] = planned
+            if _METADATA_DIR in path.parts:
+                self._kept[path] = data
+            self._dirs.update(path.parents)
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        with self._lock:
+            if path in self._kept:
+                return self._kept[path]
+            if path in self._planned:
+                raise ValueError(f"Planned content is not kept: {path}")
+        if self._is_cleared(path):
+            raise FileNotFoundError(str(path))
+        return self.current.read_bytes(path)
+
+    def exists(self, path: PurePosixPath) -> bool:
+        with self._lock:
+            if path in self._planned or path in self._dirs:
+                return True
+        if self._is_cleared(path):
+            return False
+        return self.current.is_file(path) or self.current.is_dir(path)
+
+    def clear(self, path: PurePosixPath) -> None:
+        with self._lock:
+            for key in [key for key in self._planned if path in key.parents]:
+                del self._planned[key]
+                self._kept.pop(key, None)
+            self._dirs = {parent for key in self._planned for parent in key.parents}
+            self._dirs.update([path, *path.parents])
+            if not any(cleared == path or cleared in path.parents for cleared in self._cleared):
+                self._cleared.append(path)
+
+    def display(self, path: PurePosixPath) -> str:
+        return self.current.display(path)
+
+    def _is_cleared(self, path: PurePosixPath) -> bool:
+        return any(cleared == path or cleared in path.parents for cleared in self._cleared)
+
+    def files(self) -> list[PlannedFile]:
+        """Every file the run would write, sorted by path."""
+        return [self._planned[path] for path in sorted(self._planned)]
+
+    def changes(self) -> list[OutputChange]:
+        """Compare the plan with the current output: files added, removed or modified.
+
+        Current files are only considered below cleared folders and at planned paths, which is
+        everything a real run would replace.
+        """
+        current = {
+            path
+            for cleared in self._cleared
+            if self.current.is_dir(cleared)
+            for path in walk_files(self.current, cleared)
+        }
+        current.update(path for path in self._planned if path not in current and self.current.is_file(path))
+        changes: list[OutputChange] = []
+        for path in sorted(current | self._planned.keys()):
+            planned = self._planned.get(path)
+            if planned is None:
+                changes.append(OutputChange(status="removed", path=str(path)))
+            elif path not in current:
+                changes.append(OutputChange(status="added", path=str(path)))
+            elif not self._matches(path, planned):
+                changes.append(OutputChange(status="modified", path=str(path)))
+        return changes
+
+    def _matches(self, path: PurePosixPath, planned: PlannedFile) -> bool:
+        return hash_content(self.current.read_bytes(path)) == planned.hash
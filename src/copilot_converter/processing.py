@@ -1,22 +1,48 @@
-import argparse
+import hashlib
+import io
 import json
 import re
-from pathlib import Path
-from typing import Iterable
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import IO, Iterable, Iterator, Mapping, Self
 
 from .builders import (
     build_agent_file,
-    build_commands_for_plugin,
     build_enhanced_prompt_file,
-    build_skill_file,
-    collect_skill_previews,
-    write_plugin_manifest,
+    build_plugin_manifest,
+    plan_missing_local_links,
+    read_source_plugin_metadata,
+    render_agent_bytes,
+    render_plugin_manifest,
+    render_plugin_readme,
+    render_prompt,
+    render_skill_files,
+    source_preview,
+    support_files,
     write_plugin_readme,
 )
-from .constants import SKILL_GLOB
-from .file_ops import ensure_empty_dir, load_json, read_text, write_text
+from .constants import PLUGIN_MANIFEST_PATH, PLUGIN_REASONS
+from .file_ops import SyncBarrier, decode_text, hash_content, load_json, replace_atomically, write_text
 from .models import DecisionRecord
-from .persona import safe_preview
+from .persona import safe_stream_preview
+from .sinks import OutputSink, write_sink_text, write_split_section
+from .sources import (
+    ROOT,
+    SourceTree,
+    list_dirs,
+    list_files,
+    list_skill_files,
+    load_source_json,
+    read_source_text,
+)
+
+MARKETPLACE_PATH = PurePosixPath(".github") / "plugin" / "marketplace.json"
+MARKETPLACE_INDEX_PATH = MARKETPLACE_PATH.parent / "marketplace" / "index.json"
+MARKETPLACE_SHARDS_DIR = MARKETPLACE_INDEX_PATH.parent / "shards"
+
+AWESOME_META_PLUGIN = "copilot-converter"
 
 _SKILL_LINK_RE = re.compile(r"\.\./([a-z0-9][a-z0-9_-]*)/SKILL\.md")
 
@@ -112,46 +138,25 @@ def _render_marketplace_suggestion_command(
     )
 
 
-def iter_plugin_dirs(source: Path, plugin_filter: set[str] | None) -> Iterable[Path]:
-    plugins_dir = source / "plugins"
-    if not plugins_dir.exists():
-        return []
-
-    plugin_dirs = [p for p in plugins_dir.iterdir() if p.is_dir()]
+def iter_plugin_dirs(source: SourceTree, plugin_filter: set[str] | None) -> Iterable[PurePosixPath]:
+    plugin_dirs = list_dirs(source, ROOT / "plugins")
     if plugin_filter:
         return [p for p in plugin_dirs if p.name in plugin_filter]
     return plugin_dirs
 
 
-def resolve_source(source_arg: str) -> Path:
-    source = Path(source_arg).expanduser().resolve()
-    if not source.exists():
-        raise SystemExit(f"Source path not found: {source}")
-    return source
-
+def _plugin_names(source: SourceTree) -> list[str]:
+    return [item.name for item in list_dirs(source, ROOT / "plugins")]
 
-def resolve_output_root(output_arg: str | None) -> Path:
-    output_root = Path(output_arg).expanduser().resolve() if output_arg else Path.cwd() / "plugins"
-    output_root.mkdir(parents=True, exist_ok=True)
-    return output_root
 
-
-def _plugin_names(source: Path) -> list[str]:
-    plugins_dir = source / "plugins"
-    if not plugins_dir.exists():
-        return []
-    return sorted(item.name for item in plugins_dir.iterdir() if item.is_dir())
-
-
-def _collect_plugin_skill_index(source: Path) -> tuple[dict[str, list[Path]], dict[str, set[str]]]:
-    plugins_dir = source / "plugins"
-    skill_paths_by_plugin: dict[str, list[Path]] = {}
+def _collect_plugin_skill_index(
+    source: SourceTree,
+) -> tuple[dict[str, list[PurePosixPath]], dict[str, set[str]]]:
+    skill_paths_by_plugin: dict[str, list[PurePosixPath]] = {}
     skill_names_by_plugin: dict[str, set[str]] = {}
-    if not plugins_dir.exists():
-        return skill_paths_by_plugin, skill_names_by_plugin
 
-    for plugin_dir in sorted((p for p in plugins_dir.iterdir() if p.is_dir()), key=lambda p: p.name):
-        skill_paths = sorted((plugin_dir / "skills").glob(SKILL_GLOB), key=lambda p: p.parent.name)
+    for plugin_dir in list_dirs(source, ROOT / "plugins"):
+        skill_paths = list_skill_files(source, plugin_dir / "skills")
         skill_paths_by_plugin[plugin_dir.name] = skill_paths
         skill_names_by_plugin[plugin_dir.name] = {path.parent.name for path in skill_paths}
 
@@ -169,7 +174,8 @@ def _extract_skill_refs(content: str) -> list[tuple[str | None, str]]:
     return refs
 
 
-def _resolve_plugin_dependencies(source: Path, enabled_plugins: set[str]) -> tuple[set[str], set[str]]:
+def plugin_dependency_graph(source: SourceTree) -> dict[str, set[str]]:
+    """Map each plugin to the plugins providing skills its ``SKILL.md`` files reference."""
     skill_paths_by_plugin, skill_names_by_plugin = _collect_plugin_skill_index(source)
     skill_to_plugins: dict[str, set[str]] = {}
     for plugin_name, skill_names in skill_names_by_plugin.items():
@@ -180,7 +186,7 @@ def _resolve_plugin_dependencies(source: Path, enabled_plugins: set[str]) -> tup
     for plugin_name, skill_paths in skill_paths_by_plugin.items():
         own_skills = skill_names_by_plugin.get(plugin_name, set())
         for skill_path in skill_paths:
-            for explicit_plugin, skill_name in _extract_skill_refs(read_text(skill_path)):
+            for explicit_plugin, skill_name in _extract_skill_refs(read_source_text(source, skill_path)):
                 if explicit_plugin:
                     provider_skills = skill_names_by_plugin.get(explicit_plugin, set())
                     if skill_name in provider_skills and explicit_plugin != plugin_name:
@@ -191,7 +197,10 @@ def _resolve_plugin_dependencies(source: Path, enabled_plugins: set[str]) -> tup
                 for provider_plugin in skill_to_plugins.get(skill_name, set()):
                     if provider_plugin != plugin_name:
                         dependencies[plugin_name].add(provider_plugin)
+    return dependencies
+
 
+def dependency_closure(dependencies: dict[str, set[str]], enabled_plugins: set[str]) -> set[str]:
     resolved_enabled = set(enabled_plugins)
     stack = list(enabled_plugins)
     while stack:
@@ -200,14 +209,43 @@ def _resolve_plugin_dependencies(source: Path, enabled_plugins: set[str]) -> tup
             if provider_plugin not in resolved_enabled:
                 resolved_enabled.add(provider_plugin)
                 stack.append(provider_plugin)
+    return resolved_enabled
+
 
+def _resolve_plugin_dependencies(
+    source: SourceTree, enabled_plugins: set[str], dependencies: dict[str, set[str]] | None = None
+) -> tuple[set[str], set[str]]:
+    if dependencies is None:
+        dependencies = plugin_dependency_graph(source)
+    resolved_enabled = dependency_closure(dependencies, enabled_plugins)
     auto_enabled = resolved_enabled - enabled_plugins
     return resolved_enabled, auto_enabled
 
 
-def sync_plugin_selection(source: Path, config_path: Path) -> set[str]:
+def resolve_plugin_subset(
+    source: SourceTree, requested: Iterable[str], dependencies: dict[str, set[str]] | None = None
+) -> set[str]:
+    """Return ``requested`` plus the plugins providing skills they reference, transitively.
+
+    ``dependencies`` is the ``plugin_dependency_graph`` of ``source`` when the caller already has it.
+    """
+    requested = set(requested)
+    unknown = sorted(requested - set(_plugin_names(source)))
+    if unknown:
+        raise ValueError(f"Unknown plugin(s): {', '.join(unknown)}")
+    resolved, _ = _resolve_plugin_dependencies(source, requested, dependencies)
+    return resolved
+
+
+def resolve_plugin_selection(
+    source: SourceTree, existing: dict, dependencies: dict[str, set[str]] | None = None
+) -> tuple[dict[str, object], set[str]]:
+    """Merge stored plugin choices with the plugins in ``source`` and auto-enable skill providers.
+
+    Returns the normalized ``plugin-selection.json`` payload and the set of enabled plugins.
+    ``dependencies`` is the ``plugin_dependency_graph`` of ``source`` when the caller already has it.
+    """
     plugin_names = _plugin_names(source)
-    existing = load_json(config_path) if config_path.exists() else {}
     existing_plugins = existing.get("plugins", {})
 
     normalized_plugins: dict[str, bool] = {}
@@ -216,154 +254,365 @@ def sync_plugin_selection(source: Path, config_path: Path) -> set[str]:
         normalized_plugins[name] = raw_value if isinstance(raw_value, bool) else True
 
     initially_enabled = {name for name, enabled in normalized_plugins.items() if enabled}
-    resolved_enabled, auto_enabled = _resolve_plugin_dependencies(source, initially_enabled)
+    resolved_enabled, auto_enabled = _resolve_plugin_dependencies(source, initially_enabled, dependencies)
     for name in plugin_names:
         normalized_plugins[name] = name in resolved_enabled
 
-    payload = {
-        "source": str(source),
+    payload: dict[str, object] = {
+        "source": source.display(ROOT),
         "plugins": normalized_plugins,
         "auto_enabled_due_to_skill_references": sorted(auto_enabled),
     }
-    write_text(config_path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
-    return resolved_enabled
+    return payload, resolved_enabled
 
 
-def write_decision_log(path: Path, decisions: list[DecisionRecord]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    serializable: list[dict[str, object]] = []
-    for d in decisions:
-        serializable.append(
-            {
-                "plugin": d.plugin,
-                "classification": d.classification,
-                "mapping_entries": [],
-                "outputs": d.outputs,
-                "prompts": d.prompts,
-                "agents": d.agents,
-                "commands": d.commands,
-                "skills": d.skills,
-                "plugin_path": d.plugin_path,
-                "selected_agent": d.selected_agent,
-                "agent_persona_preview": d.agent_persona_preview,
-                "command_previews": d.command_previews,
-                "skill_previews": d.skill_previews,
-                "notes": d.notes,
-                "reasons": d.reasons,
-                "command_neighbors": [],
-            }
-        )
-    path.write_text(json.dumps(serializable, indent=2, sort_keys=True), encoding="utf-8")
-
-
-def _process_plugin_agents(plugin_path: Path, agents_dir: Path) -> tuple[list[str], list[str]]:
-    produced_paths: list[str] = []
-    agent_names: list[str] = []
-    for agent_file in sorted((plugin_path / "agents").glob("*.md"), key=lambda p: p.name):
-        destination = agents_dir / agent_file.name
-        build_agent_file(agent_file, destination)
-        produced_paths.append(str(destination))
-        agent_names.append(agent_file.stem)
-    return produced_paths, agent_names
-
-
-def _process_plugin_skills(plugin_path: Path, skills_dir: Path) -> tuple[list[str], list[str]]:
-    produced_paths: list[str] = []
-    skill_names: list[str] = []
-    for skill_file in sorted((plugin_path / "skills").glob(SKILL_GLOB), key=lambda p: p.parent.name):
-        skill_name = skill_file.parent.name
-        skill_output_dir = skills_dir / skill_name
-        destination = skill_output_dir / "SKILL.md"
-        build_skill_file(skill_file, destination)
-        produced_paths.append(str(destination))
-        skill_names.append(skill_name)
-    return produced_paths, skill_names
-
+def sync_plugin_selection(source: SourceTree, config_path: Path) -> set[str]:
+    existing = load_json(config_path) if config_path.exists() else {}
+    payload, resolved_enabled = resolve_plugin_selection(source, existing)
+    write_plugin_selection(config_path, payload)
+    return resolved_enabled
 
-def process_plugins(plugin_dirs: Iterable[Path], output_root: Path, args: argparse.Namespace) -> list[DecisionRecord]:
-    ensure_empty_dir(output_root, args.overwrite)
 
-    decisions: list[DecisionRecord] = []
-    for plugin_path in sorted(plugin_dirs, key=lambda p: p.name):
-        plugin_name = plugin_path.name
-        plugin_output_dir = output_root / plugin_name
+def write_plugin_selection(config_path: Path, payload: dict[str, object], barrier: SyncBarrier | None = None) -> None:
+    write_text(config_path, json.dumps(payload, indent=2, sort_keys=True) + "\n", barrier)
 
-        agents_dir = plugin_output_dir / "agents"
-        commands_dir = plugin_output_dir / "commands"
-        skills_dir = plugin_output_dir / "skills"
 
-        manifest = write_plugin_manifest(plugin_path, plugin_output_dir)
+def _decision_payload(d: DecisionRecord) -> dict[str, object]:
+    return {
+        "plugin": d.plugin,
+        "classification": d.classification,
+        "mapping_entries": [],
+        "outputs": d.outputs,
+        "prompts": d.prompts,
+        "agents": d.agents,
+        "commands": d.commands,
+        "skills": d.skills,
+        "plugin_path": d.plugin_path,
+        "selected_agent": d.selected_agent,
+        "agent_persona_preview": d.agent_persona_preview,
+        "command_previews": d.command_previews,
+        "skill_previews": d.skill_previews,
+        "notes": d.notes,
+        "reasons": d.reasons,
+        "command_neighbors": [],
+        "token_estimates": d.token_estimates,
+        "slim_savings": d.slim_savings,
+        "placeholders": d.placeholders,
+        "dependencies": d.dependencies,
+    }
 
-        agent_outputs, agent_names = _process_plugin_agents(plugin_path, agents_dir)
-        skill_outputs, skill_names = _process_plugin_skills(plugin_path, skills_dir)
 
-        command_files = sorted((plugin_path / "commands").glob("*.md"), key=lambda p: p.name)
-        prompt_outputs, command_previews = build_commands_for_plugin(
-            plugin_path=plugin_path,
-            commands_dir=commands_dir,
-            command_files=command_files,
+class DecisionLogWriter:
+    """Append decision records to the decision log one at a time.
+
+    The file is only opened for the first record, and the result is byte-for-byte what
+    ``json.dumps(records, indent=2, sort_keys=True)`` gives for the whole list, so a run never has
+    to hold every record in memory.
+    """
+
+    def __init__(self, path: Path, barrier: SyncBarrier | None = None) -> None:
+        self.path = path
+        self.barrier = barrier
+        self._stack = ExitStack()
+        self._handle: IO[str] | None = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Passing the exception on lets an atomic replace discard the partial log.
+        self._stack.__exit__(exc_type, exc, traceback)
+
+    def write(self, decision: DecisionRecord) -> None:
+        text = json.dumps(_decision_payload(decision), indent=2, sort_keys=True)
+        prefix = ",\n" if self._handle is not None else "[\n"
+        self._open().write(prefix + "\n".join(f"  {line}" for line in text.splitlines()))
+
+    def close(self) -> None:
+        if self._handle is None:
+            self._open().write("[]")
+        else:
+            self._handle.write("\n]")
+        self._stack.close()
+        if self.barrier is not None:
+            self.barrier.add(self.path)
+
+    def _open(self) -> IO[str]:
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.barrier is None:
+                self._handle = self._stack.enter_context(self.path.open("w", encoding="utf-8"))
+            else:
+                self._handle = self._stack.enter_context(replace_atomically(self.path, "w", encoding="utf-8"))
+        return self._handle
+
+
+def write_decision_log(path: Path, decisions: Iterable[DecisionRecord], barrier: SyncBarrier | None = None) -> None:
+    with DecisionLogWriter(path, barrier) as log:
+        for decision in decisions:
+            log.write(decision)
+
+
+@dataclass(frozen=True)
+class PluginWrite:
+    """One output file produced by a conversion step; ``section`` marks a split-off skill section."""
+
+    path: PurePosixPath
+    data: bytes
+    executable: bool = False
+    section: bool = False
+
+    def write_to(self, sink: OutputSink) -> None:
+        if self.section:
+            write_split_section(sink, self.path, self.data)
+        else:
+            sink.write_bytes(self.path, self.data, executable=self.executable)
+
+
+@dataclass(frozen=True)
+class PluginFile:
+    """One source file of a plugin and where its output goes."""
+
+    kind: str  # manifest | agent | skill | command | support
+    index: int
+    source_path: PurePosixPath
+    destination: PurePosixPath
+    executable: bool = False
+
+
+@dataclass
+class PluginConversion:
+    """Convert one plugin file by file, then assemble its README, placeholders and decision record.
+
+    ``plan`` lists the files; ``load`` and ``render`` take them in any order, which lets the
+    sequential loop in ``iter_plugin_decisions`` and the concurrent ``pipeline`` share every
+    rendering step; ``finish`` runs once all of them are rendered.
+    """
+
+    source: SourceTree
+    sink: OutputSink
+    source_path: PurePosixPath
+    output_dir: PurePosixPath
+    split_token_limit: int | None
+    agents: list[PurePosixPath]
+    skills: list[PurePosixPath]
+    commands: list[PurePosixPath]
+    files: list[PluginFile] = field(default_factory=list)
+    planned: set[PurePosixPath] = field(default_factory=set)
+    manifest: dict[str, object] = field(default_factory=dict)
+    rendered_skills: dict[int, str] = field(default_factory=dict)
+    command_previews: dict[int, dict[str, str]] = field(default_factory=dict)
+    skill_previews: dict[int, dict[str, str]] = field(default_factory=dict)
+
+    @classmethod
+    def plan(
+        cls,
+        source: SourceTree,
+        sink: OutputSink,
+        plugin_path: PurePosixPath,
+        output_root: PurePosixPath,
+        split_token_limit: int | None = None,
+    ) -> Self:
+        output_dir = output_root / plugin_path.name
+        plugin = cls(
+            source=source,
+            sink=sink,
+            source_path=plugin_path,
+            output_dir=output_dir,
+            split_token_limit=split_token_limit,
+            agents=list_files(source, plugin_path / "agents", ".md"),
+            skills=list_skill_files(source, plugin_path / "skills"),
+            commands=list_files(source, plugin_path / "commands", ".md"),
         )
-        command_names = [item.stem for item in command_files]
-
-        write_plugin_readme(
-            plugin_dir=plugin_output_dir,
-            manifest=manifest,
-            command_names=command_names,
-            agent_names=agent_names,
-            skill_names=skill_names,
+        files = plugin.files
+        files.append(PluginFile("manifest", 0, plugin_path, output_dir / PLUGIN_MANIFEST_PATH))
+        files.extend(
+            PluginFile("agent", index, path, output_dir / "agents" / path.name)
+            for index, path in enumerate(plugin.agents)
         )
-
-        outputs = [
-            str(plugin_output_dir / ".github" / "plugin" / "plugin.json"),
-            str(plugin_output_dir / "README.md"),
-            *agent_outputs,
-            *skill_outputs,
-            *prompt_outputs,
+        for index, skill_file in enumerate(plugin.skills):
+            destination = plugin.skill_destination(skill_file)
+            files.append(PluginFile("skill", index, skill_file, destination))
+            files.extend(
+                PluginFile("support", index, path, target, executable)
+                for path, target, executable in support_files(source, skill_file.parent, destination.parent)
+            )
+        files.extend(
+            PluginFile("command", index, path, plugin.command_destination(path))
+            for index, path in enumerate(plugin.commands)
+        )
+        for file in files:
+            plugin.planned.update([file.destination, *file.destination.parents])
+        plugin.planned.add(output_dir / "README.md")
+        return plugin
+
+    @property
+    def name(self) -> str:
+        return self.source_path.name
+
+    def skill_destination(self, skill_file: PurePosixPath) -> PurePosixPath:
+        return self.output_dir / "skills" / skill_file.parent.name / "SKILL.md"
+
+    def command_destination(self, command_file: PurePosixPath) -> PurePosixPath:
+        return self.output_dir / "commands" / f"{command_file.stem}.md"
+
+    def load(self, file: PluginFile) -> dict[str, object] | bytes:
+        """Read what ``render`` needs for ``file``: the source manifest or the file bytes."""
+        if file.kind == "manifest":
+            return read_source_plugin_metadata(self.source, file.source_path)
+        return self.source.read_bytes(file.source_path)
+
+    def render(self, file: PluginFile, payload: dict[str, object] | bytes) -> list[PluginWrite]:
+        """Render one loaded file into the writes it produces."""
+        if isinstance(payload, dict):
+            self.manifest = build_plugin_manifest(payload, self.name)
+            return [PluginWrite(file.destination, render_plugin_manifest(self.manifest).encode("utf-8"))]
+        if file.kind == "support":
+            return [PluginWrite(file.destination, payload, file.executable)]
+        if file.kind == "agent":
+            return [PluginWrite(file.destination, render_agent_bytes(payload, file.destination.stem))]
+        content = decode_text(payload)
+        if file.kind == "command":
+            self.command_previews[file.index] = self._preview(file.source_path.name, file, content)
+            rendered = render_prompt(file.source_path, content, file.destination.stem)
+            return [PluginWrite(file.destination, rendered.encode("utf-8"))]
+        self.skill_previews[file.index] = self._preview(file.source_path.parent.name, file, content, True)
+        self.rendered_skills[file.index], skill_files = render_skill_files(
+            content, file.destination, self.split_token_limit, self._is_taken
+        )
+        for target, _ in skill_files:
+            self.planned.update([target, *target.parents])
+        # The skill comes first; any further files are its split-off reference sections.
+        return [
+            PluginWrite(target, text.encode("utf-8"), section=position > 0)
+            for position, (target, text) in enumerate(skill_files)
         ]
 
-        decisions.append(
-            DecisionRecord(
-                plugin=plugin_name,
-                classification="copilot-plugin",
-                mapping_entries=[],
-                outputs=outputs,
-                prompts=prompt_outputs,
-                agents=agent_names,
-                commands=command_names,
-                skills=skill_names,
-                plugin_path=str(plugin_path),
-                selected_agent=None,
-                agent_persona_preview=None,
-                command_previews=command_previews,
-                skill_previews=collect_skill_previews(plugin_path),
-                notes=None,
-                reasons=[
-                    "claude_plugin_to_copilot_plugin",
-                    "agents_to_agents_directory",
-                    "commands_to_commands_directory",
-                    "skills_to_skills_directory",
-                    "emit_plugin_manifest",
-                ],
-                command_neighbors=[],
-            )
+    def _is_taken(self, path: PurePosixPath) -> bool:
+        return path in self.planned or self.sink.exists(path)
+
+    def _preview(self, name: str, file: PluginFile, content: str, skip_frontmatter: bool = False) -> dict[str, str]:
+        return {
+            "name": name,
+            "path": self.source.display(file.source_path),
+            "preview": safe_stream_preview(io.StringIO(content), skip_frontmatter=skip_frontmatter),
+        }
+
+    def finish(self) -> tuple[list[PluginWrite], DecisionRecord]:
+        """Return the README and link placeholder writes and the decision record of the plugin."""
+        source, sink = self.source, self.sink
+        agent_names = [path.stem for path in self.agents]
+        skill_names = [path.parent.name for path in self.skills]
+        command_names = [path.stem for path in self.commands]
+        readme = render_plugin_readme(self.output_dir, self.manifest, command_names, agent_names, skill_names)
+        writes = [PluginWrite(self.output_dir / "README.md", readme.encode("utf-8"))]
+
+        # Files of the whole plugin are known up front, so placeholders only fill genuine gaps.
+        placeholders: set[PurePosixPath] = set()
+        written: list[PurePosixPath] = []
+
+        def exists(path: PurePosixPath) -> bool:
+            return path in placeholders or self._is_taken(path)
+
+        for index, skill_file in enumerate(self.skills):
+            for target, content in plan_missing_local_links(
+                self.skill_destination(skill_file), self.rendered_skills[index], source.display(skill_file), exists
+            ):
+                placeholders.update([target, *target.parents])
+                written.append(target)
+                writes.append(PluginWrite(target, content.encode("utf-8")))
+
+        prompt_outputs = [sink.display(self.command_destination(path)) for path in self.commands]
+        decision = DecisionRecord(
+            plugin=self.name,
+            classification="copilot-plugin",
+            mapping_entries=[],
+            outputs=[
+                sink.display(self.output_dir / PLUGIN_MANIFEST_PATH),
+                sink.display(self.output_dir / "README.md"),
+                *(sink.display(self.output_dir / "agents" / path.name) for path in self.agents),
+                *(sink.display(self.skill_destination(path)) for path in self.skills),
+                *prompt_outputs,
+            ],
+            prompts=prompt_outputs,
+            agents=agent_names,
+            commands=command_names,
+            skills=skill_names,
+            plugin_path=source.display(self.source_path),
+            selected_agent=None,
+            agent_persona_preview=None,
+            command_previews=[self.command_previews[index] for index in range(len(self.commands))],
+            skill_previews=[self.skill_previews[index] for index in range(len(self.skills))],
+            notes=None,
+            reasons=list(PLUGIN_REASONS),
+            command_neighbors=[],
+            placeholders=[sink.display(path) for path in written],
         )
+        return writes, decision
+
+
+def process_plugins(
+    source: SourceTree,
+    plugin_dirs: Iterable[PurePosixPath],
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    overwrite: bool = True,
+    split_token_limit: int | None = None,
+) -> list[DecisionRecord]:
+    return list(iter_plugin_decisions(source, plugin_dirs, sink, output_root, overwrite, split_token_limit))
 
-    return decisions
 
+def _write_all(sink: OutputSink, writes: Iterable[PluginWrite]) -> None:
+    for write in writes:
+        write.write_to(sink)
 
-def process_awesome_meta_agent(awesome_source: Path, output_root: Path) -> DecisionRecord | None:
+
+def iter_plugin_decisions(
+    source: SourceTree,
+    plugin_dirs: Iterable[PurePosixPath],
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    overwrite: bool = True,
+    split_token_limit: int | None = None,
+) -> Iterator[DecisionRecord]:
+    """Convert plugins one at a time, yielding each decision record once its files are written."""
+    if overwrite:
+        sink.clear(output_root)
+
+    for plugin_path in sorted(plugin_dirs, key=lambda p: p.name):
+        plugin = PluginConversion.plan(source, sink, plugin_path, output_root, split_token_limit)
+        for file in plugin.files:
+            _write_all(sink, plugin.render(file, plugin.load(file)))
+        writes, decision = plugin.finish()
+        _write_all(sink, writes)
+        yield decision
+
+
+def process_awesome_meta_agent(
+    awesome_source: SourceTree,
+    sink: OutputSink,
+    output_root: PurePosixPath,
+) -> DecisionRecord | None:
     source_plugin_name = "awesome-copilot"
-    plugin_name = "copilot-converter"
-    agent_source = awesome_source / "agents" / "meta-agentic-project-scaffold.agent.md"
-    if not agent_source.exists():
+    plugin_name = AWESOME_META_PLUGIN
+    agent_source = ROOT / "agents" / "meta-agentic-project-scaffold.agent.md"
+    if not awesome_source.is_file(agent_source):
         return None
 
     plugin_output_dir = output_root / plugin_name
     agents_dir = plugin_output_dir / "agents"
     commands_dir = plugin_output_dir / "commands"
 
-    source_manifest_path = awesome_source / "plugins" / source_plugin_name / ".github" / "plugin" / "plugin.json"
-    source_manifest = load_json(source_manifest_path) if source_manifest_path.exists() else {}
+    source_manifest_path = ROOT / "plugins" / source_plugin_name / ".github" / "plugin" / "plugin.json"
+    source_manifest = load_source_json(awesome_source, source_manifest_path)
     manifest: dict[str, object] = {
         "name": plugin_name,
         "description": str(
@@ -375,13 +624,14 @@ def process_awesome_meta_agent(awesome_source: Path, output_root: Path) -> Decis
         "repository": source_manifest.get("repository") or "https://github.com/github/awesome-copilot",
         "license": source_manifest.get("license") or "MIT",
     }
-    write_text(
+    write_sink_text(
+        sink,
         plugin_output_dir / ".github" / "plugin" / "plugin.json",
         json.dumps(manifest, indent=2, sort_keys=False) + "\n",
     )
 
     agent_destination = agents_dir / "meta-agentic-project-scaffold.md"
-    build_agent_file(agent_source, agent_destination)
+    build_agent_file(awesome_source, agent_source, sink, agent_destination)
 
     prompt_outputs: list[str] = []
     command_names: list[str] = []
@@ -394,19 +644,20 @@ def process_awesome_meta_agent(awesome_source: Path, output_root: Path) -> Decis
             local_target=command_doc["local_target"],
         )
         prompt_destination = commands_dir / f"{command_name}.md"
-        write_text(prompt_destination, rendered)
-        prompt_outputs.append(str(prompt_destination))
+        write_sink_text(sink, prompt_destination, rendered)
+        prompt_outputs.append(sink.display(prompt_destination))
         command_names.append(command_name)
 
     # Keep create-readme available as a direct convenience prompt.
-    create_readme_source = awesome_source / "prompts" / "create-readme.prompt.md"
-    if create_readme_source.exists() and "create-readme" not in command_names:
+    create_readme_source = ROOT / "prompts" / "create-readme.prompt.md"
+    if awesome_source.is_file(create_readme_source) and "create-readme" not in command_names:
         prompt_destination = commands_dir / "create-readme.md"
-        build_enhanced_prompt_file(create_readme_source, prompt_destination)
-        prompt_outputs.append(str(prompt_destination))
+        build_enhanced_prompt_file(awesome_source, create_readme_source, sink, prompt_destination)
+        prompt_outputs.append(sink.display(prompt_destination))
         command_names.append("create-readme")
 
     write_plugin_readme(
+        sink=sink,
         plugin_dir=plugin_output_dir,
         manifest=manifest,
         command_names=command_names,
@@ -415,9 +666,9 @@ def process_awesome_meta_agent(awesome_source: Path, output_root: Path) -> Decis
     )
 
     outputs = [
-        str(plugin_output_dir / ".github" / "plugin" / "plugin.json"),
-        str(plugin_output_dir / "README.md"),
-        str(agent_destination),
+        sink.display(plugin_output_dir / ".github" / "plugin" / "plugin.json"),
+        sink.display(plugin_output_dir / "README.md"),
+        sink.display(agent_destination),
         *prompt_outputs,
     ]
 
@@ -430,9 +681,9 @@ def process_awesome_meta_agent(awesome_source: Path, output_root: Path) -> Decis
         agents=["meta-agentic-project-scaffold"],
         commands=command_names,
         skills=[],
-        plugin_path=str(agent_source),
+        plugin_path=awesome_source.display(agent_source),
         selected_agent="meta-agentic-project-scaffold",
-        agent_persona_preview=safe_preview(read_text(agent_source)),
+        agent_persona_preview=source_preview(awesome_source, agent_source),
         command_previews=[],
         skill_previews=[],
         notes="Injected from github/awesome-copilot.",
@@ -444,51 +695,239 @@ def process_awesome_meta_agent(awesome_source: Path, output_root: Path) -> Decis
     )
 
 
-def _slugify_marketplace_name(name: str) -> str:
+def slugify_marketplace_name(name: str) -> str:
     slug = re.sub(r"[^a-z0-9-]+", "-", name.lower()).strip("-")
     return slug or "local-marketplace"
 
 
-def _marketplace_path(target: Path, workspace_root: Path) -> str:
-    target_resolved = target.resolve()
-    workspace_resolved = workspace_root.resolve()
-    try:
-        relative = target_resolved.relative_to(workspace_resolved)
-        return f"./{relative.as_posix()}"
-    except ValueError:
-        return str(target_resolved)
-
-
-def write_marketplace_manifest(workspace_root: Path, output_root: Path) -> Path:
+def marketplace_source(target: PurePosixPath) -> str:
+    """Format an output path for marketplace and catalog entries: absolute as is, otherwise ``./path``."""
+    if target.is_absolute():
+        return str(target)
+    return f"./{target.as_posix()}"
+
+
+def plugin_content_hash(files: Mapping[PurePosixPath, str]) -> str:
+    """Hash a generated plugin from its files' relative paths and content hashes.
+
+    ``plugin.json`` is left out so the manifest can carry the hash of everything else.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        if path != PLUGIN_MANIFEST_PATH:
+            digest.update(f"{path}\0{files[path]}\n".encode())
+    return f"sha256:{digest.hexdigest()}"
+
+
+def derived_build_version(version: str, content_hash: str) -> str:
+    """Append the content hash as semver build metadata, e.g. ``1.0.0+3f2a9c0d41be``."""
+    return f"{version.split('+', 1)[0]}+{content_hash.removeprefix('sha256:')[:12]}"
+
+
+def stamp_plugin_manifests(
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    plugin_names: Iterable[str],
+    digests: Mapping[PurePosixPath, tuple[str, int]],
+    derived_versions: bool = False,
+) -> dict[str, str]:
+    """Add ``contentHash`` (and with ``derived_versions`` a derived ``version``) to ``plugin.json``.
+
+    ``digests`` maps sink paths to ``(content hash, size)`` for every file written below
+    ``output_root``. Returns the content hash of each stamped plugin.
+    """
+    plugin_files: dict[str, dict[PurePosixPath, str]] = {}
+    for path, (file_hash, _) in digests.items():
+        relative = relative_parts(path, output_root)
+        if relative:
+            plugin_files.setdefault(relative[0], {})[PurePosixPath(*relative[1:])] = file_hash
+
+    hashes: dict[str, str] = {}
+    for plugin_name in sorted(set(plugin_names)):
+        manifest_path = output_root / plugin_name / PLUGIN_MANIFEST_PATH
+        if not sink.exists(manifest_path):
+            continue
+        manifest = _load_sink_json(sink, manifest_path)
+        content_hash = plugin_content_hash(plugin_files.get(plugin_name, {}))
+        if derived_versions:
+            manifest["version"] = derived_build_version(str(manifest.get("version") or "1.0.0"), content_hash)
+        manifest["contentHash"] = content_hash
+        write_sink_text(sink, manifest_path, render_plugin_manifest(manifest))
+        hashes[plugin_name] = content_hash
+    return hashes
+
+
+def _marketplace_entries(
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    plugin_names: Iterable[str],
+) -> list[dict[str, str]]:
     plugin_entries: list[dict[str, str]] = []
-    for plugin_dir in sorted((p for p in output_root.iterdir() if p.is_dir()), key=lambda p: p.name):
-        plugin_manifest_path = plugin_dir / ".github" / "plugin" / "plugin.json"
-        if not plugin_manifest_path.exists():
+    for plugin_name in sorted(set(plugin_names)):
+        plugin_dir = output_root / plugin_name
+        plugin_manifest_path = plugin_dir / PLUGIN_MANIFEST_PATH
+        if not sink.exists(plugin_manifest_path):
             continue
-        plugin_manifest = load_json(plugin_manifest_path)
-        plugin_entries.append(
-            {
-                "name": str(plugin_manifest.get("name") or plugin_dir.name),
-                "source": _marketplace_path(plugin_dir, workspace_root),
-                "description": str(plugin_manifest.get("description") or f"Plugin {plugin_dir.name}"),
-                "version": str(plugin_manifest.get("version") or "1.0.0"),
-            }
-        )
+        plugin_manifest = _load_sink_json(sink, plugin_manifest_path)
+        entry = {
+            "name": str(plugin_manifest.get("name") or plugin_dir.name),
+            "source": marketplace_source(plugin_dir),
+            "description": str(plugin_manifest.get("description") or f"Plugin {plugin_dir.name}"),
+            "version": str(plugin_manifest.get("version") or "1.0.0"),
+        }
+        if isinstance(plugin_manifest.get("contentHash"), str):
+            entry["contentHash"] = plugin_manifest["contentHash"]
+        plugin_entries.append(entry)
+    return plugin_entries
+
+
+def write_marketplace_manifest(
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    plugin_names: Iterable[str],
+    marketplace_name: str,
+    shard_count: int = 0,
+) -> PurePosixPath:
+    """Write ``marketplace.json`` and, with ``shard_count``, the sharded index next to it."""
+    plugin_entries = _marketplace_entries(sink, output_root, plugin_names)
+    return _write_marketplace(sink, output_root, plugin_entries, marketplace_name, shard_count)
+
+
+def patch_marketplace_manifest(
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    plugin_names: Iterable[str],
+    marketplace_name: str,
+    shard_count: int = 0,
+) -> PurePosixPath:
+    """Refresh the entries of ``plugin_names`` in the existing ``marketplace.json``.
+
+    Entries of other plugins are kept as they are; a missing manifest is written from scratch.
+    """
+    plugin_names = set(plugin_names)
+    refreshed = {marketplace_source(output_root / name) for name in plugin_names}
+    existing = _load_sink_json(sink, MARKETPLACE_PATH) if sink.exists(MARKETPLACE_PATH) else {}
+    kept = [
+        entry
+        for entry in existing.get("plugins", [])
+        if isinstance(entry, dict) and isinstance(entry.get("source"), str) and entry["source"] not in refreshed
+    ]
+    plugin_entries = sorted(
+        [*kept, *_marketplace_entries(sink, output_root, plugin_names)],
+        key=lambda entry: PurePosixPath(entry["source"]).name,
+    )
+    return _write_marketplace(sink, output_root, plugin_entries, marketplace_name, shard_count)
+
+
+def _write_marketplace(
+    sink: OutputSink,
+    output_root: PurePosixPath,
+    plugin_entries: list[dict[str, str]],
+    marketplace_name: str,
+    shard_count: int,
+) -> PurePosixPath:
+    metadata: dict[str, str] = {
+        "description": "Generated Copilot plugin marketplace from wshobson/agents via copilot-converter.",
+        "version": "1.0.0",
+        "pluginRoot": marketplace_source(output_root),
+    }
+    owner = {
+        "name": "copilot-converter",
+        "email": "noreply@copilot-converter.local",
+    }
+    # Shards from a previous run with another shard count must not linger.
+    if sink.exists(MARKETPLACE_INDEX_PATH.parent):
+        sink.clear(MARKETPLACE_INDEX_PATH.parent)
+    if shard_count > 0:
+        write_marketplace_shards(sink, marketplace_name, metadata, owner, plugin_entries, shard_count)
+        metadata["shardIndex"] = f"./{MARKETPLACE_INDEX_PATH.relative_to(MARKETPLACE_PATH.parent)}"
 
     marketplace = {
-        "name": _slugify_marketplace_name(workspace_root.name),
-        "metadata": {
-            "description": "Generated Copilot plugin marketplace from wshobson/agents via copilot-converter.",
-            "version": "1.0.0",
-            "pluginRoot": _marketplace_path(output_root, workspace_root),
-        },
-        "owner": {
-            "name": "copilot-converter",
-            "email": "noreply@copilot-converter.local",
-        },
+        "name": marketplace_name,
+        "metadata": metadata,
+        "owner": owner,
         "plugins": plugin_entries,
     }
 
-    destination = workspace_root / ".github" / "plugin" / "marketplace.json"
-    write_text(destination, json.dumps(marketplace, indent=2, sort_keys=False) + "\n")
+    destination = MARKETPLACE_PATH
+    write_sink_text(sink, destination, json.dumps(marketplace, indent=2, sort_keys=False) + "\n")
     return destination
+
+
+def relative_parts(path: PurePosixPath, root: PurePosixPath) -> tuple[str, ...] | None:
+    """Return ``path.relative_to(root).parts``, or None outside ``root``.
+
+    Comparing parts is far cheaper than ``relative_to``, which matters for per-file bookkeeping.
+    """
+    parts, root_parts = path.parts, root.parts
+    if parts[: len(root_parts)] != root_parts:
+        return None
+    return parts[len(root_parts) :]
+
+
+def marketplace_shard_id(plugin_name: str, shard_count: int) -> str:
+    """Assign a plugin to a shard by name hash, so adding plugins never moves existing ones."""
+    index = int.from_bytes(hashlib.sha256(plugin_name.encode("utf-8")).digest()[:8], "big") % shard_count
+    return f"{index:0{len(str(shard_count - 1))}d}"
+
+
+def write_marketplace_shards(
+    sink: OutputSink,
+    marketplace_name: str,
+    metadata: dict[str, str],
+    owner: dict[str, str],
+    plugin_entries: list[dict[str, str]],
+    shard_count: int,
+) -> PurePosixPath:
+    """Write the sharded marketplace layout and return the index path.
+
+    ``marketplace/index.json`` lists every plugin with its version, shard id, entry hash and
+    plugin content hash, plus each shard's file and content hash. ``marketplace/shards/<id>.json``
+    holds the full entries.
+    """
+    shards: dict[str, list[dict[str, str]]] = {}
+    index_plugins: list[dict[str, str]] = []
+    for entry in plugin_entries:
+        shard_id = marketplace_shard_id(entry["name"], shard_count)
+        shards.setdefault(shard_id, []).append(entry)
+        index_entry = {
+            "name": entry["name"],
+            "version": entry["version"],
+            "shard": shard_id,
+            "hash": hash_content(json.dumps(entry, sort_keys=True).encode("utf-8")),
+        }
+        if "contentHash" in entry:
+            index_entry["contentHash"] = entry["contentHash"]
+        index_plugins.append(index_entry)
+
+    index_shards: list[dict[str, object]] = []
+    for shard_id, entries in sorted(shards.items()):
+        shard_path = MARKETPLACE_SHARDS_DIR / f"{shard_id}.json"
+        payload = (json.dumps({"shard": shard_id, "plugins": entries}, indent=2, sort_keys=False) + "\n").encode()
+        sink.write_bytes(shard_path, payload)
+        index_shards.append(
+            {
+                "id": shard_id,
+                "path": f"./{shard_path.relative_to(MARKETPLACE_INDEX_PATH.parent)}",
+                "hash": hash_content(payload),
+                "plugins": len(entries),
+            }
+        )
+
+    index = {
+        "name": marketplace_name,
+        "metadata": metadata,
+        "owner": owner,
+        "shardCount": shard_count,
+        "shards": index_shards,
+        "plugins": index_plugins,
+    }
+    write_sink_text(sink, MARKETPLACE_INDEX_PATH, json.dumps(index, indent=2, sort_keys=False) + "\n")
+    return MARKETPLACE_INDEX_PATH
+
+
+def _load_sink_json(sink: OutputSink, path: PurePosixPath) -> dict:
+    try:
+        return json.loads(sink.read_bytes(path).decode("utf-8"))
+    except json.JSONDecodeError:
+        return {}
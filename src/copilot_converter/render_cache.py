@@ -0,0 +1,105 @@
+"""Content-addressed on-disk cache of rendered agents, prompts, skills and placeholders.
+
+A render is a pure function of its inputs and the converter build, so entries are keyed by a
+hash of the converter digest, the renderer and its arguments. Any checkout or CI job pointing at
+the same directory shares the entries. Entries are written atomically, so concurrent runs can use
+one cache; reads bump an entry's mtime and ``prune`` evicts the least recently used entries once
+the directory grows past its size bound.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from .file_ops import replace_atomically
+from .run_state import converter_digest
+
+RENDER_CACHE_VERSION = 1
+DEFAULT_RENDER_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class DiskRenderCache:
+    """Store rendered text under ``root`` and keep the directory within ``max_bytes``.
+
+    ``salt`` identifies the converter build and defaults to the digest of its modules.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_RENDER_CACHE_BYTES, salt: str | None = None) -> None:
+        self.root = root / f"v{RENDER_CACHE_VERSION}"
+        self.max_bytes = max_bytes
+        self.salt = salt if salt is not None else converter_digest()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def key(self, renderer: str, args: tuple[object, ...]) -> str:
+        digest = hashlib.sha256(f"{self.salt}\0{renderer}\0".encode())
+        for arg in args:
+            data = str(arg).encode("utf-8")
+            digest.update(f"{type(arg).__name__}:{len(data)}:".encode())
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data.decode("utf-8")
+
+    def put(self, key: str, rendered: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with replace_atomically(path) as handle:
+            handle.write(rendered.encode("utf-8"))
+
+    def render(self, renderer: str, render: Callable[..., str], args: tuple[object, ...]) -> str:
+        key = self.key(renderer, args)
+        cached = self.get(key)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            return cached
+        rendered = render(*args)
+        self.put(key, rendered)
+        return rendered
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits ``max_bytes``; return how many went."""
+        entries: list[tuple[int, int, Path]] = []
+        total = 0
+        if not self.root.is_dir():
+            return 0
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+                total += stat.st_size
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evicted": self.evicted}
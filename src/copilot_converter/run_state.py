@@ -0,0 +1,96 @@
+"""Run keys that let the CLI skip conversions whose inputs have not changed."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .file_ops import load_json, write_text
+from .git_ops import resolve_commit, run_git
+
+RUN_STATE_NAME = ".copilot-converter-run.json"
+
+
+def converter_version() -> str:
+    # importlib.metadata costs more than the rest of a no-op run, so it is only used when recording.
+    from importlib import metadata
+
+    try:
+        return metadata.version("copilot-converter")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def converter_digest() -> str:
+    """Identify the converter build by hashing its modules.
+
+    This stands in for the package version in the run key: output only changes when the code does,
+    and local edits invalidate the key even without a version bump.
+    """
+    digest = hashlib.sha256()
+    for module in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(module.name.encode("utf-8"))
+        digest.update(module.read_bytes())
+    return digest.hexdigest()
+
+
+def _stat_fingerprint(root: Path) -> str:
+    digest = hashlib.sha256()
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name != ".git")
+        for name in sorted(filenames):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, root)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def fingerprint_location(location: Path, ref: str | None = None) -> str:
+    """Cheaply identify the content of a source location.
+
+    Git repositories are keyed by commit (plus work-tree status for checkouts), archives by size
+    and mtime, and other directories by a stat walk of the tree.
+    """
+    if ref is not None:
+        return f"git:{resolve_commit(location, ref)}"
+    if location.is_dir() and (location / ".git").exists():
+        head = resolve_commit(location, "HEAD")
+        status = run_git(location, "status", "--porcelain", "-z", check=False).stdout
+        return f"git:{head}:{hashlib.sha256(status).hexdigest()}"
+    if location.is_dir():
+        return f"tree:{_stat_fingerprint(location)}"
+    stat = location.stat()
+    return f"archive:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def compute_run_key(
+    sources: list[tuple[Path, str | None]],
+    selection_path: Path,
+    options: dict[str, object],
+) -> str:
+    payload = {
+        "sources": [fingerprint_location(location, ref) for location, ref in sources],
+        "selection": selection_path.read_text(encoding="utf-8") if selection_path.exists() else "",
+        "converter": converter_digest(),
+        "options": options,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def is_up_to_date(state_path: Path, run_key: str, outputs: list[Path], output_commit: str | None = None) -> bool:
+    """Return whether the last successful run used ``run_key`` and its outputs are still in place."""
+    if not state_path.exists():
+        return False
+    state = load_json(state_path)
+    if state.get("run_key") != run_key or state.get("output_commit") != output_commit:
+        return False
+    return all(path.exists() for path in outputs)
+
+
+def record_run(state_path: Path, run_key: str, output_commit: str | None = None) -> None:
+    payload = {
+        "run_key": run_key,
+        "output_commit": output_commit,
+        "version": converter_version(),
+    }
+    write_text(state_path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
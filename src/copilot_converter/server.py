@@ -0,0 +1,264 @@
+"""Resident converter that keeps sources, the dependency graph and renders warm between requests.
+
+Clients send one JSON object per line over a Unix socket and read one JSON line back:
+
+- ``{"op": "convert", "cwd": "/repo", "argv": ["--output", "plugins"]}`` runs the CLI in ``cwd``
+- ``{"op": "query", "what": "plugins", "source": "/path/to/agents", "ref": null}``
+- ``{"op": "query", "what": "dependencies", "source": "...", "plugin": "name"}``
+- ``{"op": "query", "what": "stats"}``
+- ``{"op": "ping"}`` and ``{"op": "shutdown"}``
+
+Requests are handled one at a time. Conversions reuse the cached sources and their dependency
+graphs.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import time
+from pathlib import Path
+
+from .app import main
+from .builders import enable_render_caches, render_cache_stats
+from .file_ops import resolve_source
+from .processing import dependency_closure, iter_plugin_dirs, plugin_dependency_graph
+from .run_state import fingerprint_location
+from .sources import DirectorySnapshot, SourceTree, open_source
+
+
+def default_socket_path() -> Path:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "copilot-converter.sock"
+    return Path(tempfile.gettempdir()) / f"copilot-converter-{os.getuid()}.sock"
+
+
+class SourceCache:
+    """Keep opened sources between conversions and re-read only what changed.
+
+    Directories are held as ``DirectorySnapshot`` and refreshed with a stat walk; archives and
+    git refs are reopened when their fingerprint changes.
+    """
+
+    def __init__(self) -> None:
+        self._sources: dict[tuple[Path, str | None], tuple[str, SourceTree]] = {}
+        self._graphs: dict[tuple[Path, str | None], tuple[str, dict[str, set[str]]]] = {}
+        self.changed_files = 0
+
+    def open(self, location: Path, ref: str | None = None) -> SourceTree:
+        return self._open(location, ref)[1]
+
+    def _open(self, location: Path, ref: str | None) -> tuple[str, SourceTree]:
+        key = (location, ref)
+        cached = self._sources.get(key)
+        if ref is None and location.is_dir():
+            if cached is not None and isinstance(cached[1], DirectorySnapshot):
+                snapshot = cached[1]
+                self.changed_files += len(snapshot.refresh())
+            else:
+                snapshot = DirectorySnapshot(location)
+            entry: tuple[str, SourceTree] = (f"snapshot:{snapshot.generation}", snapshot)
+        else:
+            fingerprint = fingerprint_location(location, ref)
+            if cached is not None and cached[0] == fingerprint:
+                return cached
+            if cached is not None:
+                cached[1].close()
+            entry = (fingerprint, open_source(location, ref))
+        self._sources[key] = entry
+        return entry
+
+    def dependency_graph(self, location: Path, ref: str | None = None) -> dict[str, set[str]]:
+        version, source = self._open(location, ref)
+        return self._graph((location, ref), version, source)
+
+    def dependency_graph_of(self, source: SourceTree) -> dict[str, set[str]]:
+        """Return the dependency graph of ``source``, reused while a source from ``open`` is unchanged."""
+        for key, (version, cached_source) in self._sources.items():
+            if cached_source is source:
+                return self._graph(key, version, source)
+        return plugin_dependency_graph(source)
+
+    def _graph(self, key: tuple[Path, str | None], version: str, source: SourceTree) -> dict[str, set[str]]:
+        cached = self._graphs.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, plugin_dependency_graph(source))
+            self._graphs[key] = cached
+        return cached[1]
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def close(self) -> None:
+        for _, source in self._sources.values():
+            source.close()
+        self._sources.clear()
+        self._graphs.clear()
+
+
+class ConverterServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+        self.sources = SourceCache()
+        self.requests = 0
+        self.started = time.monotonic()
+        self.stopping = False
+        enable_render_caches()
+        # Create the socket owner-only instead of narrowing it after it is already reachable.
+        umask = os.umask(0o077)
+        try:
+            super().__init__(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def dispatch(self, request: dict) -> dict[str, object]:
+        self.requests += 1
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True}
+        if op == "shutdown":
+            self.stopping = True
+            return {"ok": True}
+        if op == "convert":
+            return self._convert(request)
+        if op == "query":
+            return self._query(request)
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    def _convert(self, request: dict) -> dict[str, object]:
+        """Run the CLI; the response carries what it printed as ``stdout`` and ``stderr``."""
+        started = time.perf_counter()
+        stdout, stderr = io.StringIO(), io.StringIO()
+        response: dict[str, object]
+        try:
+            with (
+                contextlib.chdir(request.get("cwd") or os.getcwd()),
+                contextlib.redirect_stdout(stdout),
+                contextlib.redirect_stderr(stderr),
+            ):
+                status = main(
+                    [str(arg) for arg in request.get("argv", [])],
+                    source_opener=self.sources.open,
+                    dependency_graph=self.sources.dependency_graph_of,
+                )
+        except SystemExit as exc:
+            response = {"ok": False, "error": stderr.getvalue().strip() or str(exc.code)}
+        # A failed conversion is reported to the client; the server keeps serving.
+        except Exception as exc:  # noqa: BLE001
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        else:
+            response = {
+                "ok": status == 0,
+                "status": status,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+        return {**response, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def _query(self, request: dict) -> dict[str, object]:
+        what = request.get("what")
+        if what == "stats":
+            return {
+                "ok": True,
+                "requests": self.requests,
+                "uptime_seconds": round(time.monotonic() - self.started, 1),
+                "cached_sources": len(self.sources),
+                "changed_files": self.sources.changed_files,
+                "render_cache": render_cache_stats(),
+            }
+
+        location = resolve_source(str(request.get("source", "")))
+        ref = request.get("ref")
+        if what == "plugins":
+            source = self.sources.open(location, ref)
+            return {"ok": True, "plugins": [path.name for path in iter_plugin_dirs(source, None)]}
+        if what == "dependencies":
+            plugin = str(request.get("plugin", ""))
+            graph = self.sources.dependency_graph(location, ref)
+            if plugin not in graph:
+                return {"ok": False, "error": f"unknown plugin: {plugin}"}
+            return {
+                "ok": True,
+                "plugin": plugin,
+                "requires": sorted(graph[plugin]),
+                "closure": sorted(dependency_closure(graph, {plugin}) - {plugin}),
+            }
+        return {"ok": False, "error": f"unknown query: {what}"}
+
+    def serve_until_shutdown(self) -> None:
+        while not self.stopping:
+            self.handle_request()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.sources.close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: ConverterServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = (
+                    self.server.dispatch(request)
+                    if isinstance(request, dict)
+                    else {"ok": False, "error": "request must be a JSON object"}
+                )
+            except (json.JSONDecodeError, ValueError, OSError, SystemExit) as exc:
+                response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if self.server.stopping:
+                return
+
+
+def send_request(socket_path: Path, request: dict[str, object]) -> dict[str, object]:
+    """Send one request to a running server and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as stream:
+            return json.loads(stream.readline())
+
+
+def _claim_socket(socket_path: Path) -> None:
+    if not socket_path.exists():
+        return
+    try:
+        send_request(socket_path, {"op": "ping"})
+    except OSError:
+        socket_path.unlink(missing_ok=True)
+        return
+    raise SystemExit(f"A converter server is already listening on {socket_path}")
+
+
+def serve_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="copilot_converter serve",
+        description="Keep the converter resident and answer convert/query requests over a Unix socket.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=str(default_socket_path()),
+        help="Unix socket to listen on (default: $XDG_RUNTIME_DIR/copilot-converter.sock)",
+    )
+    args = parser.parse_args(argv)
+    socket_path = Path(args.socket).expanduser()
+    _claim_socket(socket_path)
+
+    with ConverterServer(socket_path) as server:
+        try:
+            server.serve_until_shutdown()
+        except KeyboardInterrupt:
+            pass
+    return 0
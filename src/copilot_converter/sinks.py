@@ -0,0 +1,238 @@
+"""Output sinks that receive the rendered plugin tree.
+
+Sinks address files with ``PurePosixPath`` values relative to the publish root (the directory
+holding ``plugins/`` and ``.github/plugin/marketplace.json``).
+"""
+
+import io
+import os
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import Protocol, Self, runtime_checkable
+
+from .file_ops import SyncBarrier, ensure_empty_dir, replace_atomically, swap_directory
+
+_ARCHIVE_DATE = (1980, 1, 1, 0, 0, 0)
+_ARCHIVE_MTIME = 315532800  # 1980-01-01, matching the zip timestamp
+
+
+class OutputSink(Protocol):
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None: ...
+
+    def read_bytes(self, path: PurePosixPath) -> bytes: ...
+
+    def exists(self, path: PurePosixPath) -> bool: ...
+
+    def clear(self, path: PurePosixPath) -> None: ...
+
+    def display(self, path: PurePosixPath) -> str: ...
+
+    def close(self) -> None: ...
+
+
+@runtime_checkable
+class SectionSink(Protocol):
+    """A sink that handles reference sections split off a skill apart from copied files."""
+
+    def write_section(self, path: PurePosixPath, data: bytes) -> None: ...
+
+
+def write_sink_text(sink: OutputSink, path: PurePosixPath, content: str) -> None:
+    sink.write_bytes(path, content.encode("utf-8"))
+
+
+def write_split_section(sink: OutputSink, path: PurePosixPath, data: bytes) -> None:
+    """Write a reference section split off a skill, through ``write_section`` when ``sink`` has it."""
+    if isinstance(sink, SectionSink):
+        sink.write_section(path, data)
+    else:
+        sink.write_bytes(path, data)
+
+
+def _key(path: PurePosixPath | str) -> str:
+    return str(PurePosixPath(path))
+
+
+class ClosingSink:
+    """Base for sinks with nothing to release: ``close`` does nothing and ``with`` closes the sink."""
+
+    def close(self) -> None:
+        return None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class DirectorySink(ClosingSink):
+    """Write output files below a directory on disk.
+
+    With a ``barrier`` every file is written to a temp file and renamed into place, and the
+    caller makes the whole output durable with one ``barrier.flush()``. Cleared folders are not
+    deleted up front: their new content is staged in a hidden sibling folder and swapped in by
+    that flush once it is on disk, so a crash mid-run leaves the previous tree in place.
+    """
+
+    def __init__(self, root: Path, barrier: SyncBarrier | None = None) -> None:
+        self.root = root
+        self.barrier = barrier
+        self._staged: dict[PurePosixPath, Path] = {}
+        if barrier is not None:
+            barrier.add(root)
+
+    def _resolve(self, path: PurePosixPath) -> Path:
+        for staged, staging in self._staged.items():
+            if staged == path or staged in path.parents:
+                return staging / path.relative_to(staged)
+        return self.root / path
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        target = self._resolve(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if self.barrier is None:
+            target.write_bytes(data)
+            if executable:
+                target.chmod(target.stat().st_mode | 0o111)
+            return
+        with replace_atomically(target) as handle:
+            handle.write(data)
+            if executable:
+                os.fchmod(handle.fileno(), os.fstat(handle.fileno()).st_mode | 0o111)
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        return self._resolve(path).read_bytes()
+
+    def exists(self, path: PurePosixPath) -> bool:
+        return self._resolve(path).exists()
+
+    def clear(self, path: PurePosixPath) -> None:
+        resolved = self._resolve(path)
+        if self.barrier is None or resolved != self.root / path:
+            # Without a barrier, or inside a staged tree that nothing else can see yet.
+            ensure_empty_dir(resolved, overwrite=True)
+            return
+        for staged in [staged for staged in self._staged if path in staged.parents]:
+            shutil.rmtree(self._staged.pop(staged))
+        target = self.root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Leftovers of runs that stopped before their flush.
+        for stale in target.parent.glob(f".{target.name}.staging-*"):
+            shutil.rmtree(stale)
+        staging = target.with_name(f".{target.name}.staging-{os.urandom(4).hex()}")
+        staging.mkdir()
+        if not self._staged:
+            self.barrier.on_flush(self._publish)
+        self._staged[path] = staging
+        self.barrier.add(staging)
+
+    def _publish(self) -> None:
+        staged, self._staged = self._staged, {}
+        for path, staging in staged.items():
+            swap_directory(staging, self.root / path)
+
+    def display(self, path: PurePosixPath) -> str:
+        return str(self.root / path)
+
+
+class MemorySink(ClosingSink):
+    """Keep output files in memory, keyed by relative POSIX path."""
+
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+        self.executables: set[str] = set()
+        self._dirs: set[str] = {"."}
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        key = _key(path)
+        self.files[key] = data
+        if executable:
+            self.executables.add(key)
+        else:
+            self.executables.discard(key)
+        self._dirs.update(_key(parent) for parent in PurePosixPath(key).parents)
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        try:
+            return self.files[_key(path)]
+        except KeyError:
+            raise FileNotFoundError(_key(path)) from None
+
+    def exists(self, path: PurePosixPath) -> bool:
+        key = _key(path)
+        return key in self.files or key in self._dirs
+
+    def clear(self, path: PurePosixPath) -> None:
+        key = _key(path)
+        prefix = "" if key == "." else f"{key}/"
+        for name in [name for name in self.files if name == key or name.startswith(prefix)]:
+            del self.files[name]
+            self.executables.discard(name)
+        self._dirs = {"."}
+        for name in self.files:
+            self._dirs.update(_key(parent) for parent in PurePosixPath(name).parents)
+        self._dirs.update(_key(parent) for parent in (PurePosixPath(key), *PurePosixPath(key).parents))
+
+    def display(self, path: PurePosixPath) -> str:
+        return _key(path)
+
+    def text(self, path: PurePosixPath | str) -> str:
+        return self.files[_key(path)].decode("utf-8")
+
+
+class ZipSink(MemorySink):
+    """Collect output in memory and write a reproducible zip archive on ``close``."""
+
+    def __init__(self, archive: Path) -> None:
+        super().__init__()
+        self.archive = archive
+
+    def close(self) -> None:
+        self.archive.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(self.archive, "w", compression=zipfile.ZIP_DEFLATED) as handle:
+            for name in sorted(self.files):
+                info = zipfile.ZipInfo(name, date_time=_ARCHIVE_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = (0o755 if name in self.executables else 0o644) << 16
+                handle.writestr(info, self.files[name])
+
+
+class TarSink(MemorySink):
+    """Collect output in memory and write a reproducible tar archive on ``close``.
+
+    Compression follows the archive suffix (``.tar.gz``/``.tgz``, ``.tar.bz2``, ``.tar.xz``).
+    """
+
+    def __init__(self, archive: Path) -> None:
+        super().__init__()
+        self.archive = archive
+
+    def _mode(self) -> str:
+        name = self.archive.name
+        if name.endswith((".tar.gz", ".tgz")):
+            return "w:gz"
+        if name.endswith(".tar.bz2"):
+            return "w:bz2"
+        if name.endswith(".tar.xz"):
+            return "w:xz"
+        return "w"
+
+    def close(self) -> None:
+        self.archive.parent.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(self.archive, self._mode()) as handle:  # type: ignore[call-overload]
+            for name in sorted(self.files):
+                data = self.files[name]
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = 0o755 if name in self.executables else 0o644
+                info.mtime = _ARCHIVE_MTIME
+                handle.addfile(info, io.BytesIO(data))
@@ -0,0 +1,226 @@
+"""The ``slim`` output profile: drop markdown that costs context without carrying meaning.
+
+Outside code blocks, slimming strips trailing whitespace (keeping hard line breaks), collapses
+runs of blank lines, removes HTML comments and drops decorative horizontal rules. Frontmatter,
+fenced code and indented code (four or more columns deep after a blank line) are passed through
+unchanged.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import PurePosixPath
+from typing import Iterable, Iterator
+
+from .catalog import asset_kind
+from .constants import FRONTMATTER_DELIM
+from .processing import relative_parts
+from .sinks import OutputSink
+from .tokens import estimate_tokens
+
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_INDENTED_RE = re.compile(r"^(?: {4}| {0,3}\t)")
+_RULE_RE = re.compile(r"^ {0,3}([-*_])(?: *\1){2,} *$")
+_COMMENT_RE = re.compile(r"<!--.*?-->")
+_COMMENT_START = "<!--"
+_COMMENT_END = "-->"
+
+
+def _mark_code(lines: Iterable[str]) -> Iterator[tuple[str, bool]]:
+    """Pair each line with whether it belongs to a fenced (fences included) or indented code block.
+
+    An indented block starts with a line indented four or more columns after a blank line and takes
+    the indented lines that follow. Blank lines count as code only when the block continues after them.
+    """
+    fence: str | None = None
+    indented = False
+    previous_blank = True
+    blanks: list[str] = []
+    for line in lines:
+        if fence is not None:
+            yield line, True
+            marker = _FENCE_RE.match(line)
+            closing = marker is not None and marker.group(1)[0] == fence[0] and len(marker.group(1)) >= len(fence)
+            if closing and not line.strip().strip(fence[0]):
+                fence = None
+            continue
+        blank = not line.strip()
+        if indented:
+            if blank:
+                blanks.append(line)
+                continue
+            continued = _INDENTED_RE.match(line) is not None
+            yield from ((held, continued) for held in blanks)
+            blanks.clear()
+            if continued:
+                yield line, True
+                continue
+            indented = False
+        marker = _FENCE_RE.match(line)
+        if marker:
+            fence = marker.group(1)
+        elif previous_blank and not blank and _INDENTED_RE.match(line):
+            indented = True
+        yield line, fence is not None or indented
+        previous_blank = blank
+    yield from ((held, False) for held in blanks)
+
+
+def _drop_comments(items: Iterable[tuple[str, bool]]) -> Iterator[tuple[str, bool]]:
+    in_comment = False
+    for line, in_code in items:
+        if in_code and not in_comment:
+            yield line, in_code
+            continue
+        if in_comment:
+            if _COMMENT_END not in line:
+                continue
+            line = line.split(_COMMENT_END, 1)[1]
+            in_comment = False
+            if not line.strip():
+                continue
+        # Lines with code spans are left alone so comment-like text inside backticks survives.
+        if _COMMENT_START in line and "`" not in line:
+            line = _COMMENT_RE.sub("", line)
+            if _COMMENT_START in line:
+                line = line.partition(_COMMENT_START)[0]
+                in_comment = True
+            if not line.strip():
+                continue
+        yield line, False
+
+
+def _normalize_blocks(items: Iterable[tuple[str, bool]], previous_blank: bool) -> Iterator[str]:
+    # Each text line is held until the next one shows whether its hard line break still matters.
+    held: tuple[str, bool] | None = None
+    for line, in_code in items:
+        text = line if in_code else line.rstrip()
+        if held is not None:
+            held_text, hard_break = held
+            yield f"{held_text}  " if hard_break and text and not in_code else held_text
+            held = None
+        if in_code:
+            previous_blank = False
+            yield line
+        elif not text:
+            if not previous_blank:
+                yield ""
+            previous_blank = True
+        # A dash rule right after text is a setext heading underline, not decoration.
+        elif not (previous_blank and _RULE_RE.match(text)):
+            previous_blank = False
+            held = (text, line.endswith("  ") and not text.lstrip().startswith("#"))
+    if held is not None:
+        yield held[0]
+
+
+def iter_slim_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Slim markdown lines (without line endings) in one streaming pass."""
+    lines = iter(lines)
+    first = next(lines, None)
+    previous_blank = True
+    if first is not None and first.strip() == FRONTMATTER_DELIM:
+        yield first
+        for line in lines:
+            yield line
+            if line.strip() == FRONTMATTER_DELIM:
+                break
+        previous_blank = False
+    elif first is not None:
+        lines = chain([first], lines)
+    yield from _normalize_blocks(_drop_comments(_mark_code(lines)), previous_blank)
+
+
+def slim_markdown(text: str) -> str:
+    lines = list(iter_slim_lines(text.splitlines()))
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+@dataclass
+class SlimSavings:
+    files: int = 0
+    bytes: int = 0
+    tokens: int = 0
+
+    def add(self, before: str, after: str) -> None:
+        self.files += 1
+        self.bytes += len(before.encode("utf-8")) - len(after.encode("utf-8"))
+        self.tokens += estimate_tokens(before) - estimate_tokens(after)
+
+    def as_dict(self) -> dict[str, int]:
+        return {"files": self.files, "bytes": self.bytes, "tokens": self.tokens}
+
+
+class SlimmingSink:
+    """Slim every agent, command and skill entry point written to ``sink``.
+
+    Reference sections split off a skill arrive through ``write_section`` and are slimmed too;
+    other files under a skill, such as copied ``references/`` documents, pass through unchanged.
+    Savings are kept per plugin and written path and summed by ``savings``.
+    """
+
+    def __init__(self, sink: OutputSink, output_root: PurePosixPath) -> None:
+        self.sink = sink
+        self.output_root = output_root
+        self._saved: dict[str, dict[PurePosixPath, SlimSavings]] = {}
+        self._lock = threading.Lock()
+
+    def write_bytes(self, path: PurePosixPath, data: bytes, *, executable: bool = False) -> None:
+        kind = asset_kind(self.output_root, path)
+        if kind is not None:
+            data = self._slim(kind[0], path, data)
+        self.sink.write_bytes(path, data, executable=executable)
+
+    def write_section(self, path: PurePosixPath, data: bytes) -> None:
+        parts = relative_parts(path, self.output_root)
+        if parts:
+            data = self._slim(parts[0], path, data)
+        self.sink.write_bytes(path, data)
+
+    def _slim(self, plugin: str, path: PurePosixPath, data: bytes) -> bytes:
+        text = data.decode("utf-8")
+        slimmed = slim_markdown(text)
+        saved = SlimSavings()
+        saved.add(text, slimmed)
+        with self._lock:
+            self._saved.setdefault(plugin, {})[path] = saved
+        return slimmed.encode("utf-8")
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        return self.sink.read_bytes(path)
+
+    def exists(self, path: PurePosixPath) -> bool:
+        return self.sink.exists(path)
+
+    def clear(self, path: PurePosixPath) -> None:
+        self.sink.clear(path)
+        with self._lock:
+            for saved in self._saved.values():
+                for key in [key for key in saved if key == path or path in key.parents]:
+                    del saved[key]
+
+    def display(self, path: PurePosixPath) -> str:
+        return self.sink.display(path)
+
+    def close(self) -> None:
+        return None
+
+    def savings(self, plugin: str | None = None) -> dict[str, SlimSavings]:
+        """Sum the savings per plugin, or for ``plugin`` only."""
+        with self._lock:
+            saved = {
+                name: list(items.values())
+                for name, items in self._saved.items()
+                if items and (plugin is None or name == plugin)
+            }
+        totals: dict[str, SlimSavings] = {}
+        for name, items in saved.items():
+            total = totals[name] = SlimSavings()
+            for item in items:
+                total.files += item.files
+                total.bytes += item.bytes
+                total.tokens += item.tokens
+        return totals
@@ -0,0 +1,454 @@
+"""Source providers that expose plugin repositories to the converter.
+
+Every provider addresses files with ``PurePosixPath`` values relative to its root, so the
+conversion core never touches the filesystem directly. Providers that hold an archive handle or a
+``git cat-file`` process release it in ``close``; all of them work as context managers.
+"""
+
+import io
+import json
+import os
+import stat
+import tarfile
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import Mapping, Protocol, Self, Sequence, TextIO
+
+from .file_ops import decode_text
+from .git_ops import GitObjectReader, list_tree, resolve_commit
+
+ROOT = PurePosixPath(".")
+_PLUGINS = ROOT / "plugins"
+
+
+class SourceTree(Protocol):
+    def read_bytes(self, path: PurePosixPath) -> bytes: ...
+
+    def open_text(self, path: PurePosixPath) -> TextIO: ...
+
+    def is_file(self, path: PurePosixPath) -> bool: ...
+
+    def is_dir(self, path: PurePosixPath) -> bool: ...
+
+    def is_executable(self, path: PurePosixPath) -> bool: ...
+
+    def iterdir(self, path: PurePosixPath) -> list[str]: ...
+
+    def display(self, path: PurePosixPath) -> str: ...
+
+    def close(self) -> None: ...
+
+    def __enter__(self) -> Self: ...
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None: ...
+
+
+def read_source_text(source: SourceTree, path: PurePosixPath) -> str:
+    return decode_text(source.read_bytes(path))
+
+
+def load_source_json(source: SourceTree, path: PurePosixPath) -> dict:
+    """Load a JSON object from the source, treating missing or malformed files as empty."""
+    if not source.is_file(path):
+        return {}
+    try:
+        return json.loads(read_source_text(source, path))
+    except json.JSONDecodeError:
+        return {}
+
+
+def list_files(source: SourceTree, directory: PurePosixPath, suffix: str = "") -> list[PurePosixPath]:
+    """Return files directly inside ``directory`` whose name ends with ``suffix``, sorted by name."""
+    if not source.is_dir(directory):
+        return []
+    return [
+        directory / name
+        for name in sorted(source.iterdir(directory))
+        if name.endswith(suffix) and source.is_file(directory / name)
+    ]
+
+
+def list_dirs(source: SourceTree, directory: PurePosixPath) -> list[PurePosixPath]:
+    if not source.is_dir(directory):
+        return []
+    return [directory / name for name in sorted(source.iterdir(directory)) if source.is_dir(directory / name)]
+
+
+def list_skill_files(source: SourceTree, skills_dir: PurePosixPath) -> list[PurePosixPath]:
+    """Return ``<skill>/SKILL.md`` files under ``skills_dir`` sorted by skill folder name."""
+    return [path / "SKILL.md" for path in list_dirs(source, skills_dir) if source.is_file(path / "SKILL.md")]
+
+
+def walk_files(source: SourceTree, directory: PurePosixPath) -> list[PurePosixPath]:
+    files: list[PurePosixPath] = []
+    for name in sorted(source.iterdir(directory)):
+        child = directory / name
+        if source.is_dir(child):
+            files.extend(walk_files(source, child))
+        elif source.is_file(child):
+            files.append(child)
+    return files
+
+
+class _ClosingSource:
+    def close(self) -> None:
+        return None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class DirectorySource(_ClosingSource):
+    """Read sources from a checked-out directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        return (self.root / path).read_bytes()
+
+    def open_text(self, path: PurePosixPath) -> TextIO:
+        return (self.root / path).open(encoding="utf-8")
+
+    def is_file(self, path: PurePosixPath) -> bool:
+        return (self.root / path).is_file()
+
+    def is_dir(self, path: PurePosixPath) -> bool:
+        return (self.root / path).is_dir()
+
+    def is_executable(self, path: PurePosixPath) -> bool:
+        return bool((self.root / path).stat().st_mode & 0o111)
+
+    def iterdir(self, path: PurePosixPath) -> list[str]:
+        directory = self.root / path
+        if not directory.is_dir():
+            return []
+        return [item.name for item in directory.iterdir()]
+
+    def display(self, path: PurePosixPath) -> str:
+        return str(self.root / path)
+
+
+def _key(path: PurePosixPath | str) -> str:
+    return str(PurePosixPath(path))
+
+
+class _IndexedSource(_ClosingSource, ABC):
+    """Shared directory index for sources backed by a flat mapping of file names."""
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self._children: dict[str, set[str]] = {_key(ROOT): set()}
+        self._file_keys: set[str] = set()
+        self._executables: set[str] = set()
+
+    def _index(self, name: str, executable: bool = False) -> str:
+        path = PurePosixPath(name)
+        key = _key(path)
+        for parent in path.parents:
+            self._children.setdefault(_key(parent), set()).add(path.name)
+            path = parent
+        self._file_keys.add(key)
+        if executable:
+            self._executables.add(key)
+        return key
+
+    @abstractmethod
+    def _load(self, key: str) -> bytes:
+        """Return the content of an indexed file."""
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        key = _key(path)
+        if key not in self._file_keys:
+            raise FileNotFoundError(self.display(path))
+        return self._load(key)
+
+    def open_text(self, path: PurePosixPath) -> TextIO:
+        return io.StringIO(read_source_text(self, path))
+
+    def is_file(self, path: PurePosixPath) -> bool:
+        return _key(path) in self._file_keys
+
+    def is_dir(self, path: PurePosixPath) -> bool:
+        return _key(path) in self._children
+
+    def is_executable(self, path: PurePosixPath) -> bool:
+        return _key(path) in self._executables
+
+    def iterdir(self, path: PurePosixPath) -> list[str]:
+        return sorted(self._children.get(_key(path), ()))
+
+    def display(self, path: PurePosixPath) -> str:
+        key = _key(path)
+        return self.label if key == "." else f"{self.label}/{key}"
+
+
+class MemorySource(_IndexedSource):
+    """Serve sources from an in-memory mapping of relative paths to content."""
+
+    def __init__(self, files: Mapping[str, bytes | str], label: str = "memory") -> None:
+        super().__init__(label)
+        self._files: dict[str, bytes] = {}
+        for name, content in files.items():
+            key = self._index(name)
+            self._files[key] = content.encode("utf-8") if isinstance(content, str) else content
+
+    def _load(self, key: str) -> bytes:
+        return self._files[key]
+
+
+class DirectorySnapshot(_IndexedSource):
+    """Index a directory once and serve file contents from memory until they change on disk.
+
+    Meant for long-lived processes: ``refresh`` re-stats the tree and drops only the cached
+    contents whose size or mtime changed. ``.git`` folders and symlinked directories are not indexed.
+    """
+
+    def __init__(self, root: Path) -> None:
+        super().__init__(str(root))
+        self.root = root
+        self.generation = 0
+        self._signatures: dict[str, tuple[int, int]] = {}
+        self._contents: dict[str, bytes] = {}
+        self.refresh()
+
+    def refresh(self) -> set[str]:
+        """Re-index the directory and return the keys of files that were added, changed or removed."""
+        signatures: dict[str, tuple[int, int]] = {}
+        executables: set[str] = set()
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if name != ".git"]
+            for name in filenames:
+                path = Path(directory, name)
+                try:
+                    info = path.stat()
+                except FileNotFoundError:
+                    continue
+                if not stat.S_ISREG(info.st_mode):
+                    continue
+                key = path.relative_to(self.root).as_posix()
+                signatures[key] = (info.st_size, info.st_mtime_ns)
+                if info.st_mode & 0o111:
+                    executables.add(key)
+
+        changed = {
+            key
+            for key in signatures.keys() | self._signatures.keys()
+            if signatures.get(key) != self._signatures.get(key)
+        }
+        if not changed and executables == self._executables:
+            return changed
+        for key in changed:
+            self._contents.pop(key, None)
+        self._children = {_key(ROOT): set()}
+        self._file_keys = set()
+        self._executables = set()
+        for key in signatures:
+            self._index(key, executable=key in executables)
+        self._signatures = signatures
+        self.generation += 1
+        return changed
+
+    def _load(self, key: str) -> bytes:
+        data = self._contents.get(key)
+        if data is None:
+            data = (self.root / key).read_bytes()
+            self._contents[key] = data
+        return data
+
+
+def _archive_root(file_names: list[str], root: str | None) -> str:
+    """Pick the archive folder that holds the repository.
+
+    GitHub archives wrap everything in a single ``<repo>-<ref>/`` folder, which is stripped
+    automatically when ``root`` is not given.
+    """
+    if root is not None:
+        return root.strip("/")
+    names = [name.strip("/") for name in file_names]
+    tops = {name.split("/", 1)[0] for name in names}
+    if len(tops) == 1 and all("/" in name for name in names):
+        return tops.pop()
+    return ""
+
+
+def _strip_root(name: str, root: str) -> str | None:
+    name = name.strip("/")
+    if not root:
+        return name or None
+    prefix = f"{root}/"
+    return name[len(prefix) :] if name.startswith(prefix) and len(name) > len(prefix) else None
+
+
+class ZipSource(_IndexedSource):
+    """Read sources from a zip archive such as a GitHub repository download."""
+
+    def __init__(self, archive: Path, root: str | None = None) -> None:
+        super().__init__(str(archive))
+        self._zip = zipfile.ZipFile(archive)
+        infos = self._zip.infolist()
+        self._root = _archive_root([info.filename for info in infos if not info.is_dir()], root)
+        self._members: dict[str, zipfile.ZipInfo] = {}
+        for info in infos:
+            name = _strip_root(info.filename, self._root)
+            if name is None or info.is_dir():
+                continue
+            key = self._index(name, executable=bool((info.external_attr >> 16) & 0o111))
+            self._members[key] = info
+
+    def _load(self, key: str) -> bytes:
+        return self._zip.read(self._members[key])
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class TarSource(_IndexedSource):
+    """Read sources from a (optionally compressed) tar archive."""
+
+    def __init__(self, archive: Path, root: str | None = None) -> None:
+        super().__init__(str(archive))
+        self._lock = threading.Lock()
+        self._tar = tarfile.open(archive)  # noqa: SIM115  # nosec B202 - members are read, never extracted
+        members = self._tar.getmembers()
+        self._root = _archive_root([member.name for member in members if member.isfile()], root)
+        self._members: dict[str, tarfile.TarInfo] = {}
+        for member in members:
+            name = _strip_root(member.name, self._root)
+            if name is None or not member.isfile():
+                continue
+            key = self._index(name, executable=bool(member.mode & 0o111))
+            self._members[key] = member
+
+    def _load(self, key: str) -> bytes:
+        # Members share the archive's file position, so reads from several threads are serialized.
+        with self._lock:
+            handle = self._tar.extractfile(self._members[key])
+            if handle is None:
+                raise FileNotFoundError(key)
+            with handle:
+                return handle.read()
+
+    def close(self) -> None:
+        self._tar.close()
+
+
+class GitSource(_IndexedSource):
+    """Read sources from a commit in a local (bare or mirror) git repository, without a checkout.
+
+    The tree is listed once and blobs are streamed through a persistent ``git cat-file --batch``
+    process, so several revisions of one mirror can be converted side by side.
+    """
+
+    def __init__(self, repo: Path, ref: str = "HEAD") -> None:
+        commit = resolve_commit(repo, ref)
+        if commit is None:
+            raise SystemExit(f"Git ref not found: {ref} in {repo}")
+        super().__init__(f"{repo}@{commit}")
+        self.repo = repo
+        self.commit = commit
+        self._object_ids: dict[str, str] = {}
+        for name, (mode, object_id) in list_tree(repo, commit).items():
+            if mode == "120000":
+                continue
+            key = self._index(name, executable=mode == "100755")
+            self._object_ids[key] = object_id
+        self._reader = GitObjectReader(repo)
+
+    def _load(self, key: str) -> bytes:
+        return self._reader.read_blob(self._object_ids[key])
+
+    def close(self) -> None:
+        self._reader.close()
+
+
+class PluginOverlay(_ClosingSource):
+    """Merge the ``plugins/`` folders of several sources into one tree.
+
+    ``sources`` are given in priority order: when more than one provides a plugin with the same
+    name the first wins and the others are recorded in ``shadowed``. Paths outside ``plugins/``
+    are served by the first source. The plugin folders of all sources are listed concurrently,
+    once, when the overlay is built. The overlay does not own ``sources``; closing it leaves them open.
+    """
+
+    def __init__(self, sources: Sequence[SourceTree]) -> None:
+        if not sources:
+            raise ValueError("PluginOverlay needs at least one source")
+        self.sources = list(sources)
+        self._owners: dict[str, SourceTree] = {}
+        self.shadowed: dict[str, list[str]] = {}
+        with ThreadPoolExecutor() as pool:
+            listings = list(pool.map(lambda source: list_dirs(source, _PLUGINS), self.sources))
+        for source, plugin_dirs in zip(self.sources, listings, strict=True):
+            for plugin_dir in plugin_dirs:
+                if plugin_dir.name in self._owners:
+                    self.shadowed.setdefault(plugin_dir.name, []).append(source.display(plugin_dir))
+                else:
+                    self._owners[plugin_dir.name] = source
+
+    def _route(self, path: PurePosixPath) -> SourceTree:
+        parts = PurePosixPath(path).parts
+        if len(parts) > 1 and parts[0] == "plugins" and parts[1] in self._owners:
+            return self._owners[parts[1]]
+        return self.sources[0]
+
+    def owner(self, plugin_name: str) -> SourceTree | None:
+        return self._owners.get(plugin_name)
+
+    def read_bytes(self, path: PurePosixPath) -> bytes:
+        return self._route(path).read_bytes(path)
+
+    def open_text(self, path: PurePosixPath) -> TextIO:
+        return self._route(path).open_text(path)
+
+    def is_file(self, path: PurePosixPath) -> bool:
+        return self._route(path).is_file(path)
+
+    def is_dir(self, path: PurePosixPath) -> bool:
+        if _key(path) == _key(_PLUGINS) and self._owners:
+            return True
+        return self._route(path).is_dir(path)
+
+    def is_executable(self, path: PurePosixPath) -> bool:
+        return self._route(path).is_executable(path)
+
+    def iterdir(self, path: PurePosixPath) -> list[str]:
+        if _key(path) == _key(_PLUGINS):
+            return sorted(set(self.sources[0].iterdir(path)) | set(self._owners))
+        return self._route(path).iterdir(path)
+
+    def display(self, path: PurePosixPath) -> str:
+        return self._route(path).display(path)
+
+
+def open_source(location: Path, ref: str | None = None) -> SourceTree:
+    """Open a directory, ``.zip`` or tar archive as a source tree, or a git repository at ``ref``.
+
+    The caller owns the result and closes it, typically with ``with open_source(...) as source:``.
+    """
+    if ref is not None:
+        return GitSource(location, ref)
+    if location.is_dir():
+        return DirectorySource(location)
+    if zipfile.is_zipfile(location):
+        return ZipSource(location)
+    if tarfile.is_tarfile(location):
+        return TarSource(location)
+    raise SystemExit(f"Unsupported source: {location}")
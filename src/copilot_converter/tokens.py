@@ -0,0 +1,59 @@
+"""Token estimates and per-kind budgets for generated agents, commands and skills."""
+
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+
+from .constants import ASSET_KINDS
+
+# Roughly four characters per token for English prose and code; close enough for budgeting
+# without shipping a tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass(frozen=True)
+class TokenBudgets:
+    """Token limits per asset kind; ``None`` leaves a kind unlimited.
+
+    With ``split_skills`` a ``SKILL.md`` over the ``skill`` limit is split into a core file plus
+    ``references/*.md`` sections.
+    """
+
+    agent: int | None = None
+    command: int | None = None
+    skill: int | None = None
+    split_skills: bool = False
+
+    def limit(self, kind: str) -> int | None:
+        return getattr(self, kind) if kind in ASSET_KINDS else None
+
+    @property
+    def skill_split_limit(self) -> int | None:
+        return self.skill if self.split_skills else None
+
+
+def token_report(
+    assets: dict[PurePosixPath, tuple[str, str, str, int]],
+    budgets: TokenBudgets | None = None,
+) -> dict[str, list[dict[str, object]]]:
+    """Group token estimates by plugin.
+
+    ``assets`` maps each generated path to ``(plugin, kind, name, estimated tokens)``.
+    """
+    report: dict[str, list[dict[str, object]]] = {}
+    for path, (plugin, kind, name, tokens) in sorted(assets.items()):
+        limit = budgets.limit(kind) if budgets is not None else None
+        report.setdefault(plugin, []).append(
+            {
+                "kind": kind,
+                "name": name,
+                "path": str(path),
+                "tokens": tokens,
+                "budget": limit,
+                "over_budget": limit is not None and tokens > limit,
+            }
+        )
+    return report
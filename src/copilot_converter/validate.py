@@ -0,0 +1,254 @@
+"""Validate generated plugin output in one pass over an in-memory index of every generated path.
+
+The output is read through the ``SourceTree`` protocol, so a work tree, an archive or a commit
+of the publish repository can be checked the same way.
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from functools import partial
+from pathlib import Path, PurePosixPath
+
+from .builders import extract_relative_link_targets, resolve_link_target
+from .converter import DEFAULT_OUTPUT_ROOT
+from .file_ops import decode_text, hash_content, resolve_source
+from .frontmatter import parse_simple_frontmatter, split_frontmatter
+from .models import Diagnostic
+from .processing import MARKETPLACE_PATH, plugin_content_hash
+from .sources import ROOT, DirectorySource, GitSource, SourceTree, read_source_text, walk_files
+
+MANIFEST_KEYS = ("name", "description", "version")
+MANIFEST_PARTS = (".github", "plugin", "plugin.json")
+
+
+class _PathIndex:
+    """Every generated file and the directories that contain them."""
+
+    def __init__(self, files: list[PurePosixPath]) -> None:
+        self.files = {str(path) for path in files}
+        self.dirs = {str(parent) for path in files for parent in path.parents}
+
+    def __contains__(self, path: PurePosixPath) -> bool:
+        key = str(path)
+        return key in self.files or key in self.dirs
+
+
+def _error(code: str, path: PurePosixPath, message: str) -> Diagnostic:
+    return Diagnostic(severity="error", code=code, path=str(path), message=message)
+
+
+def _warning(code: str, path: PurePosixPath, message: str) -> Diagnostic:
+    return Diagnostic(severity="warning", code=code, path=str(path), message=message)
+
+
+def _load_json_object(tree: SourceTree, path: PurePosixPath) -> tuple[dict | None, Diagnostic | None]:
+    try:
+        payload = json.loads(read_source_text(tree, path))
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        return None, _error("invalid-json", path, f"not valid JSON: {exc}")
+    if not isinstance(payload, dict):
+        return None, _error("invalid-json", path, "expected a JSON object")
+    return payload, None
+
+
+def _check_manifest(
+    tree: SourceTree, path: PurePosixPath, plugin_name: str, file_hashes: dict[PurePosixPath, str]
+) -> list[Diagnostic]:
+    """Check a ``plugin.json``; ``file_hashes`` maps the plugin's other files to their content hashes."""
+    manifest, problem = _load_json_object(tree, path)
+    if manifest is None:
+        return [problem] if problem else []
+    diagnostics = [
+        _error("manifest-missing-key", path, f"plugin.json has no string {key!r}")
+        for key in MANIFEST_KEYS
+        if not isinstance(manifest.get(key), str) or not manifest.get(key)
+    ]
+    name = manifest.get("name")
+    if isinstance(name, str) and name and name != plugin_name:
+        diagnostics.append(
+            _warning("manifest-name-mismatch", path, f"plugin.json name {name!r} differs from folder {plugin_name!r}")
+        )
+    content_hash = manifest.get("contentHash")
+    if content_hash is not None and content_hash != plugin_content_hash(file_hashes):
+        diagnostics.append(
+            _error("content-hash-mismatch", path, "plugin.json contentHash does not match the plugin files")
+        )
+    return diagnostics
+
+
+def _check_frontmatter_name(
+    path: PurePosixPath,
+    content: str,
+    expected: str,
+    *,
+    require_description: bool,
+) -> list[Diagnostic]:
+    split = split_frontmatter(content)
+    if split.frontmatter is None:
+        return [_error("missing-frontmatter", path, "file has no frontmatter block")]
+    metadata = parse_simple_frontmatter(split.frontmatter)
+    diagnostics: list[Diagnostic] = []
+    name = metadata.get("name")
+    if not name:
+        diagnostics.append(_error("missing-name", path, "frontmatter has no 'name'"))
+    elif name != expected:
+        diagnostics.append(_error("name-mismatch", path, f"frontmatter name {name!r} does not match {expected!r}"))
+    if require_description and not metadata.get("description"):
+        diagnostics.append(_error("missing-description", path, "frontmatter has no 'description'"))
+    return diagnostics
+
+
+def _check_links(path: PurePosixPath, content: str, index: _PathIndex, *, in_skill: bool) -> list[Diagnostic]:
+    # Placeholders are only generated for skills, so unresolved links elsewhere are warnings.
+    report = _error if in_skill else _warning
+    diagnostics: list[Diagnostic] = []
+    for link_target in sorted(extract_relative_link_targets(content)):
+        resolved = resolve_link_target(path.parent, link_target)
+        if resolved not in index:
+            diagnostics.append(report("broken-link", path, f"link {link_target!r} does not resolve ({resolved})"))
+    return diagnostics
+
+
+def _check_file(
+    tree: SourceTree,
+    index: _PathIndex,
+    output_root: PurePosixPath,
+    path: PurePosixPath,
+) -> tuple[str, list[Diagnostic]]:
+    """Check a generated file other than ``plugin.json``; return its content hash and diagnostics."""
+    data = tree.read_bytes(path)
+    digest = hash_content(data)
+    if path.suffix != ".md":
+        return digest, []
+
+    try:
+        content = decode_text(data)
+    except UnicodeDecodeError:
+        return digest, [_error("invalid-encoding", path, "markdown is not valid UTF-8")]
+    parts = path.relative_to(output_root).parts
+    diagnostics: list[Diagnostic] = []
+    section = parts[1] if len(parts) > 2 else ""
+    if section == "agents" and len(parts) == 3:
+        diagnostics.extend(_check_frontmatter_name(path, content, path.stem, require_description=False))
+    elif section == "commands" and len(parts) == 3:
+        diagnostics.extend(_check_frontmatter_name(path, content, path.stem, require_description=True))
+    elif section == "skills" and len(parts) == 4 and path.name == "SKILL.md":
+        diagnostics.extend(_check_frontmatter_name(path, content, parts[2], require_description=True))
+    diagnostics.extend(_check_links(path, content, index, in_skill=section == "skills"))
+    return digest, diagnostics
+
+
+def _check_marketplace(
+    tree: SourceTree,
+    index: _PathIndex,
+    output_root: PurePosixPath,
+    plugin_names: list[str],
+    marketplace_path: PurePosixPath,
+) -> list[Diagnostic]:
+    if not tree.is_file(marketplace_path):
+        return [_error("missing-marketplace", marketplace_path, "marketplace.json was not generated")]
+    marketplace, problem = _load_json_object(tree, marketplace_path)
+    if marketplace is None:
+        return [problem] if problem else []
+
+    diagnostics: list[Diagnostic] = []
+    entries = marketplace.get("plugins")
+    if not isinstance(entries, list):
+        return [_error("invalid-marketplace", marketplace_path, "'plugins' must be a list")]
+    listed: set[str] = set()
+    for position, entry in enumerate(entries):
+        source = entry.get("source") if isinstance(entry, dict) else None
+        if not isinstance(source, str):
+            diagnostics.append(
+                _error("invalid-marketplace", marketplace_path, f"plugin entry {position} has no source")
+            )
+            continue
+        source_path = PurePosixPath(source)
+        listed.add(source_path.name)
+        if not source_path.is_absolute() and source_path not in index:
+            diagnostics.append(
+                _error("marketplace-missing-plugin", marketplace_path, f"plugin source {source!r} does not exist")
+            )
+    diagnostics.extend(
+        _warning("unlisted-plugin", output_root / name, "plugin is not listed in marketplace.json")
+        for name in plugin_names
+        if name not in listed
+    )
+    return diagnostics
+
+
+def validate_output(
+    tree: SourceTree,
+    output_root: PurePosixPath = DEFAULT_OUTPUT_ROOT,
+    marketplace_path: PurePosixPath = MARKETPLACE_PATH,
+    workers: int | None = None,
+) -> list[Diagnostic]:
+    """Check names, manifests (and their content hashes), links and the marketplace of generated output.
+
+    ``tree`` is rooted at the publish root; plugins are expected under ``output_root``. Every file is
+    read and hashed once; manifests are checked afterwards against the hashes of their plugin.
+    """
+    files = walk_files(tree, output_root) if tree.is_dir(output_root) else []
+    index = _PathIndex(files)
+    plugin_names = sorted({path.relative_to(output_root).parts[0] for path in files})
+    manifests = [path for path in files if path.relative_to(output_root).parts[1:] == MANIFEST_PARTS]
+    others = [path for path in files if path.relative_to(output_root).parts[1:] != MANIFEST_PARTS]
+
+    diagnostics = [
+        _error("missing-manifest", output_root / name / PurePosixPath(*MANIFEST_PARTS), "plugin has no manifest")
+        for name in plugin_names
+        if str(output_root / name / PurePosixPath(*MANIFEST_PARTS)) not in index.files
+    ]
+    hashes_by_plugin: dict[str, dict[PurePosixPath, str]] = {}
+    with ThreadPoolExecutor(workers) as pool:
+        for path, (digest, file_diagnostics) in zip(
+            others, pool.map(partial(_check_file, tree, index, output_root), others), strict=True
+        ):
+            plugin_name, *relative = path.relative_to(output_root).parts
+            hashes_by_plugin.setdefault(plugin_name, {})[PurePosixPath(*relative)] = digest
+            diagnostics.extend(file_diagnostics)
+        plugin_of = [path.relative_to(output_root).parts[0] for path in manifests]
+        for manifest_diagnostics in pool.map(
+            lambda path, name: _check_manifest(tree, path, name, hashes_by_plugin.get(name, {})), manifests, plugin_of
+        ):
+            diagnostics.extend(manifest_diagnostics)
+    diagnostics.extend(_check_marketplace(tree, index, output_root, plugin_names, marketplace_path))
+    return sorted(diagnostics, key=lambda item: (item.path, item.code, item.message))
+
+
+def validate_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="copilot_converter validate",
+        description="Validate generated Copilot plugins and marketplace.json. Exits 1 when errors are found.",
+    )
+    parser.add_argument(
+        "root",
+        nargs="?",
+        default=".",
+        help="Publish root holding the plugins folder and .github/plugin/marketplace.json (default: .)",
+    )
+    parser.add_argument("--output", default="plugins", help="Plugins folder relative to root (default: plugins)")
+    parser.add_argument("--ref", default=None, help="Validate this commit of the git repository at root instead")
+    parser.add_argument("--json", action="store_true", help="Print diagnostics as a JSON list")
+    parser.add_argument("--workers", type=int, default=None, help="Files checked in parallel (default: automatic)")
+    args = parser.parse_args(argv)
+
+    root = resolve_source(args.root)
+    output_root = PurePosixPath(Path(args.output).as_posix())
+    if output_root.is_absolute():
+        output_root = PurePosixPath(Path(args.output).resolve().relative_to(root).as_posix())
+    tree: SourceTree = GitSource(root, args.ref) if args.ref else DirectorySource(root)
+    with tree:
+        diagnostics = validate_output(tree, output_root if output_root.parts else ROOT, workers=args.workers)
+
+    if args.json:
+        print(json.dumps([asdict(item) for item in diagnostics], indent=2))
+    else:
+        for item in diagnostics:
+            print(f"{item.severity}: {item.path}: {item.message} [{item.code}]")
+        errors = sum(item.severity == "error" for item in diagnostics)
+        print(f"{errors} error(s), {len(diagnostics) - errors} warning(s)", file=sys.stderr)
+    return 1 if any(item.severity == "error" for item in diagnostics) else 0